@@ -0,0 +1,208 @@
+import asyncio
+import math
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from fastapi import Request # type: ignore
+from starlette.concurrency import run_in_threadpool # type: ignore
+from passwords import AUTH_WORKERS
+
+# Unauthenticated endpoints that cost a bcrypt operation are admitted through
+# two token buckets: one per client IP (429 when empty) and one global bucket
+# sized below what the bcrypt pool can sustain. A request that finds the
+# global bucket empty reserves a future token and waits for it, unless that
+# wait would pass the deadline or the queue is full (503).
+ADMISSION_ENABLED = os.environ.get("ADMISSION_ENABLED", "true").lower() == "true"
+# "memory" keeps buckets per process; "sqlite" shares them between workers on one host
+ADMISSION_BACKEND = os.environ.get("ADMISSION_BACKEND", "memory")
+ADMISSION_SQLITE_PATH = os.environ.get("ADMISSION_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "museum-admission.db"))
+ADMISSION_TRUST_FORWARDED = os.environ.get("ADMISSION_TRUST_FORWARDED", "false").lower() == "true"
+
+AUTH_IP_RATE_PER_MINUTE = float(os.environ.get("AUTH_IP_RATE_PER_MINUTE", "10"))
+AUTH_IP_BURST = float(os.environ.get("AUTH_IP_BURST", "5"))
+# A bcrypt verify at 12 rounds is ~0.25 s of CPU, so ~3/s per hashing thread leaves headroom
+AUTH_GLOBAL_RATE_PER_SECOND = float(os.environ.get("AUTH_GLOBAL_RATE_PER_SECOND", str(AUTH_WORKERS * 3)))
+AUTH_GLOBAL_BURST = float(os.environ.get("AUTH_GLOBAL_BURST", str(AUTH_WORKERS * 6)))
+ADMISSION_QUEUE_MAX = int(os.environ.get("ADMISSION_QUEUE_MAX", "64"))
+ADMISSION_QUEUE_DEADLINE_SECONDS = float(os.environ.get("ADMISSION_QUEUE_DEADLINE_SECONDS", "2"))
+# Per-IP buckets kept in memory; the least recently seen are forgotten first
+ADMISSION_MAX_KEYS = 100000
+
+GLOBAL_KEY = "auth:global"
+
+
+class AdmissionRejected(Exception):
+    """Raised when an auth request is shed; carries the status code and Retry-After seconds."""
+
+    def __init__(self, status_code: int, retry_after: float, detail: str):
+        self.status_code = status_code
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.detail = detail
+
+
+def _refill(tokens: float, updated: float, now: float, rate: float, burst: float):
+    return min(burst, tokens + max(0.0, now - updated) * rate)
+
+
+def _take(tokens: float, rate: float, max_wait: float):
+    """Take one token, possibly going into debt. Returns (granted, delay, tokens after)."""
+    tokens -= 1
+    delay = -tokens / rate if tokens < 0 else 0.0
+    return delay <= max_wait, delay, tokens
+
+
+class MemoryBackend:
+    """Token buckets for this process only."""
+
+    blocking = False
+
+    def __init__(self, max_keys: int = ADMISSION_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()  # key -> (tokens, updated)
+        self._lock = threading.Lock()
+
+    def reserve(self, key: str, rate: float, burst: float, max_wait: float):
+        now = time.time()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            granted, delay, after = _take(_refill(tokens, updated, now, rate, burst), rate, max_wait)
+            if granted:
+                self._buckets[key] = (after, now)
+                self._buckets.move_to_end(key)
+                while len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            return granted, delay
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class SQLiteBackend:
+    """Token buckets in a small local SQLite file, shared by every worker process on the host."""
+
+    blocking = True  # may wait on another worker's write lock, so it runs in the threadpool
+
+    def __init__(self, path: str = ADMISSION_SQLITE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._calls = 0
+        with self._connect() as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS admission_buckets (key TEXT PRIMARY KEY, tokens REAL, updated REAL)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        # A connection opened before a fork belongs to the parent; workers open their own
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=1.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=OFF")  # losing a few bucket updates on power loss is harmless
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def reserve(self, key: str, rate: float, burst: float, max_wait: float):
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated FROM admission_buckets WHERE key = ?", (key,)).fetchone()
+            tokens, updated = row if row else (burst, now)
+            granted, delay, after = _take(_refill(tokens, updated, now, rate, burst), rate, max_wait)
+            if granted:
+                conn.execute("INSERT OR REPLACE INTO admission_buckets (key, tokens, updated) VALUES (?, ?, ?)",
+                             (key, after, now))
+            self._calls += 1
+            if self._calls % 1000 == 0:
+                # Idle buckets are full again after an hour; dropping them changes nothing
+                conn.execute("DELETE FROM admission_buckets WHERE updated < ?", (now - 3600,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return granted, delay
+
+    def reset(self):
+        self._connect().execute("DELETE FROM admission_buckets")
+
+
+class AdmissionController:
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.waiting = 0
+        self.stats_counters = {
+            "admitted": 0,
+            "admitted_after_wait": 0,
+            "shed_ip_rate": 0,
+            "shed_queue_full": 0,
+            "shed_deadline": 0,
+            "wait_seconds_total": 0.0,
+        }
+
+    def _count(self, name: str, amount=1):
+        with self._lock:
+            self.stats_counters[name] += amount
+
+    async def _reserve(self, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(self.backend.reserve, *args)
+        return self.backend.reserve(*args)
+
+    async def admit(self, client_ip: str):
+        """Wait for admission or raise AdmissionRejected."""
+        granted, delay = await self._reserve(f"auth:ip:{client_ip}", AUTH_IP_RATE_PER_MINUTE / 60, AUTH_IP_BURST, 0.0)
+        if not granted:
+            self._count("shed_ip_rate")
+            raise AdmissionRejected(429, delay, "Too many attempts from this address, please retry later")
+
+        with self._lock:
+            if self.waiting >= ADMISSION_QUEUE_MAX:
+                self.stats_counters["shed_queue_full"] += 1
+                raise AdmissionRejected(503, 1 / AUTH_GLOBAL_RATE_PER_SECOND * self.waiting,
+                                        "Authentication is busy, please retry shortly")
+            self.waiting += 1
+        try:
+            granted, delay = await self._reserve(
+                GLOBAL_KEY, AUTH_GLOBAL_RATE_PER_SECOND, AUTH_GLOBAL_BURST, ADMISSION_QUEUE_DEADLINE_SECONDS
+            )
+            if not granted:
+                self._count("shed_deadline")
+                raise AdmissionRejected(503, delay, "Authentication is busy, please retry shortly")
+            if delay > 0:
+                await asyncio.sleep(delay)  # the reserved token becomes ours at the end of the wait
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        with self._lock:
+            self.stats_counters["admitted"] += 1
+            if delay > 0:
+                self.stats_counters["admitted_after_wait"] += 1
+                self.stats_counters["wait_seconds_total"] += delay
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self.stats_counters)
+            snapshot["waiting"] = self.waiting
+        snapshot["shed_total"] = snapshot["shed_ip_rate"] + snapshot["shed_queue_full"] + snapshot["shed_deadline"]
+        return snapshot
+
+
+def client_ip(request: Request):
+    if ADMISSION_TRUST_FORWARDED:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+admission = AdmissionController(SQLiteBackend() if ADMISSION_BACKEND == "sqlite" else MemoryBackend())
+
+
+async def admit_auth_request(request: Request):
+    """Dependency for the unauthenticated bcrypt endpoints (login, register, cancel membership)."""
+    if ADMISSION_ENABLED:
+        await admission.admit(client_ip(request))
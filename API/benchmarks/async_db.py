@@ -0,0 +1,86 @@
+"""Compare the sync (threadpool) and async (aiosqlite) database paths at equal concurrency.
+
+Run from the API directory:
+
+    python -m benchmarks.async_db --concurrency 200 --requests 4000
+
+Both routes run the same query against the configured database (DATABASE_URL)
+and bypass the response cache, so the numbers reflect the DB layer only.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx # type: ignore
+from fastapi import FastAPI, Depends # type: ignore
+from sqlalchemy import select # type: ignore
+from sqlalchemy.orm import Session # type: ignore
+from sqlalchemy.ext.asyncio import AsyncSession # type: ignore
+
+from database import Base, engine, Holiday, OperatingHour
+from main import get_db, get_async_db
+
+bench_app = FastAPI()
+
+
+@bench_app.get("/sync")
+def sync_route(db: Session = Depends(get_db)):
+    return {h.day: h.hours for h in db.query(OperatingHour).all()} | {h.name: str(h.date) for h in db.query(Holiday).all()}
+
+
+@bench_app.get("/async")
+async def async_route(db: AsyncSession = Depends(get_async_db)):
+    hours = (await db.execute(select(OperatingHour))).scalars().all()
+    holidays = (await db.execute(select(Holiday))).scalars().all()
+    return {h.day: h.hours for h in hours} | {h.name: str(h.date) for h in holidays}
+
+
+async def run(path: str, concurrency: int, total: int):
+    latencies = []
+    transport = httpx.ASGITransport(app=bench_app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = iter(range(total))
+
+        async def worker():
+            for _ in remaining:
+                started = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "path": path,
+        "requests": total,
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def compare(concurrency: int, total: int):
+    # One event loop for everything: the async engine's pool is bound to it
+    for path in ("/sync", "/async"):
+        await run(path, concurrency, max(total // 10, concurrency))  # warm up pools
+        result = await run(path, concurrency, total)
+        print(f"{result['path']:<7} {result['rps']:>9.1f} req/s   p50 {result['p50_ms']:>7.2f} ms   p99 {result['p99_ms']:>7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    print(f"concurrency={args.concurrency} requests={args.requests}")
+    asyncio.run(compare(args.concurrency, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Read latency while the login endpoint is flooded, with and without admission control.
+
+Run from the API directory:
+
+    python -m benchmarks.auth_flood --attackers 8 --rate 100 --seconds 10
+
+Attackers post wrong passwords for a real account (so every attempt costs a
+bcrypt verify) at --rate per second from --attackers distinct client
+addresses, while one reader fetches /api/events and /api/hours back to back.
+Each phase reports the reader's p50/p99, the login status codes, and the
+admission counters.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx # type: ignore
+
+import admission as admission_module
+import main
+from database import SessionLocal, User
+from passwords import hash_password_sync
+
+FLOOD_EMAIL = "flood-target@loadtest.example.org"
+READ_PATHS = ("/api/events", "/api/hours")
+
+
+def _ensure_target():
+    db = SessionLocal()
+    try:
+        if db.query(User).filter(User.email == FLOOD_EMAIL).first() is None:
+            db.add(User(email=FLOOD_EMAIL, hashed_password=hash_password_sync("correct-password"), role="member"))
+            db.commit()
+    finally:
+        db.close()
+
+
+def _percentile(values, fraction: float):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] * 1000 if ordered else 0.0
+
+
+async def run_phase(enabled: bool, args):
+    admission_module.ADMISSION_ENABLED = enabled
+    admission_module.admission.backend.reset()
+    deadline = time.perf_counter() + args.seconds
+    statuses = Counter()
+    read_latencies = []
+    clients = [
+        httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app, client=(f"203.0.113.{n + 1}", 40000)),
+                          base_url="http://flood")
+        for n in range(args.attackers)
+    ]
+    reader = httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app, client=("198.51.100.7", 40000)),
+                               base_url="http://flood")
+
+    async def attempt(n: int):
+        response = await clients[n % len(clients)].post("/api/login", data={"username": FLOOD_EMAIL, "password": "wrong"})
+        statuses[response.status_code] += 1
+
+    async def flood():
+        # Open loop: attempts arrive at a fixed rate however slowly the server answers
+        pending = set()
+        n = 0
+        while time.perf_counter() < deadline:
+            task = asyncio.create_task(attempt(n))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+            n += 1
+            await asyncio.sleep(1 / args.rate)
+        await asyncio.gather(*pending)
+
+    async def read_loop():
+        await asyncio.sleep(0.5)  # let the flood build up first
+        index = 0
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await reader.get(READ_PATHS[index % len(READ_PATHS)])
+            response.raise_for_status()
+            read_latencies.append(time.perf_counter() - started)
+            index += 1
+
+    try:
+        await asyncio.gather(read_loop(), flood())
+    finally:
+        for client in clients + [reader]:
+            await client.aclose()
+    return {
+        "admission": "on" if enabled else "off",
+        "reads": len(read_latencies),
+        "read_p50_ms": _percentile(read_latencies, 0.5),
+        "read_p99_ms": _percentile(read_latencies, 0.99),
+        "read_mean_ms": statistics.fmean(read_latencies) * 1000 if read_latencies else 0.0,
+        "login_statuses": dict(sorted(statuses.items())),
+    }
+
+
+async def run(args):
+    _ensure_target()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://flood") as client:
+        for path in READ_PATHS:
+            (await client.get(path)).raise_for_status()  # warm the response cache
+    for enabled in (False, True):
+        before = admission_module.admission.stats()
+        result = await run_phase(enabled, args)
+        after = admission_module.admission.stats()
+        shed = {key: after[key] - before[key] for key in ("admitted", "shed_ip_rate", "shed_queue_full", "shed_deadline")}
+        print(f"admission {result['admission']:<3}  reads {result['reads']:>6}  p50 {result['read_p50_ms']:>8.2f} ms  "
+              f"p99 {result['read_p99_ms']:>8.2f} ms  logins {result['login_statuses']}  {shed}")
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--attackers", type=int, default=8, help="distinct client addresses in the flood")
+    parser.add_argument("--rate", type=float, default=100, help="login attempts per second")
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,43 @@
+"""Measure bcrypt verify throughput of the auth pool per worker thread.
+
+Run from the API directory:
+
+    BCRYPT_ROUNDS=12 python -m benchmarks.auth_throughput --max-workers 4 --ops 64
+
+For each pool size the same number of checkpw calls is pushed through a
+fresh ThreadPoolExecutor, mirroring passwords.py. Near-linear scaling shows
+that bcrypt releases the GIL, and ops/s per worker is the per-core budget to
+size AUTH_WORKERS against expected login peaks.
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import passwords
+
+
+def measure(workers: int, ops: int, hashed: str):
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(lambda _: passwords._verify("benchmark-password", hashed), range(ops)))
+        elapsed = time.perf_counter() - started
+    assert all(results)
+    return ops / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--ops", type=int, default=48)
+    args = parser.parse_args()
+
+    hashed = passwords._hash("benchmark-password")
+    print(f"bcrypt rounds={passwords.BCRYPT_ROUNDS} cpus={os.cpu_count()} ops={args.ops}")
+    for workers in range(1, args.max_workers + 1):
+        rate = measure(workers, args.ops, hashed)
+        print(f"workers={workers:<3} {rate:>8.1f} verifies/s   {rate / workers:>7.1f} per worker")
+
+
+if __name__ == "__main__":
+    main()
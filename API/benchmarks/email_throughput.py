@@ -0,0 +1,77 @@
+"""Measure email delivery throughput (messages/second) against a local SMTP stand-in.
+
+Run from the API directory (needs `pip install aiosmtpd`):
+
+    python -m benchmarks.email_throughput --messages 5000 --concurrency 8
+
+Starts an aiosmtpd server on localhost that accepts and discards mail, fills a
+scratch database's email_queue, then drains it with EmailDeliveryWorker. Pass
+--fail-rate to make the stand-in reject a share of messages and exercise the
+retry/backoff path.
+"""
+import argparse
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    try:
+        from aiosmtpd.controller import Controller # type: ignore
+    except ImportError:
+        sys.exit("aiosmtpd is required: pip install aiosmtpd")
+
+    # Point the app's engines at a scratch database before importing them
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    from sqlalchemy import text # type: ignore
+    from database import Base, engine
+    from email_worker import EmailDeliveryWorker
+
+    class Sink:
+        received = 0
+
+        async def handle_DATA(self, server, session, envelope):
+            if random.random() < args.fail_rate:
+                return "451 Try again later"
+            Sink.received += 1
+            return "250 OK"
+
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    controller = Controller(Sink(), hostname="127.0.0.1", port=port)
+    controller.start()
+
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO email_queue (recipient, subject, body, status, created_at, retry_count) "
+            "VALUES (:recipient, 'Your ticket', 'Thanks for visiting the High.', 'pending', '2026-01-01 00:00:00', 0)"
+        ), [{"recipient": f"visitor{i}@example.com"} for i in range(args.messages)])
+
+    worker = EmailDeliveryWorker(host="127.0.0.1", port=port, concurrency=args.concurrency,
+                                 batch_size=args.batch_size)
+    started = time.perf_counter()
+    totals = worker.drain(max_seconds=3600)
+    elapsed = time.perf_counter() - started
+    worker.close()
+    controller.stop()
+
+    print(f"messages={args.messages} concurrency={args.concurrency} batch={args.batch_size}")
+    print(f"sent={totals['sent']} failed={totals['failed']} batches={totals['batches']} received={Sink.received}")
+    print(f"{totals['sent'] / elapsed:.1f} messages/s ({elapsed:.2f} s)")
+
+
+if __name__ == "__main__":
+    main()
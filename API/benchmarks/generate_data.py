@@ -0,0 +1,222 @@
+"""Fill the configured database (DATABASE_URL) with synthetic data at production scale.
+
+Run from the API directory, ideally against a scratch database:
+
+    DATABASE_URL=sqlite:///./scale.db python -m benchmarks.generate_data
+    DATABASE_URL=sqlite:///./scale.db python -m benchmarks.generate_data --users 50000 --newsletter-logs 200000
+
+Rows are appended, never deleted, and generation is deterministic for a given
+--seed. Every user shares one password hash (password "loadtest") because
+hashing half a million bcrypt passwords would take hours. Afterwards the
+derived data is brought up to date: the full-text index, the materialized
+event occurrences and the table versions that drive ETags.
+"""
+import argparse
+import random
+import time
+from datetime import date, datetime, timedelta
+
+import bcrypt # type: ignore
+from sqlalchemy import insert, func, text # type: ignore
+
+from database import Base, engine, SessionLocal, Event, EventException, Holiday, OperatingHour, User, \
+    NewsletterLog, EmailQueue, Artwork, Newsletter, OccurrenceHorizon
+from migrations import run_migrations
+from occurrences import refresh_occurrence_horizon
+from versioning import bump_version
+import search
+
+BATCH_SIZE = 10000
+PASSWORD = "loadtest"
+DEPARTMENTS = ("European Art", "American Art", "Modern and Contemporary", "Photography",
+               "Decorative Arts and Design", "African Art", "Folk and Self-Taught Art")
+CATEGORIES = ("Tour", "Lecture", "Family", "Film", "Workshop", "Members")
+WORDS = ("light", "river", "portrait", "garden", "study", "harbor", "figure", "still", "life", "evening",
+         "landscape", "woman", "city", "composition", "blue", "red", "morning", "interior", "window", "field")
+LANGS = ("en", "es", "fr")
+
+
+def _title(rng: random.Random, words: int):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def _insert(table, rows, total: int, label: str):
+    """Insert `rows` (a generator) in BATCH_SIZE transactions, reporting throughput."""
+    started = time.perf_counter()
+    batch = []
+    done = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) == BATCH_SIZE:
+            with engine.begin() as conn:
+                conn.execute(insert(table), batch)
+            done += len(batch)
+            batch = []
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(insert(table), batch)
+        done += len(batch)
+    elapsed = time.perf_counter() - started
+    if total:
+        print(f"{label:<16} {done:>10,} rows  {elapsed:>7.1f} s  {done / elapsed if elapsed else 0:>10,.0f} rows/s")
+
+
+def _next_id(table):
+    with engine.connect() as conn:
+        return (conn.execute(func.max(table.c.id).select()).scalar() or 0) + 1
+
+
+def events(rng: random.Random, count: int, today: date):
+    for _ in range(count):
+        recurrence = rng.choices(("none", "weekly", "monthly"), weights=(70, 20, 10))[0]
+        yield {
+            "title": _title(rng, rng.randint(2, 5)),
+            "date": today + timedelta(days=rng.randint(-365, 365)),
+            "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(15, 60))),
+            "image_url": f"https://images.example.org/events/{rng.randint(1, 5000)}.jpg",
+            "category": rng.choice(CATEGORIES),
+            "recurrence": recurrence,
+        }
+
+
+def event_exceptions(rng: random.Random, first_id: int, count: int):
+    with engine.connect() as conn:
+        recurring = conn.execute(
+            text("SELECT id, date FROM events WHERE id >= :first AND recurrence IN ('weekly', 'monthly')"),
+            {"first": first_id},
+        ).fetchall()
+    for event_id, first_date in recurring:
+        first_date = date.fromisoformat(str(first_date))
+        for _ in range(rng.choices((0, 1, 2, 3), weights=(40, 30, 20, 10))[0]):
+            yield {"event_id": event_id, "exception_date": first_date + timedelta(weeks=rng.randint(1, 52))}
+
+
+def artworks(rng: random.Random, first_id: int, count: int):
+    for i in range(first_id, first_id + count):
+        yield {
+            "title": _title(rng, rng.randint(1, 6)),
+            "creator": f"{rng.choice(('Anna', 'Louis', 'Mary', 'Jacob', 'Nellie', 'Bill'))} Artist {rng.randint(1, 4000)}",
+            "image_url": f"https://images.example.org/collection/{i}.jpg",
+            "metadata_info": f"Oil on canvas, {rng.randint(8, 90)} x {rng.randint(8, 90)} in. Gift, {rng.randint(1890, 2025)}.",
+            "department": rng.choice(DEPARTMENTS),
+            "curators_insight": " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 120))),
+        }
+
+
+def users(first_id: int, count: int, hashed_password: str):
+    for i in range(first_id, first_id + count):
+        yield {"email": f"member{i}@loadtest.example.org", "hashed_password": hashed_password, "role": "member"}
+
+
+def newsletter_logs(rng: random.Random, count: int, user_count: int, now: datetime):
+    for _ in range(count):
+        yield {
+            "user_email": f"member{rng.randint(1, max(user_count, 1))}@loadtest.example.org",
+            "sent_at": (now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))).strftime("%Y-%m-%d %H:%M:%S"),
+            "status": "notified",
+        }
+
+
+def emails(rng: random.Random, count: int, user_count: int, now: datetime):
+    for _ in range(count):
+        status = rng.choices(("sent", "pending", "failed"), weights=(90, 8, 2))[0]
+        created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))
+        yield {
+            "recipient": f"member{rng.randint(1, max(user_count, 1))}@loadtest.example.org",
+            "subject": "Your High Museum newsletter",
+            "body": "Read this month's edition at https://high.org/newsletter",
+            "status": status,
+            "created_at": created.strftime("%Y-%m-%d %H:%M:%S"),
+            "retry_count": rng.randint(1, 4) if status == "failed" else 0,
+            "sent_at": (created + timedelta(minutes=1)).strftime("%Y-%m-%d %H:%M:%S") if status == "sent" else None,
+        }
+
+
+def newsletters(rng: random.Random, months: int, today: date):
+    for offset in range(-months + 2, 2):  # includes next month's scheduled edition
+        month_start = date(today.year + (today.month - 1 + offset) // 12, (today.month - 1 + offset) % 12 + 1, 1)
+        for lang in LANGS:
+            yield {
+                "lang": lang,
+                "month": month_start.strftime("%B %Y"),
+                "title": f"{month_start.strftime('%B')} at the High",
+                "subtitle": _title(rng, 4),
+                "introduction": " ".join(rng.choice(WORDS) for _ in range(80)),
+                "sections": [{"title": _title(rng, 3), "content": " ".join(rng.choice(WORDS) for _ in range(150)),
+                              "type": "feature", "image_url": None} for _ in range(4)],
+                "citation": "High Museum of Art",
+                "verification_hash": f"{rng.getrandbits(128):032x}",
+                "publish_at": f"{month_start.isoformat()}T09:00:00",
+            }
+
+
+def holidays(rng: random.Random, count: int, today: date):
+    for i in range(count):
+        yield {"name": f"Closure {i + 1}", "date": today + timedelta(days=rng.randint(-365, 730))}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=10000)
+    parser.add_argument("--artworks", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=500000)
+    parser.add_argument("--newsletter-logs", type=int, default=2000000)
+    parser.add_argument("--emails", type=int, default=1000000)
+    parser.add_argument("--newsletter-months", type=int, default=24)
+    parser.add_argument("--holidays", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=2026)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    search.ensure_artwork_index(engine)
+
+    rng = random.Random(args.seed)
+    today = date.today()
+    now = datetime.now()
+    hashed_password = bcrypt.hashpw(PASSWORD.encode("utf-8"), bcrypt.gensalt(rounds=4)).decode("utf-8")
+    started = time.perf_counter()
+
+    first_event = _next_id(Event.__table__)
+    _insert(Event.__table__, events(rng, args.events, today), args.events, "events")
+    _insert(EventException.__table__, event_exceptions(rng, first_event, args.events), args.events, "event_exceptions")
+    _insert(Holiday.__table__, holidays(rng, args.holidays, today), args.holidays, "holidays")
+
+    first_artwork = _next_id(Artwork.__table__)
+    _insert(Artwork.__table__, artworks(rng, first_artwork, args.artworks), args.artworks, "artworks")
+    if search.fts_available and args.artworks:
+        columns = ", ".join(search.FTS_COLUMNS)
+        with engine.begin() as conn:
+            conn.execute(text(
+                f"INSERT INTO artworks_fts (rowid, {columns}) SELECT id, {columns} FROM artworks WHERE id >= :first"
+            ), {"first": first_artwork})
+
+    user_count = _next_id(User.__table__) - 1 + args.users
+    _insert(User.__table__, users(_next_id(User.__table__), args.users, hashed_password), args.users, "users")
+    _insert(NewsletterLog.__table__, newsletter_logs(rng, args.newsletter_logs, user_count, now),
+            args.newsletter_logs, "newsletter_logs")
+    _insert(EmailQueue.__table__, emails(rng, args.emails, user_count, now), args.emails, "email_queue")
+    _insert(Newsletter.__table__, newsletters(rng, args.newsletter_months, today),
+            args.newsletter_months, "newsletters")
+
+    db = SessionLocal()
+    try:
+        if not db.query(OperatingHour).first():
+            db.add_all([OperatingHour(day=day, hours="10:00 AM - 5:00 PM")
+                        for day in ("Mon", "Tues", "Wed", "Thurs", "Fri", "Sat", "Sun")])
+        # Drop the horizon so the occurrence table is rebuilt from scratch for the new events
+        db.query(OccurrenceHorizon).delete()
+        occurrences = refresh_occurrence_horizon(db, today)
+        bump_version(db, "events", "holidays", "artworks", "operating_hours", "newsletters")
+        db.commit()
+    finally:
+        db.close()
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+    print(f"event_occurrences {occurrences:>10,} rows materialized")
+    print(f"Done in {time.perf_counter() - started:.1f} s. Users log in with password '{PASSWORD}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,470 @@
+"""In-process load harness: p50/p99 latency and throughput for every route in main.py.
+
+Run from the API directory, against a database filled by benchmarks.generate_data:
+
+    DATABASE_URL=sqlite:///./scale.db python -m benchmarks.load --label before
+    DATABASE_URL=sqlite:///./scale.db python -m benchmarks.load --label after --compare benchmarks/results/before.json
+
+Requests go through httpx.ASGITransport straight into the app (middleware,
+dependencies, the response cache, the database), so no server or network is
+involved and the scheduler does not start. Write routes run in create ->
+update -> delete cycles (batch routes delete what the previous batch created,
+imported rows are removed afterwards) so the database ends up the same size
+it started.
+Results are stored as JSON in benchmarks/results/<label>.json; --compare
+prints the change per route against an earlier run and, with
+--fail-on-regression, exits non-zero when any p50/p99 got worse than the
+threshold.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import date, datetime, timedelta
+from io import BytesIO
+
+import httpx # type: ignore
+from fastapi.routing import APIRoute # type: ignore
+from sqlalchemy import func # type: ignore
+
+# Every request comes from one client address, so the per-IP login bucket would
+# turn the auth scenarios into 429s. Export ADMISSION_ENABLED=true to include it.
+os.environ.setdefault("ADMISSION_ENABLED", "false")
+
+import main
+import images
+from bulk import apply_artwork_batch, apply_event_batch, apply_holiday_batch
+from database import SessionLocal, User, Event, Artwork, EventException, NewsletterLog, EmailQueue, Holiday, Newsletter, ImageSource
+from passwords import hash_password_sync
+from table_io import EXPORT_TABLES
+from versioning import bump_version
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+ADMIN_EMAIL = "loadtest-admin@loadtest.example.org"
+MEMBER_EMAIL = "loadtest-member@loadtest.example.org"
+PASSWORD = "loadtest"
+SEARCH_TERMS = ("light", "portrait", "riv", "garden study", "harbor", "blue figure", "evening", "still life")
+# Items created (and deleted again) by each batch request
+BATCH_ITEMS = 10
+# Rows per import upload
+IMPORT_ROWS = 1000
+# Original the image routes serve derivatives of; rendered locally, never fetched
+IMAGE_URL = "https://loadtest.example.org/loadtest-original.jpg"
+# Routes deliberately left out, with the reason printed in the coverage report
+SKIPPED = {
+    ("POST", "/api/admin/newsletter/test-trigger"): "notifies every member; measure with benchmarks.generate_data volumes by hand",
+    ("GET", "/api/images/{content_hash}/{variant}.webp"): "Pillow is not installed, so there are no derivatives to serve",
+    ("GET", "/api/images/source/{url_hash}/{variant}.webp"): "Pillow is not installed, so there are no derivatives to serve",
+}
+
+
+class Scenario:
+    """One route under load. `make(i)` returns (url, request kwargs) for the i-th request."""
+
+    def __init__(self, method: str, route: str, make, requests: int, auth: str = None, on_response=None):
+        self.method = method
+        self.route = route
+        self.make = make
+        self.requests = requests
+        self.auth = auth
+        self.on_response = on_response
+
+    @property
+    def key(self):
+        return f"{self.method} {self.route}"
+
+
+def _ensure_user(db, email: str, role: str):
+    user = db.query(User).filter(User.email == email).first()
+    if user is None:
+        user = User(email=email, hashed_password=hash_password_sync(PASSWORD), role=role)
+        db.add(user)
+        db.commit()
+    return user
+
+
+def _sample_ids(db, column, limit: int = 1000):
+    return [row[0] for row in db.query(column).order_by(func.random()).limit(limit).all()]
+
+
+def _collect(key: str, state: dict):
+    def on_response(response):
+        body = response.json()
+        state.setdefault(key, []).append(body.get("id") or body.get("queue_id"))
+    return on_response
+
+
+def _batch_scenario(route: str, item, requests: int, state: dict):
+    """Each request creates BATCH_ITEMS rows and deletes the ones the previous request created."""
+    def make(i):
+        return route, {"json": {"create": [item(i * BATCH_ITEMS + n) for n in range(BATCH_ITEMS)],
+                                "delete": state.get(route, [])}}
+
+    def on_response(response):
+        state[route] = [result["id"] for result in response.json()["results"] if result["op"] == "create"]
+
+    return Scenario("POST", route, make, requests, auth="admin", on_response=on_response)
+
+
+def _import_upload(run: str, i: int):
+    lines = (json.dumps({"user_email": f"loadtest-import-{run}-{i}-{n}@loadtest.example.org"}) for n in range(IMPORT_ROWS))
+    return {"files": {"file": ("newsletter_logs.ndjson", "\n".join(lines).encode(), "application/x-ndjson")}}
+
+
+def build_scenarios(args, state: dict):
+    reads, writes, auth_ops, bulk = args.requests, args.write_requests, args.auth_requests, args.bulk_requests
+    export_tables = sorted(EXPORT_TABLES)
+    today = date.today()
+    run = datetime.now().strftime("%Y%m%d%H%M%S")
+
+    def cycle(values):
+        values = values or [0]
+        return lambda i: values[i % len(values)]
+
+    artwork_id = cycle(state["artwork_ids"])
+
+    def window(i):
+        start = today.replace(day=1) + timedelta(days=31 * (i % 12 - 3))
+        return {"start": start.isoformat(), "end": (start + timedelta(days=41)).isoformat()}
+
+    event_body = lambda i: {"title": f"Load test event {i}", "date": (today + timedelta(days=i % 200)).isoformat(),
+                            "description": "Synthetic", "category": "Tour", "recurrence": ("none", "weekly", "monthly")[i % 3]}
+    artwork_body = lambda i: {"title": f"Load test artwork {i}", "creator": "Harness", "image_url": "https://example.org/a.jpg",
+                              "metadata_info": "Synthetic", "department": "Photography", "curators_insight": "Synthetic light study"}
+    newsletter_body = lambda i: {"lang": "en", "month": "Load test", "title": f"Load test {i}", "subtitle": "s",
+                                 "introduction": "i", "sections": [], "citation": "c", "verification_hash": "v",
+                                 "publish_at": f"2099-01-01T00:{i // 60 % 60:02d}:{i % 60:02d}"}
+    created = lambda key: (lambda i: state.get(key, [0])[i % max(len(state.get(key, [])), 1)])
+    registered = lambda i: f"loadtest-reg-{run}-{i}@loadtest.example.org"
+    unsubscribe_tokens = lambda i: {"Authorization": f"Bearer {state['unsubscribe_tokens'][i % max(len(state['unsubscribe_tokens']), 1)]}"}
+    variants = sorted(images.VARIANTS)
+    image_scenarios = []
+    if state.get("image"):
+        source_hash, content_hash = state["image"]
+        image_scenarios = [
+            Scenario("GET", "/api/images/{content_hash}/{variant}.webp",
+                     lambda i: (f"/api/images/{content_hash}/{variants[i % len(variants)]}.webp", {}), reads),
+            Scenario("GET", "/api/images/source/{url_hash}/{variant}.webp",
+                     lambda i: (f"/api/images/source/{source_hash}/{variants[i % len(variants)]}.webp", {}), reads),
+        ]
+
+    return [
+        # Public reads
+        Scenario("GET", "/api", lambda i: ("/api", {}), reads),
+        Scenario("GET", "/api/status", lambda i: ("/api/status", {}), reads),
+        Scenario("GET", "/api/hours", lambda i: ("/api/hours", {}), reads),
+        Scenario("GET", "/api/hours/calendar", lambda i: ("/api/hours/calendar", {}), reads),
+        Scenario("GET", "/api/status/now", lambda i: ("/api/status/now", {}), reads),
+        Scenario("GET", "/api/holidays", lambda i: ("/api/holidays", {}), reads),
+        Scenario("GET", "/api/events", lambda i: ("/api/events", {"params": window(i)}), reads),
+        Scenario("GET", "/api/artworks", lambda i: ("/api/artworks", {"params": {"view": "list", "limit": 50, "after": artwork_id(i)}}), reads),
+        Scenario("GET", "/api/artworks/search", lambda i: ("/api/artworks/search", {"params": {"q": SEARCH_TERMS[i % len(SEARCH_TERMS)]}}), reads),
+        Scenario("GET", "/api/artworks/{artwork_id}", lambda i: (f"/api/artworks/{artwork_id(i)}", {}), reads),
+        Scenario("GET", "/api/newsletter", lambda i: ("/api/newsletter", {"headers": {"Accept-Language": ("en", "es", "fr")[i % 3]}}), reads, auth="member"),
+        *image_scenarios,
+        # Admin reads
+        Scenario("GET", "/api/admin/holidays", lambda i: ("/api/admin/holidays", {}), reads),
+        Scenario("GET", "/api/admin/events", lambda i: ("/api/admin/events", {}), reads),
+        Scenario("GET", "/api/admin/artworks", lambda i: ("/api/admin/artworks", {"params": {"view": "list", "limit": 200, "after": artwork_id(i)}}), reads),
+        Scenario("GET", "/api/admin/newsletters", lambda i: ("/api/admin/newsletters", {}), reads, auth="admin"),
+        Scenario("GET", "/api/admin/newsletter/logs", lambda i: ("/api/admin/newsletter/logs", {}), reads, auth="admin"),
+        Scenario("GET", "/api/admin/users", lambda i: ("/api/admin/users", {}), reads, auth="admin"),
+        Scenario("GET", "/api/admin/metrics", lambda i: ("/api/admin/metrics", {}), reads, auth="admin"),
+        Scenario("GET", "/api/admin/auth/metrics", lambda i: ("/api/admin/auth/metrics", {}), reads, auth="admin"),
+        Scenario("GET", "/api/admin/cache", lambda i: ("/api/admin/cache", {}), reads, auth="admin"),
+        Scenario("GET", "/api/admin/jobs", lambda i: ("/api/admin/jobs", {}), reads, auth="admin"),
+        # Bulk export / import; whole tables, so far fewer requests
+        Scenario("GET", "/api/admin/export/{table}", lambda i: (f"/api/admin/export/{export_tables[i % len(export_tables)]}", {
+            "params": {"format": ("ndjson", "csv")[i // 3 % 2]}}), bulk, auth="admin"),
+        Scenario("POST", "/api/admin/import/{table}", lambda i: ("/api/admin/import/newsletter_logs", _import_upload(run, i)),
+                 bulk, auth="admin"),
+        # Auth (bcrypt bound)
+        Scenario("POST", "/api/login", lambda i: ("/api/login", {"data": {"username": MEMBER_EMAIL, "password": PASSWORD}}), auth_ops),
+        Scenario("POST", "/api/register", lambda i: ("/api/register", {"json": {"email": registered(i), "password": PASSWORD}}), auth_ops * 2),
+        Scenario("POST", "/api/membership/cancel", lambda i: ("/api/membership/cancel", {"json": {
+            "email": registered(i), "password": PASSWORD, "confirm_password": PASSWORD}}), auth_ops),
+        Scenario("DELETE", "/api/membership/unsubscribe", lambda i: ("/api/membership/unsubscribe", {"headers": unsubscribe_tokens(i)}), auth_ops),
+        Scenario("POST", "/api/admin/users", lambda i: ("/api/admin/users", {"json": {
+            "email": f"loadtest-staff-{run}-{i}@loadtest.example.org", "password": PASSWORD}}), auth_ops, auth="admin",
+            on_response=_collect("admin_user_ids", state)),
+        Scenario("DELETE", "/api/admin/users/{user_id}", lambda i: (f"/api/admin/users/{created('admin_user_ids')(i)}", {}), auth_ops, auth="admin"),
+        # Write cycles
+        Scenario("POST", "/api/holidays", lambda i: ("/api/holidays", {"json": {"name": f"Load test {i}", "date": (today + timedelta(days=i)).isoformat()}}),
+                 writes, auth="admin", on_response=_collect("holiday_ids", state)),
+        Scenario("PUT", "/api/holidays/{holiday_id}", lambda i: (f"/api/holidays/{created('holiday_ids')(i)}", {"json": {
+            "name": f"Load test {i} (moved)", "date": (today + timedelta(days=i + 1)).isoformat()}}), writes, auth="admin"),
+        Scenario("DELETE", "/api/holidays/{holiday_id}", lambda i: (f"/api/holidays/{created('holiday_ids')(i)}", {}), writes, auth="admin"),
+        _batch_scenario("/api/holidays/batch", lambda i: {"name": f"Load test batch {i}", "date": (today + timedelta(days=i % 365)).isoformat()},
+                        writes, state),
+        Scenario("POST", "/api/events", lambda i: ("/api/events", {"json": event_body(i)}), writes, auth="admin",
+                 on_response=_collect("event_ids_created", state)),
+        Scenario("PUT", "/api/events/{event_id}", lambda i: (f"/api/events/{created('event_ids_created')(i)}", {"json": event_body(i + 1)}), writes, auth="admin"),
+        Scenario("POST", "/api/events/{event_id}/exceptions", lambda i: (f"/api/events/{created('event_ids_created')(i)}/exceptions", {"json": {
+            "exception_date": (today + timedelta(days=7 * (1 + i % 20))).isoformat()}}), writes, auth="admin"),
+        Scenario("DELETE", "/api/events/{event_id}/exceptions/{date_str}", lambda i: (
+            f"/api/events/{created('event_ids_created')(i)}/exceptions/{(today + timedelta(days=7 * (1 + i % 20))).isoformat()}", {}), writes, auth="admin"),
+        Scenario("DELETE", "/api/events/{event_id}", lambda i: (f"/api/events/{created('event_ids_created')(i)}", {}), writes, auth="admin"),
+        _batch_scenario("/api/events/batch", event_body, writes, state),
+        Scenario("POST", "/api/artworks", lambda i: ("/api/artworks", {"json": artwork_body(i)}), writes, auth="admin",
+                 on_response=_collect("artwork_ids_created", state)),
+        Scenario("PUT", "/api/artworks/{artwork_id}", lambda i: (f"/api/artworks/{created('artwork_ids_created')(i)}", {"json": artwork_body(i + 1)}), writes, auth="admin"),
+        Scenario("DELETE", "/api/artworks/{artwork_id}", lambda i: (f"/api/artworks/{created('artwork_ids_created')(i)}", {}), writes, auth="admin"),
+        _batch_scenario("/api/artworks/batch", artwork_body, writes, state),
+        Scenario("POST", "/api/admin/newsletter", lambda i: ("/api/admin/newsletter", {"json": newsletter_body(i)}), writes, auth="admin"),
+        Scenario("DELETE", "/api/admin/newsletter/{news_id}", lambda i: (f"/api/admin/newsletter/{created('newsletter_ids')(i)}", {}), writes, auth="admin"),
+        Scenario("POST", "/api/email/queue", lambda i: ("/api/email/queue", {"json": {
+            "recipient": MEMBER_EMAIL, "subject": "Load test", "body": "Synthetic"}}), writes,
+            on_response=_collect("email_ids", state)),
+        Scenario("DELETE", "/api/admin/cache", lambda i: ("/api/admin/cache", {}), reads, auth="admin"),
+    ]
+
+
+async def run_scenario(client, scenario: Scenario, concurrency: int, tokens: dict, cold: bool):
+    latencies = []
+    statuses = {}
+    sizes = []
+    remaining = iter(range(scenario.requests))
+    headers = {"Authorization": f"Bearer {tokens[scenario.auth]}"} if scenario.auth else {}
+
+    async def worker():
+        for i in remaining:
+            url, kwargs = scenario.make(i)
+            kwargs = dict(kwargs)
+            kwargs["headers"] = {**headers, **kwargs.get("headers", {})}
+            if cold:
+                main.reference_cache.clear()
+                main.edition_resolver.invalidate()
+            started = time.perf_counter()
+            response = await client.request(scenario.method, url, **kwargs)
+            latencies.append(time.perf_counter() - started)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            sizes.append(len(response.content))
+            if scenario.on_response and response.status_code < 300:
+                scenario.on_response(response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for code, count in statuses.items() if code >= 400)
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "rps": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000 if latencies else 0.0,
+        "max_ms": latencies[-1] * 1000 if latencies else 0.0,
+        "avg_bytes": int(statistics.mean(sizes)) if sizes else 0,
+        "errors": errors,
+        "statuses": {str(code): count for code, count in sorted(statuses.items())},
+    }
+
+
+def _prepare_image(db):
+    """A ready image source with derivatives on disk, rendered from a synthetic original. None without Pillow.
+
+    The image routes then measure serving a derivative; fetching and rendering
+    a remote original on first request is network bound and not measured.
+    """
+    if images.Image is None:
+        return None
+    buffer = BytesIO()
+    images.Image.effect_noise((2400, 1600), 48).convert("RGB").save(buffer, "JPEG", quality=90)
+    data = buffer.getvalue()
+    content_hash = hashlib.sha256(data).hexdigest()[:32]
+    width, height, outputs = images.render_variants(data)
+    for name, payload in outputs.items():
+        images.store.put(content_hash, name, payload)
+    source = db.query(ImageSource).filter(ImageSource.url == IMAGE_URL).first()
+    if source is None:
+        source = ImageSource(url=IMAGE_URL, url_hash=images.url_hash(IMAGE_URL))
+        db.add(source)
+    source.content_hash, source.width, source.height, source.status = content_hash, width, height, "ready"
+    source.updated_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    db.commit()
+    return source.url_hash, content_hash
+
+
+def prepare_state():
+    db = SessionLocal()
+    try:
+        _ensure_user(db, ADMIN_EMAIL, "super_admin")
+        _ensure_user(db, MEMBER_EMAIL, "member")
+        return {
+            "event_ids": _sample_ids(db, Event.id),
+            "artwork_ids": _sample_ids(db, Artwork.id),
+            "image": _prepare_image(db),
+            "row_counts": {model.__tablename__: db.query(func.count(model.id)).scalar()
+                           for model in (Event, EventException, Artwork, User, Holiday, Newsletter, NewsletterLog, EmailQueue)},
+        }
+    finally:
+        db.close()
+
+
+# Batch route -> (apply function, batch schema, table); rows the last request created are removed after the scenario
+_BATCH_CLEANUP = {
+    "/api/holidays/batch": (apply_holiday_batch, main.HolidayBatch, "holidays"),
+    "/api/events/batch": (apply_event_batch, main.EventBatch, "events"),
+    "/api/artworks/batch": (apply_artwork_batch, main.ArtworkBatch, "artworks"),
+}
+
+
+def _between_scenarios(scenario: Scenario, state: dict):
+    """Bookkeeping a later scenario in a write cycle depends on."""
+    if scenario.route in _BATCH_CLEANUP and state.get(scenario.route):
+        apply, schema, table = _BATCH_CLEANUP[scenario.route]
+        db = SessionLocal()
+        try:
+            apply(db, schema(delete=state.pop(scenario.route)))
+            bump_version(db, table)
+            db.commit()
+        finally:
+            db.close()
+    elif scenario.key == "POST /api/admin/import/{table}":
+        db = SessionLocal()
+        try:
+            db.query(NewsletterLog).filter(NewsletterLog.user_email.like("loadtest-import-%")).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+    elif scenario.key == "POST /api/admin/newsletter":
+        db = SessionLocal()
+        try:
+            state["newsletter_ids"] = [row[0] for row in db.query(Newsletter.id).filter(Newsletter.month == "Load test").all()]
+        finally:
+            db.close()
+    elif scenario.key == "POST /api/membership/cancel":
+        # Registered users the cancel scenario did not consume are removed through unsubscribe
+        db = SessionLocal()
+        try:
+            emails = [row[0] for row in db.query(User.email).filter(User.email.like("loadtest-reg-%")).all()]
+        finally:
+            db.close()
+        state["unsubscribe_tokens"] = [main.create_access_token({"sub": email, "role": "member"}) for email in emails]
+    elif scenario.key == "POST /api/email/queue":
+        db = SessionLocal()
+        try:
+            db.query(EmailQueue).filter(EmailQueue.id.in_(state.get("email_ids", []))).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+async def run_all(args, state: dict):
+    transport = httpx.ASGITransport(app=main.app)
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://load") as client:
+        tokens = {}
+        for role, email in (("admin", ADMIN_EMAIL), ("member", MEMBER_EMAIL)):
+            response = await client.post("/api/login", data={"username": email, "password": PASSWORD})
+            response.raise_for_status()
+            tokens[role] = response.json()["access_token"]
+
+        for scenario in build_scenarios(args, state):
+            if args.only and not any(fragment in scenario.key for fragment in args.only):
+                continue
+            concurrency = 1 if scenario.method != "GET" else args.concurrency
+            result = await run_scenario(client, scenario, concurrency, tokens, args.cold)
+            results[scenario.key] = result
+            _between_scenarios(scenario, state)
+            print(f"{scenario.key:<52} {result['rps']:>8.1f} req/s  p50 {result['p50_ms']:>8.2f} ms  "
+                  f"p99 {result['p99_ms']:>8.2f} ms  {result['avg_bytes']:>9,} B  errors {result['errors']}")
+    return results
+
+
+def coverage(results: dict):
+    exercised = set(results)
+    missing = []
+    for route in main.app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        for method in route.methods:
+            key = f"{method} {route.path}"
+            if key not in exercised:
+                missing.append((key, SKIPPED.get((method, route.path), "no scenario")))
+    return missing
+
+
+def _git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def compare(current: dict, baseline_path: str, threshold: float):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} ({baseline['meta'].get('label')}, {baseline['meta'].get('git_revision')}):")
+    regressions = []
+    for key, result in current.items():
+        before = baseline["routes"].get(key)
+        if not before:
+            continue
+        changes = []
+        for metric in ("p50_ms", "p99_ms"):
+            delta = (result[metric] - before[metric]) / before[metric] if before[metric] else 0.0
+            changes.append(f"{metric} {before[metric]:>8.2f} -> {result[metric]:>8.2f} ({delta:+.0%})")
+            if delta > threshold:
+                regressions.append(key)
+        print(f"{key:<52} " + "  ".join(changes))
+    return sorted(set(regressions))
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=500, help="requests per read route")
+    parser.add_argument("--write-requests", type=int, default=100, help="requests per write route")
+    parser.add_argument("--auth-requests", type=int, default=10, help="requests per bcrypt-bound route")
+    parser.add_argument("--bulk-requests", type=int, default=10, help="requests per export/import route")
+    parser.add_argument("--concurrency", type=int, default=20, help="concurrent clients on read routes")
+    parser.add_argument("--cold", action="store_true", help="clear response caches before every request")
+    parser.add_argument("--only", nargs="*", help="run only routes containing one of these fragments")
+    parser.add_argument("--label", default=datetime.now().strftime("%Y%m%d-%H%M%S"))
+    parser.add_argument("--compare", help="earlier results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative p50/p99 increase counted as a regression")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    state = prepare_state()
+    print(f"label={args.label} concurrency={args.concurrency} cold={args.cold} rows={state['row_counts']}")
+    results = asyncio.run(run_all(args, state))
+
+    if not args.only:
+        for key, reason in coverage(results):
+            print(f"not measured: {key} ({reason})")
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{args.label}.json")
+    with open(path, "w") as f:
+        json.dump({
+            "meta": {
+                "label": args.label,
+                "created_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "git_revision": _git_revision(),
+                "python": platform.python_version(),
+                "cpus": os.cpu_count(),
+                "args": vars(args),
+                "row_counts": state["row_counts"],
+            },
+            "routes": results,
+        }, f, indent=2)
+    print(f"Results written to {path}")
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"Regressed beyond {args.threshold:.0%}: {', '.join(regressions)}")
+            if args.fail_on_regression:
+                raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main_cli()
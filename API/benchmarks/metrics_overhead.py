@@ -0,0 +1,60 @@
+"""Measure the per-request cost of MetricsMiddleware.
+
+Run from the API directory:
+
+    python -m benchmarks.metrics_overhead --requests 200000 --budget-us 25
+
+A trivial ASGI app is called directly (no HTTP, no sockets) with and without
+the middleware, so the difference is the recording overhead alone. Exits
+non-zero if it exceeds the budget, which makes it usable as a CI gate.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+from metrics import MetricsMiddleware, MetricsRegistry
+
+
+class _Route:
+    path = "/api/hours"
+
+
+async def trivial_app(scope, receive, send):
+    scope["route"] = _Route
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def drive(app, requests: int):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app({"type": "http", "method": "GET", "path": "/api/hours"}, receive, send)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200_000)
+    parser.add_argument("--budget-us", type=float, default=25.0)
+    args = parser.parse_args()
+
+    wrapped = MetricsMiddleware(trivial_app, MetricsRegistry())
+    bare = min(asyncio.run(drive(trivial_app, args.requests)) for _ in range(3))
+    instrumented = min(asyncio.run(drive(wrapped, args.requests)) for _ in range(3))
+    overhead_us = (instrumented - bare) / args.requests * 1e6
+
+    print(f"bare         {bare / args.requests * 1e6:8.2f} us/request")
+    print(f"instrumented {instrumented / args.requests * 1e6:8.2f} us/request")
+    print(f"overhead     {overhead_us:8.2f} us/request (budget {args.budget_us} us)")
+    sys.exit(0 if overhead_us <= args.budget_us else 1)
+
+
+if __name__ == "__main__":
+    main()
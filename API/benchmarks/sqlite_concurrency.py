@@ -0,0 +1,100 @@
+"""Show whether readers stall behind writers on the SQLite file.
+
+Run from the API directory:
+
+    python -m benchmarks.sqlite_concurrency --seconds 5 --readers 8 --writers 2
+
+Writer threads insert and commit email_queue rows in a tight loop (like the
+queue job and admin edits) while reader threads run the holidays query that
+backs GET endpoints. The same workload runs twice against a scratch file:
+once with SQLite defaults (rollback journal, no busy timeout) and once with
+the tuned engines from database.py (WAL, busy_timeout, read-only pool).
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import text # type: ignore
+from sqlalchemy.exc import OperationalError # type: ignore
+
+from database import Base, make_engine
+
+
+def run(url: str, tuned: bool, seconds: float, readers: int, writers: int):
+    write_engine = make_engine(url, tuned=tuned, pool_size=writers)
+    read_engine = make_engine(url, read_only=tuned, tuned=tuned, pool_size=readers)
+    Base.metadata.create_all(bind=write_engine)
+    with write_engine.begin() as conn:
+        conn.execute(text("INSERT INTO holidays (name, date) VALUES ('Bench Day', '2026-01-01')"))
+
+    stop = time.perf_counter() + seconds
+    latencies, locked, writes = [], [0], [0]
+    lock = threading.Lock()
+
+    def reader():
+        local = []
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            try:
+                with read_engine.connect() as conn:
+                    conn.execute(text("SELECT name, date FROM holidays")).fetchall()
+                local.append(time.perf_counter() - started)
+            except OperationalError:
+                with lock:
+                    locked[0] += 1
+        with lock:
+            latencies.extend(local)
+
+    def writer():
+        while time.perf_counter() < stop:
+            try:
+                with write_engine.begin() as conn:
+                    conn.execute(text(
+                        "INSERT INTO email_queue (recipient, subject, body, status, created_at, retry_count) "
+                        "VALUES ('bench@example.com', 's', :body, 'pending', :now, 0)"
+                    ), {"body": "x" * 2048, "now": datetime.now().isoformat()})
+                with lock:
+                    writes[0] += 1
+            except OperationalError:
+                with lock:
+                    locked[0] += 1
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)]
+    threads += [threading.Thread(target=writer) for _ in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    write_engine.dispose()
+    read_engine.dispose()
+
+    latencies.sort()
+    return {
+        "reads/s": len(latencies) / seconds,
+        "writes/s": writes[0] / seconds,
+        "read p50 ms": statistics.median(latencies) * 1000 if latencies else float("nan"),
+        "read p99 ms": latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float("nan"),
+        "locked errors": locked[0],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    args = parser.parse_args()
+
+    for label, tuned in (("defaults", False), ("tuned", True)):
+        with tempfile.TemporaryDirectory() as tmp:
+            url = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+            result = run(url, tuned, args.seconds, args.readers, args.writers)
+        print(f"{label:<9} " + "   ".join(f"{k} {v:.1f}" if isinstance(v, float) else f"{k} {v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
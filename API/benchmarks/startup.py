@@ -0,0 +1,130 @@
+"""Import time, time to first request and worker memory: `uvicorn --workers` vs `python -m serve`.
+
+Run from the API directory (uvicorn must be installed):
+
+    DATABASE_URL=sqlite:///./scale.db python -m benchmarks.startup --workers 4
+
+"import" is a fresh interpreter importing main, with and without the schema
+setup that runs at import time. Each server mode is then started as a
+subprocess, and the report shows:
+- ready: the time until /api/events first answers 200
+- first N: p50 and max latency of the first requests spread over the public
+  routes (cold workers show up in the max)
+- pss: the proportional set size of the whole process tree (Linux only), where
+  memory shared copy-on-write is counted once
+"""
+import argparse
+import os
+import signal
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROUTES = ("/api/events", "/api/hours", "/api/holidays", "/api/artworks", "/api/status")
+
+
+def import_seconds(setup_on_import: bool, repeat: int):
+    env = dict(os.environ, SCHEMA_SETUP_ON_IMPORT="true" if setup_on_import else "false")
+    code = "import time; t = time.perf_counter(); import main; print(time.perf_counter() - t)"
+    samples = []
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        samples.append(float(output.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+
+def _get(url: str):
+    started = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=10) as response:
+        response.read()
+        return response.status, time.perf_counter() - started
+
+
+def _descendants(pid: int):
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            for child in f.read().split():
+                pids.extend(_descendants(int(child)))
+    except OSError:
+        pass
+    return pids
+
+
+def _pss_mb(pid: int):
+    total = 0
+    for process in _descendants(pid):
+        try:
+            with open(f"/proc/{process}/smaps_rollup") as f:
+                for line in f:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1])
+        except OSError:
+            return None
+    return total / 1024
+
+
+def run_server(label: str, command, port: int, first: int, settle: float):
+    base = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"{label} exited with {process.returncode}")
+            try:
+                if _get(base + ROUTES[0])[0] == 200:
+                    break
+            except OSError:
+                time.sleep(0.02)
+        ready = time.perf_counter() - started
+        latencies = [_get(base + ROUTES[i % len(ROUTES)])[1] for i in range(first)]
+        time.sleep(settle)  # let every worker finish starting before measuring memory
+        pss = _pss_mb(process.pid)
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    latencies.sort()
+    return {
+        "mode": label,
+        "ready_s": ready,
+        "first_p50_ms": statistics.median(latencies) * 1000,
+        "first_max_ms": latencies[-1] * 1000,
+        "pss_mb": pss,
+    }
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--first", type=int, default=20, help="requests timed after the server is ready")
+    parser.add_argument("--repeat", type=int, default=3, help="interpreter starts per import measurement")
+    parser.add_argument("--settle", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"import main (schema setup at import)   {import_seconds(True, args.repeat) * 1000:>8.0f} ms")
+    print(f"import main (SCHEMA_SETUP_ON_IMPORT=0) {import_seconds(False, args.repeat) * 1000:>8.0f} ms")
+
+    modes = [
+        ("uvicorn --workers", [sys.executable, "-m", "uvicorn", "main:app", "--workers", str(args.workers),
+                               "--port", str(args.port), "--log-level", "warning"]),
+        ("serve --no-warmup", [sys.executable, "-m", "serve", "--workers", str(args.workers),
+                               "--port", str(args.port), "--log-level", "warning", "--no-warmup"]),
+        ("serve", [sys.executable, "-m", "serve", "--workers", str(args.workers),
+                   "--port", str(args.port), "--log-level", "warning"]),
+    ]
+    for label, command in modes:
+        result = run_server(label, command, args.port, args.first, args.settle)
+        pss = f"{result['pss_mb']:>7.1f} MB" if result["pss_mb"] is not None else "    n/a"
+        print(f"{label:<18} workers {args.workers}  ready {result['ready_s']:>6.2f} s  "
+              f"first {args.first}: p50 {result['first_p50_ms']:>7.2f} ms  max {result['first_max_ms']:>8.2f} ms  pss {pss}")
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,140 @@
+from sqlalchemy import insert, update, delete # type: ignore
+from database import Event, EventException, Artwork, Holiday
+from occurrences import rebuild_occurrences_for
+from search import index_artworks, unindex_artworks
+
+# Items (creates + updates + deletes + exception changes) accepted in one batch
+BATCH_MAX_ITEMS = 1000
+
+EVENT_FIELDS = ("title", "date", "description", "image_url", "category", "recurrence")
+ARTWORK_FIELDS = ("title", "creator", "image_url", "metadata_info", "department", "curators_insight")
+HOLIDAY_FIELDS = ("name", "date")
+
+SUCCESS_STATUSES = {"created", "updated", "deleted", "added", "removed"}
+
+
+def batch_size(batch):
+    return sum(len(items) for name, items in batch if isinstance(items, list))
+
+
+def failed(results):
+    return [result for result in results if result["status"] not in SUCCESS_STATUSES]
+
+
+def _existing_ids(db, model, ids):
+    ids = set(ids)
+    if not ids:
+        return set()
+    return {row[0] for row in db.query(model.id).filter(model.id.in_(ids))}
+
+
+def _apply_rows(db, model, fields, batch, results):
+    """Bulk creates, updates and deletes of one model. Returns (created rows, updated rows, deleted ids)."""
+    created = []
+    if batch.create:
+        rows = [{f: getattr(item, f) for f in fields} for item in batch.create]
+        # One multi-row INSERT ... RETURNING; ids come back in parameter order
+        new_ids = db.execute(insert(model).returning(model.id, sort_by_parameter_order=True), rows).scalars().all()
+        for index, (row, new_id) in enumerate(zip(rows, new_ids)):
+            created.append({"id": new_id, **row})
+            results.append({"op": "create", "index": index, "id": new_id, "status": "created"})
+
+    updated = []
+    if batch.update:
+        found = _existing_ids(db, model, [item.id for item in batch.update])
+        for index, item in enumerate(batch.update):
+            if item.id in found:
+                updated.append({"id": item.id, **{f: getattr(item, f) for f in fields}})
+            results.append({"op": "update", "index": index, "id": item.id,
+                            "status": "updated" if item.id in found else "not_found"})
+        if updated:
+            db.execute(update(model), updated)  # bulk UPDATE by primary key
+
+    deleted = []
+    if batch.delete:
+        found = _existing_ids(db, model, batch.delete)
+        for index, item_id in enumerate(batch.delete):
+            results.append({"op": "delete", "index": index, "id": item_id,
+                            "status": "deleted" if item_id in found else "not_found"})
+        deleted = sorted(found)
+        if deleted:
+            db.execute(delete(model).where(model.id.in_(deleted)))
+    return created, updated, deleted
+
+
+def apply_event_batch(db, batch):
+    """Apply an event batch, keeping exceptions and materialized occurrences in step. Caller commits.
+
+    Returns (per-item results, ids of events whose row changed, deleted ids).
+    """
+    results = []
+    created, updated, deleted = _apply_rows(db, Event, EVENT_FIELDS, batch, results)
+    changed = {row["id"] for row in created} | {row["id"] for row in updated}
+
+    if batch.add_exceptions:
+        event_ids = {change.event_id for change in batch.add_exceptions}
+        live = _existing_ids(db, Event, event_ids)
+        existing = set(db.query(EventException.event_id, EventException.exception_date).filter(
+            EventException.event_id.in_(event_ids)
+        ).all())
+        rows = []
+        for index, change in enumerate(batch.add_exceptions):
+            key = (change.event_id, change.exception_date)
+            if change.event_id not in live:
+                status = "not_found"
+            elif key in existing:
+                status = "duplicate"
+            else:
+                status = "added"
+                existing.add(key)
+                rows.append({"event_id": change.event_id, "exception_date": change.exception_date})
+                changed.add(change.event_id)
+            results.append({"op": "add_exception", "index": index, "id": change.event_id, "status": status})
+        if rows:
+            db.execute(insert(EventException), rows)
+
+    if batch.remove_exceptions:
+        event_ids = {change.event_id for change in batch.remove_exceptions}
+        existing = {
+            (event_id, exception_date): exception_id
+            for exception_id, event_id, exception_date in db.query(
+                EventException.id, EventException.event_id, EventException.exception_date
+            ).filter(EventException.event_id.in_(event_ids))
+        }
+        doomed = []
+        for index, change in enumerate(batch.remove_exceptions):
+            exception_id = existing.pop((change.event_id, change.exception_date), None)
+            if exception_id is not None:
+                doomed.append(exception_id)
+                changed.add(change.event_id)
+            results.append({"op": "remove_exception", "index": index, "id": change.event_id,
+                            "status": "removed" if exception_id is not None else "not_found"})
+        if doomed:
+            db.execute(delete(EventException).where(EventException.id.in_(doomed)))
+
+    if deleted:
+        db.execute(delete(EventException).where(EventException.event_id.in_(deleted)))
+    changed -= set(deleted)
+    # Deleted events have no row left, so rebuilding them just drops their occurrences
+    rebuild_occurrences_for(db, changed | set(deleted))
+    return results, changed, deleted
+
+
+def apply_artwork_batch(db, batch):
+    """Apply an artwork batch and its full-text index changes. Caller commits.
+
+    Returns (per-item results, changed rows, deleted ids).
+    """
+    results = []
+    created, updated, deleted = _apply_rows(db, Artwork, ARTWORK_FIELDS, batch, results)
+    changed = [row for row in created + updated if row["id"] not in set(deleted)]
+    unindex_artworks(db, deleted)
+    index_artworks(db, changed)
+    return results, changed, deleted
+
+
+def apply_holiday_batch(db, batch):
+    """Apply a holiday batch. Caller commits. Returns (per-item results, changed rows, deleted ids)."""
+    results = []
+    created, updated, deleted = _apply_rows(db, Holiday, HOLIDAY_FIELDS, batch, results)
+    return results, [row for row in created + updated if row["id"] not in set(deleted)], deleted
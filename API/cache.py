@@ -0,0 +1,185 @@
+"""Per-process caches of database reads, and the rule they all follow.
+
+Writes committed through this process drop the affected entries at once.
+Writes made by other processes (other serve workers, the external scheduler)
+are caught by a version check here, and by the TTL in the smaller caches
+(principals.py, newsletter_editions.py), so there the TTL is the bound on
+staleness across processes.
+"""
+import threading
+import time
+from collections import OrderedDict
+from fastapi import Request # type: ignore
+from sqlalchemy import event # type: ignore
+from database import SessionLocal
+from fastjson import dumps, compress, encoded_response
+from versioning import current_versions, current_versions_async, validator_headers, is_not_modified, not_modified_response
+
+# Every lookup checks table_versions, so the TTL only lets go of entries nobody asks for
+REFERENCE_CACHE_TTL_SECONDS = 300
+REFERENCE_CACHE_MAX_ENTRIES = 512
+REFERENCE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class CachedResponse:
+    __slots__ = ("tables", "versions", "body", "gzipped", "headers", "expires_at")
+
+    def __init__(self, tables, versions, body: bytes, gzipped, headers: dict, expires_at: float):
+        self.tables = tables
+        self.versions = versions  # {table: version} the body was built from
+        self.body = body
+        self.gzipped = gzipped  # compressed once at store time; None for small bodies
+        self.headers = headers
+        self.expires_at = expires_at
+
+    @property
+    def size(self):
+        return len(self.body) + len(self.gzipped or b"")
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized JSON responses, bounded by entry count and bytes.
+
+    Entries are keyed by (tables, variant) and dropped when any of their tables
+    is invalidated, their table versions have moved on, or their TTL runs out.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, max_bytes: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.stale = 0
+        self.generation = 0
+
+    def get(self, key, versions: dict = None):
+        """Entry for key, or None if missing, expired or built from other table versions."""
+        with self._lock:
+            entry = self._entries.get(key)
+            outdated = entry is not None and versions is not None and entry.versions != versions
+            if entry is None or outdated or entry.expires_at <= time.monotonic():
+                if entry is not None:
+                    self._remove(key)
+                if outdated:
+                    self.stale += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key, tables, body: bytes, headers: dict, generation: int = None, versions: dict = None):
+        """Store an entry; skipped if an invalidation happened since `generation` was read."""
+        entry = CachedResponse(tables, versions, body, compress(body), headers, time.monotonic() + self.ttl)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return entry
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+        return entry
+
+    def invalidate(self, *tables: str):
+        with self._lock:
+            self.generation += 1
+            stale = [key for key, entry in self._entries.items() if entry.tables & set(tables)]
+            for key in stale:
+                self._remove(key)
+            self.invalidations += len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "stale": self.stale,
+                "ttl_seconds": self.ttl,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+
+
+reference_cache = ResponseCache(
+    REFERENCE_CACHE_TTL_SECONDS, REFERENCE_CACHE_MAX_ENTRIES, REFERENCE_CACHE_MAX_BYTES
+)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _invalidate_after_commit(session):
+    # bump_version() records touched tables; drop cached copies only once the write is visible
+    tables = session.info.pop("bumped_tables", None)
+    if tables:
+        reference_cache.invalidate(*tables)
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _forget_after_rollback(session):
+    session.info.pop("bumped_tables", None)
+
+
+def cached_json_response(request: Request, tables, build, variant: str = ""):
+    """Serve a read-through cached JSON response with ETag revalidation.
+
+    Every call reads the table versions once (a primary-key lookup), so a copy
+    stored before another process wrote is never served. On a hit that is the
+    only SQL; on a miss a matching If-None-Match gets a 304, otherwise
+    `build()` produces the payload, which is stored already serialized.
+    """
+    tables = frozenset(tables)
+    key = (tables, variant)
+    generation = reference_cache.generation
+    versions, last_modified = current_versions(*sorted(tables))
+    entry = reference_cache.get(key, versions)
+    if entry is None:
+        headers = validator_headers(versions, last_modified, variant)
+        if is_not_modified(request, headers):
+            return not_modified_response(headers, request)
+        entry = reference_cache.set(key, tables, dumps(build()), headers, generation, versions)
+    return _respond(request, entry)
+
+
+async def cached_json_response_async(request: Request, tables, build, variant: str = ""):
+    """Async twin of cached_json_response(); `build` is a coroutine function."""
+    tables = frozenset(tables)
+    key = (tables, variant)
+    generation = reference_cache.generation
+    versions, last_modified = await current_versions_async(*sorted(tables))
+    entry = reference_cache.get(key, versions)
+    if entry is None:
+        headers = validator_headers(versions, last_modified, variant)
+        if is_not_modified(request, headers):
+            return not_modified_response(headers, request)
+        entry = reference_cache.set(key, tables, dumps(await build()), headers, generation, versions)
+    return _respond(request, entry)
+
+
+def _respond(request: Request, entry: CachedResponse):
+    if is_not_modified(request, entry.headers):
+        return not_modified_response(entry.headers, request)
+    return encoded_response(request, entry.body, entry.gzipped, entry.headers)
@@ -1,17 +1,80 @@
-from sqlalchemy import create_engine, Column, Integer, String, Date, JSON
+import os
+from sqlalchemy import create_engine, event, text, Column, Integer, String, Date, JSON, Index
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker
 
-# 1. Create the Database URL
-SQLALCHEMY_DATABASE_URL = "sqlite:///./museum.db"
-
-# 2. Create the SQLAlchemy Engine
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+# 1. Settings (all overridable through the environment)
+SQLALCHEMY_DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./museum.db")
+# Async driver for the same database, e.g. sqlite+aiosqlite:///./museum.db
+ASYNC_DATABASE_URL = os.environ.get(
+    "ASYNC_DATABASE_URL", SQLALCHEMY_DATABASE_URL.replace("sqlite://", "sqlite+aiosqlite://", 1)
 )
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", "10"))
+DB_READ_POOL_SIZE = int(os.environ.get("DB_READ_POOL_SIZE", "10"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.environ.get("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE_KB = int(os.environ.get("SQLITE_CACHE_SIZE_KB", "65536"))
+
+
+def _sqlite_pragmas(read_only: bool):
+    """Connect hook: WAL lets readers proceed while a writer commits, and the
+    busy timeout makes writers queue instead of failing with "database is locked"."""
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
+    return on_connect
+
+
+def make_engine(url: str, read_only: bool = False, pool_size: int = DB_POOL_SIZE, tuned: bool = True):
+    """Build a sync engine; SQLite connections get the pragmas above unless tuned=False."""
+    is_sqlite = make_url(url).get_backend_name() == "sqlite"
+    kwargs = {"pool_size": pool_size, "max_overflow": DB_MAX_OVERFLOW, "pool_pre_ping": not is_sqlite}
+    if is_sqlite:
+        kwargs["connect_args"] = {"check_same_thread": False}
+        if make_url(url).database in (None, "", ":memory:"):
+            kwargs = {"connect_args": kwargs["connect_args"]}  # single shared connection, no pool sizing
+    new_engine = create_engine(url, **kwargs)
+    if is_sqlite and tuned:
+        event.listen(new_engine, "connect", _sqlite_pragmas(read_only))
+    return new_engine
+
 
-# 3. Create a SessionLocal class
+def make_async_engine(url: str, read_only: bool = False, pool_size: int = DB_POOL_SIZE):
+    is_sqlite = make_url(url).get_backend_name() == "sqlite"
+    new_engine = create_async_engine(url, pool_size=pool_size, max_overflow=DB_MAX_OVERFLOW)
+    if is_sqlite:
+        event.listen(new_engine.sync_engine, "connect", _sqlite_pragmas(read_only))
+    return new_engine
+
+
+# 2. Create the SQLAlchemy Engines: one for writes, read-only pools for GET endpoints
+engine = make_engine(SQLALCHEMY_DATABASE_URL)
+read_engine = make_engine(SQLALCHEMY_DATABASE_URL, read_only=True, pool_size=DB_READ_POOL_SIZE)
+async_engine = make_async_engine(ASYNC_DATABASE_URL, read_only=True, pool_size=DB_READ_POOL_SIZE)
+
+# 3. Create session factories (writes, sync reads, async hot public reads)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+def reset_pools(close: bool = True):
+    """Drop pooled connections. A forked worker passes close=False so it never
+    touches (or closes) SQLite handles that belong to its parent."""
+    engine.dispose(close=close)
+    read_engine.dispose(close=close)
+    # Async connections belong to an event loop and cannot be closed from outside it
+    async_engine.sync_engine.dispose(close=False)
 
 # 4. Base class
 Base = declarative_base()
@@ -33,6 +96,22 @@ class EventException(Base):
     id = Column(Integer, primary_key=True, index=True)
     event_id = Column(Integer, index=True) # avoiding ForeignKey for strict sqlite compatibility if pragma foreign_keys is off
     exception_date = Column(Date, index=True)
+    __table_args__ = (Index("ix_event_exceptions_event_date", "event_id", "exception_date"),)
+
+class EventOccurrence(Base):
+    # Materialized expansion of Event.recurrence over a rolling horizon (see occurrences.py)
+    __tablename__ = "event_occurrences"
+    id = Column(Integer, primary_key=True, index=True)
+    event_id = Column(Integer, index=True)
+    occurrence_date = Column(Date)
+    __table_args__ = (Index("ix_event_occurrences_date_event", "occurrence_date", "event_id"),)
+
+class OccurrenceHorizon(Base):
+    # Single row recording which dates event_occurrences currently covers
+    __tablename__ = "occurrence_horizon"
+    id = Column(Integer, primary_key=True, index=True)
+    start_date = Column(Date)
+    end_date = Column(Date)
 
 
 class Holiday(Base):
@@ -40,6 +119,7 @@ class Holiday(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String)
     date = Column(Date)
+    __table_args__ = (Index("ix_holidays_date", "date"),)
 
 class OperatingHour(Base):
     __tablename__ = "operating_hours"
@@ -60,6 +140,44 @@ class NewsletterLog(Base):
     user_email = Column(String)
     sent_at = Column(String) 
     status = Column(String)
+    __table_args__ = (Index("ix_newsletter_logs_user_email", "user_email"),)
+
+class NewsletterDispatch(Base):
+    # Checkpoint of one newsletter run so a crashed dispatch resumes where it stopped
+    __tablename__ = "newsletter_dispatches"
+    id = Column(Integer, primary_key=True, index=True)
+    run_key = Column(String, unique=True) # "2026-01" for the monthly run, "manual-..." for test triggers
+    status = Column(String, default="running") # running, completed
+    last_user_id = Column(Integer, default=0)
+    sent_count = Column(Integer, default=0)
+    started_at = Column(String)
+    updated_at = Column(String)
+    finished_at = Column(String, nullable=True)
+
+class ImageSource(Base):
+    # An original image referenced by an artwork or event; derivatives are cached on disk by content_hash
+    __tablename__ = "image_sources"
+    id = Column(Integer, primary_key=True, index=True)
+    url = Column(String, unique=True)
+    url_hash = Column(String, unique=True) # sha256(url), used in on-demand derivative URLs
+    content_hash = Column(String, nullable=True, index=True) # sha256 of the fetched original
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    status = Column(String, default="pending") # pending, ready, failed
+    error = Column(String, nullable=True)
+    updated_at = Column(String, nullable=True)
+
+class JobLease(Base):
+    # One row per scheduled job; whoever holds the unexpired lease runs the current tick
+    __tablename__ = "job_leases"
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=True) # "host-pid-nonce" of the process running it, NULL when idle
+    expires_at = Column(String, nullable=True) # pushed forward by heartbeats; a lapsed lease can be taken over
+    run_key = Column(String, nullable=True) # tick being run or last run, e.g. "2026-01" or "2026-01-05 09:15"
+    status = Column(String, nullable=True) # running, completed, failed
+    started_at = Column(String, nullable=True)
+    heartbeat_at = Column(String, nullable=True)
+    finished_at = Column(String, nullable=True)
 
 class EmailQueue(Base):
     __tablename__ = "email_queue"
@@ -67,9 +185,20 @@ class EmailQueue(Base):
     recipient = Column(String)
     subject = Column(String)
     body = Column(String)
-    status = Column(String, default="pending") # pending, sent, failed
+    status = Column(String, default="pending") # pending, sending (leased), sent, failed
     created_at = Column(String)
     retry_count = Column(Integer, default=0)
+    sent_at = Column(String, nullable=True)
+    next_attempt_at = Column(String, nullable=True) # backoff: not retried before this time
+    lease_owner = Column(String, nullable=True) # worker currently holding the row
+    lease_expires_at = Column(String, nullable=True) # a lapsed lease can be reclaimed
+    last_error = Column(String, nullable=True)
+    __table_args__ = (
+        Index("ix_email_queue_status_retry", "status", "retry_count"),
+        # Undelivered rows in id order, so the claim takes the oldest without sorting
+        Index("ix_email_queue_claimable", "id", sqlite_where=text("status IN ('pending', 'failed', 'sending')")),
+    )
+
 class Artwork(Base):
     __tablename__ = "artworks"
     id = Column(Integer, primary_key=True, index=True)
@@ -92,3 +221,11 @@ class Newsletter(Base):
     citation = Column(String)
     verification_hash = Column(String)
     publish_at = Column(String) # For simplicity in SQLite, using ISO string
+    __table_args__ = (Index("ix_newsletters_lang_publish_at", "lang", "publish_at"),)
+
+class TableVersion(Base):
+    # Bumped by every admin mutation; drives ETag / Last-Modified on public reads
+    __tablename__ = "table_versions"
+    table_name = Column(String, primary_key=True)
+    version = Column(Integer, default=0)
+    updated_at = Column(String) # UTC, "%Y-%m-%d %H:%M:%S"
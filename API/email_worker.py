@@ -0,0 +1,247 @@
+import os
+import queue
+import random
+import smtplib
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from sqlalchemy import text # type: ignore
+from database import SessionLocal, EmailQueue
+from timestamps import format_timestamp, lease_owner
+
+# SMTP relay; without SMTP_HOST delivery is simulated (every message succeeds)
+SMTP_HOST = os.environ.get("SMTP_HOST")
+SMTP_PORT = int(os.environ.get("SMTP_PORT", "25"))
+SMTP_USERNAME = os.environ.get("SMTP_USERNAME")
+SMTP_PASSWORD = os.environ.get("SMTP_PASSWORD")
+SMTP_STARTTLS = os.environ.get("SMTP_STARTTLS", "false").lower() == "true"
+SMTP_TIMEOUT_SECONDS = float(os.environ.get("SMTP_TIMEOUT_SECONDS", "30"))
+EMAIL_SENDER = os.environ.get("EMAIL_SENDER", "no-reply@high.org")
+
+EMAIL_CONCURRENCY = int(os.environ.get("EMAIL_CONCURRENCY", "8"))
+EMAIL_BATCH_SIZE = int(os.environ.get("EMAIL_BATCH_SIZE", "200"))
+EMAIL_LEASE_SECONDS = int(os.environ.get("EMAIL_LEASE_SECONDS", "120"))
+# A batch still sending renews its lease this often, so it never lapses mid-batch
+EMAIL_LEASE_RENEW_SECONDS = EMAIL_LEASE_SECONDS / 3
+EMAIL_MAX_RETRIES = 5
+EMAIL_BACKOFF_BASE_SECONDS = 30
+EMAIL_BACKOFF_MAX_SECONDS = 6 * 60 * 60
+# One drain keeps claiming batches until the queue is empty or this much time has passed
+EMAIL_DRAIN_SECONDS = float(os.environ.get("EMAIL_DRAIN_SECONDS", "50"))
+
+# Walks ix_email_queue_claimable in id order, so the oldest due rows come out without a sort. The
+# leading status term must match that partial index's WHERE; INDEXED BY keeps SQLite from picking
+# the status index plus a temp b-tree, and fails loudly if the index were ever missing.
+_CLAIM = text("""
+    UPDATE email_queue
+    SET status = 'sending', lease_owner = :owner, lease_expires_at = :lease_expires_at
+    WHERE id IN (
+        SELECT id FROM email_queue INDEXED BY ix_email_queue_claimable
+        WHERE status IN ('pending', 'failed', 'sending') AND (
+            (
+                status IN ('pending', 'failed')
+                AND retry_count < :max_retries
+                AND (next_attempt_at IS NULL OR next_attempt_at <= :now)
+            ) OR (status = 'sending' AND lease_expires_at < :now)
+        )
+        ORDER BY id
+        LIMIT :limit
+    )
+""")
+
+
+_RENEW = text("""
+    UPDATE email_queue SET lease_expires_at = :lease_expires_at
+    WHERE lease_owner = :owner AND status = 'sending'
+""")
+
+# Outcomes are only written while the lease is still ours; a reclaimed row belongs to its new holder
+_MARK_SENT = text("""
+    UPDATE email_queue
+    SET status = 'sent', sent_at = :sent_at, lease_owner = NULL, lease_expires_at = NULL, last_error = NULL
+    WHERE id = :id AND lease_owner = :owner
+""")
+
+_MARK_FAILED = text("""
+    UPDATE email_queue
+    SET status = 'failed', retry_count = :retry_count, next_attempt_at = :next_attempt_at,
+        lease_owner = NULL, lease_expires_at = NULL, last_error = :last_error
+    WHERE id = :id AND lease_owner = :owner
+""")
+
+
+def backoff_delay(retry_count: int):
+    """Exponential backoff with full jitter: up to base * 2^retries, capped."""
+    ceiling = min(EMAIL_BACKOFF_MAX_SECONDS, EMAIL_BACKOFF_BASE_SECONDS * (2 ** retry_count))
+    return timedelta(seconds=random.uniform(ceiling / 2, ceiling))
+
+
+class SMTPPool:
+    """Reusable SMTP connections shared by the sender threads."""
+
+    def __init__(self, host: str, port: int, size: int):
+        self.host = host
+        self.port = port
+        self._idle = queue.LifoQueue(maxsize=size)
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, self.port, timeout=SMTP_TIMEOUT_SECONDS)
+        if SMTP_STARTTLS:
+            conn.starttls()
+        if SMTP_USERNAME:
+            conn.login(SMTP_USERNAME, SMTP_PASSWORD or "")
+        return conn
+
+    def send(self, message: EmailMessage):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+        try:
+            try:
+                conn.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                # Idle pooled connection was dropped by the server; retry once on a fresh one
+                conn = self._connect()
+                conn.send_message(message)
+        except Exception:
+            _quietly_close(conn)
+            raise
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            _quietly_close(conn)
+
+    def close(self):
+        while True:
+            try:
+                _quietly_close(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+
+def _quietly_close(conn):
+    try:
+        conn.quit()
+    except Exception:
+        pass
+
+
+class EmailDeliveryWorker:
+    """Claims leased batches from email_queue and delivers them concurrently.
+
+    Claiming is a single UPDATE that flips rows to 'sending' under a unique
+    lease owner, so overlapping runs or other processes never pick the same
+    row. The lease is renewed while the batch is sending; a worker that dies
+    leaves rows whose lease simply lapses and gets reclaimed.
+    """
+
+    def __init__(self, host: str = SMTP_HOST, port: int = SMTP_PORT, concurrency: int = EMAIL_CONCURRENCY,
+                 batch_size: int = EMAIL_BATCH_SIZE, sender: str = EMAIL_SENDER):
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.sender = sender
+        self.pool = SMTPPool(host, port, concurrency) if host else None
+        self._executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="email")
+
+    def claim_batch(self, db):
+        """Lease up to batch_size due rows. Returns (lease owner, rows)."""
+        owner = lease_owner()
+        now = datetime.now()
+        db.execute(_CLAIM, {
+            "owner": owner,
+            "lease_expires_at": format_timestamp(now + timedelta(seconds=EMAIL_LEASE_SECONDS)),
+            "now": format_timestamp(now),
+            "max_retries": EMAIL_MAX_RETRIES,
+            "limit": self.batch_size,
+        })
+        db.commit()
+        return owner, db.query(EmailQueue.id, EmailQueue.recipient, EmailQueue.subject, EmailQueue.body,
+                               EmailQueue.retry_count).filter(
+            EmailQueue.lease_owner == owner, EmailQueue.status == "sending"
+        ).all()
+
+    def renew_lease(self, db, owner: str):
+        db.execute(_RENEW, {
+            "owner": owner,
+            "lease_expires_at": format_timestamp(datetime.now() + timedelta(seconds=EMAIL_LEASE_SECONDS)),
+        })
+        db.commit()
+
+    def _deliver(self, row):
+        if self.pool is None:
+            return  # simulated delivery
+        message = EmailMessage()
+        message["From"] = self.sender
+        message["To"] = row.recipient
+        message["Subject"] = row.subject or ""
+        message.set_content(row.body or "")
+        self.pool.send(message)
+
+    def _attempt(self, row):
+        try:
+            self._deliver(row)
+            return row, None
+        except Exception as e:
+            return row, e
+
+    def process_batch(self, db, owner: str, batch):
+        """Send a claimed batch concurrently and record every outcome in one transaction.
+
+        Returns (sent, failed, lost): lost counts outcomes dropped because the
+        row's lease had passed to another worker.
+        """
+        pending = {self._executor.submit(self._attempt, row) for row in batch}
+        results = []
+        renewed_at = time.monotonic()
+        while pending:
+            done, pending = wait(pending, timeout=EMAIL_LEASE_RENEW_SECONDS, return_when=FIRST_COMPLETED)
+            results.extend(future.result() for future in done)
+            if pending and time.monotonic() - renewed_at >= EMAIL_LEASE_RENEW_SECONDS:
+                self.renew_lease(db, owner)
+                renewed_at = time.monotonic()
+
+        now = datetime.now()
+        sent_rows, failed_rows = [], []
+        for row, error in results:
+            if error is None:
+                sent_rows.append({"id": row.id, "owner": owner, "sent_at": format_timestamp(now)})
+            else:
+                print(f"Failed to send email to {row.recipient}: {error}")
+                failed_rows.append({"id": row.id, "owner": owner, "retry_count": row.retry_count + 1,
+                                    "next_attempt_at": format_timestamp(now + backoff_delay(row.retry_count)),
+                                    "last_error": str(error)[:500]})
+        written = 0
+        for statement, rows in ((_MARK_SENT, sent_rows), (_MARK_FAILED, failed_rows)):
+            if rows:
+                written += db.execute(statement, rows).rowcount
+        db.commit()
+        lost = len(results) - written
+        if lost:
+            print(f"Dropped {lost} email outcomes: their lease was taken over by another worker.")
+        return len(sent_rows), len(failed_rows), lost
+
+    def drain(self, max_seconds: float = EMAIL_DRAIN_SECONDS):
+        """Keep claiming and sending batches until the queue is empty or time runs out."""
+        deadline = time.monotonic() + max_seconds
+        totals = {"sent": 0, "failed": 0, "lost": 0, "batches": 0}
+        db = SessionLocal()
+        try:
+            while time.monotonic() < deadline:
+                owner, batch = self.claim_batch(db)
+                if not batch:
+                    break
+                sent, failed, lost = self.process_batch(db, owner, batch)
+                totals["sent"] += sent
+                totals["failed"] += failed
+                totals["lost"] += lost
+                totals["batches"] += 1
+        finally:
+            db.close()
+        return totals
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        if self.pool is not None:
+            self.pool.close()
@@ -0,0 +1,77 @@
+import gzip
+import json
+import os
+from fastapi import Request, Response # type: ignore
+from fastapi.encoders import jsonable_encoder # type: ignore
+
+try:
+    import orjson # type: ignore
+except ImportError:  # stdlib json still works, just slower
+    orjson = None
+
+# Bodies smaller than this are sent as-is; compressing them costs more than it saves
+GZIP_MIN_BYTES = int(os.environ.get("GZIP_MIN_BYTES", "4096"))
+GZIP_LEVEL = int(os.environ.get("GZIP_LEVEL", "6"))
+
+
+def dumps(payload):
+    """Encode a payload to compact UTF-8 JSON bytes.
+
+    Plain dicts, lists, strings, numbers and dates take the orjson fast path;
+    anything else (ORM objects, pydantic models) goes through jsonable_encoder.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=jsonable_encoder)
+    return json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def rows_to_dicts(columns, rows):
+    """Column tuples from db.query(Model.a, Model.b, ...) -> list of dicts, skipping ORM identity maps."""
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def compress(body: bytes):
+    """Gzipped copy of a body worth compressing, else None."""
+    if len(body) < GZIP_MIN_BYTES:
+        return None
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def encoded_etag(etag: str, coding: str):
+    """ETag of the `coding`-encoded bytes of a representation: a strong validator names one byte sequence."""
+    return f'{etag[:-1]}-{coding}"' if etag.endswith('"') else etag
+
+
+def identity_etag(etag: str):
+    """Inverse of encoded_etag() for gzip, so either form revalidates."""
+    suffix = '-gzip"'
+    return etag[:-len(suffix)] + '"' if etag.endswith(suffix) else etag
+
+
+def accepts_gzip(request: Request):
+    return "gzip" in request.headers.get("accept-encoding", "").lower()
+
+
+def encoded_response(request: Request, body: bytes, gzipped: bytes = None, headers: dict = None,
+                     media_type: str = "application/json"):
+    """Response carrying the gzipped body when the client accepts it and one exists."""
+    headers = dict(headers or {})
+    if gzipped is not None:
+        headers["Vary"] = "Accept-Encoding"
+        if accepts_gzip(request):
+            headers["Content-Encoding"] = "gzip"
+            if "ETag" in headers:
+                headers["ETag"] = encoded_etag(headers["ETag"], "gzip")
+            return Response(content=gzipped, media_type=media_type, headers=headers)
+    return Response(content=body, media_type=media_type, headers=headers)
+
+
+def fast_json_response(request: Request, payload):
+    """Serialize with dumps() and gzip large bodies; for uncached list endpoints."""
+    body = dumps(payload)
+    if not accepts_gzip(request):
+        headers = {"Vary": "Accept-Encoding"} if len(body) >= GZIP_MIN_BYTES else None
+        return Response(content=body, media_type="application/json", headers=headers)
+    return encoded_response(request, body, compress(body))
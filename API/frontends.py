@@ -0,0 +1,203 @@
+"""Serve the built Vite frontends (UserApplication, AdminApplication) from the API.
+
+Off by default; set SERVE_FRONTENDS=true after `npm run build` (and
+`npm run build:api` for the admin app, which is served under ADMIN_APP_PATH).
+
+At startup every compressible file in a dist/ directory gets .gz and .br
+siblings (written once, reused until the original changes), and an
+in-memory manifest maps each URL to its encodings, type and ETag. Requests
+then get the smallest encoding the client accepts with no compression work,
+hashed Vite assets are cached as immutable, and unknown paths without a
+file extension fall back to index.html so client-side routes load.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from fastapi import Request, Response # type: ignore
+from fastapi.responses import FileResponse # type: ignore
+
+try:
+    import brotli # type: ignore
+except ImportError:  # gzip still works, brotli clients just get gzip
+    brotli = None
+
+SERVE_FRONTENDS = os.environ.get("SERVE_FRONTENDS", "false").lower() == "true"
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USER_APP_DIST = os.environ.get("USER_APP_DIST", os.path.join(_ROOT, "UserApplication", "dist"))
+ADMIN_APP_DIST = os.environ.get("ADMIN_APP_DIST", os.path.join(_ROOT, "AdminApplication", "dist"))
+# Must match the admin build's --base
+ADMIN_APP_PATH = "/" + os.environ.get("ADMIN_APP_PATH", "/admin").strip("/")
+# Files smaller than this are sent as-is
+STATIC_COMPRESS_MIN_BYTES = int(os.environ.get("STATIC_COMPRESS_MIN_BYTES", "1024"))
+
+COMPRESSIBLE_EXTENSIONS = {".html", ".js", ".mjs", ".css", ".json", ".svg", ".txt", ".xml", ".map", ".wasm", ".ico"}
+# Vite's default output name: assets/<name>-<8 character hash>.<ext>
+HASHED_ASSET = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+# Preferred first; identity is always available
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _compress(encoding: str, data: bytes):
+    if encoding == "br":
+        return brotli.compress(data, quality=11) if brotli is not None else None
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _write_sibling(path: str, data: bytes):
+    temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(data)
+    os.replace(temp, path)  # concurrent workers never serve a partial file
+
+
+def accepted_encodings(header: str):
+    """Content codings in an Accept-Encoding header with a non-zero q value."""
+    accepted = set()
+    for part in header.lower().split(","):
+        name, _, params = part.partition(";")
+        name = name.strip()
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if name and q > 0:
+            accepted.add(name)
+    if "*" in accepted:
+        accepted.update(encoding for encoding, _ in ENCODINGS)
+    return accepted
+
+
+class Asset:
+    __slots__ = ("media_type", "cache_control", "variants")
+
+    def __init__(self, media_type: str, cache_control: str, variants: dict):
+        self.media_type = media_type
+        self.cache_control = cache_control
+        self.variants = variants  # encoding ("identity", "gzip", "br") -> (path, size, etag)
+
+
+class FrontendBundle:
+    """One built dist/ directory with its precompressed manifest."""
+
+    def __init__(self, name: str, dist_dir: str):
+        self.name = name
+        self.dist_dir = os.path.abspath(dist_dir)
+        self.assets = {}
+        self._lock = threading.Lock()
+        self.counters = {"identity": 0, "gzip": 0, "br": 0, "not_modified": 0, "fallback": 0}
+        self.compressed_now = 0
+
+    def load(self):
+        """Build the manifest, writing any missing or stale .gz/.br siblings. Returns the asset count."""
+        assets = {}
+        for directory, _, names in os.walk(self.dist_dir):
+            for name in names:
+                if name.endswith((".gz", ".br", ".tmp")):
+                    continue
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, self.dist_dir).replace(os.sep, "/")
+                assets[relative] = self._asset(relative, path)
+        self.assets = assets
+        return len(assets)
+
+    def _asset(self, relative: str, path: str):
+        stat = os.stat(path)
+        media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+        if media_type.startswith("text/") or media_type in ("application/javascript", "image/svg+xml"):
+            media_type += "; charset=utf-8"
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest()[:16]
+        variants = {"identity": (path, stat.st_size, f'"{digest}"')}
+        extension = os.path.splitext(path)[1].lower()
+        if extension in COMPRESSIBLE_EXTENSIONS and stat.st_size >= STATIC_COMPRESS_MIN_BYTES:
+            for encoding, suffix in ENCODINGS:
+                sibling = path + suffix
+                try:
+                    fresh = os.stat(sibling).st_mtime >= stat.st_mtime
+                except FileNotFoundError:
+                    fresh = False
+                if not fresh:
+                    compressed = _compress(encoding, data)
+                    if compressed is None:
+                        continue
+                    try:
+                        _write_sibling(sibling, compressed)
+                    except OSError as e:
+                        print(f"Could not write {sibling}: {e}")
+                        continue
+                    self.compressed_now += 1
+                size = os.path.getsize(sibling)
+                # Not worth a Content-Encoding unless it saves at least 10%
+                if size < stat.st_size * 0.9:
+                    variants[encoding] = (sibling, size, f'"{digest}-{encoding}"')
+        cache_control = IMMUTABLE_CACHE_CONTROL if HASHED_ASSET.match(relative) else REVALIDATE_CACHE_CONTROL
+        return Asset(media_type, cache_control, variants)
+
+    def lookup(self, path: str):
+        """Asset for a URL path relative to the bundle root, with the SPA fallback. None for a 404."""
+        path = path.strip("/")
+        asset = self.assets.get(path or "index.html")
+        if asset is not None:
+            return asset
+        if "." in path.rsplit("/", 1)[-1]:
+            return None  # a missing file, not a client-side route
+        with self._lock:
+            self.counters["fallback"] += 1
+        return self.assets.get("index.html")
+
+    def response(self, request: Request, path: str):
+        asset = self.lookup(path)
+        if asset is None:
+            return None
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        encoding = next((name for name, _ in ENCODINGS if name in asset.variants and name in accepted), "identity")
+        file_path, size, etag = asset.variants[encoding]
+        headers = {"Cache-Control": asset.cache_control, "ETag": etag}
+        if len(asset.variants) > 1:
+            headers["Vary"] = "Accept-Encoding"
+        if etag in request.headers.get("if-none-match", ""):
+            with self._lock:
+                self.counters["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        with self._lock:
+            self.counters[encoding] += 1
+        return FileResponse(file_path, media_type=asset.media_type, headers=headers, stat_result=os.stat(file_path))
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self.counters)
+        snapshot["assets"] = len(self.assets)
+        snapshot["precompressed"] = sum(len(asset.variants) - 1 for asset in self.assets.values())
+        return snapshot
+
+
+def load_bundles():
+    """(url prefix, bundle) for each dist/ directory that exists, admin first so the user app's fallback cannot shadow it."""
+    bundles = []
+    for prefix, name, dist_dir in ((ADMIN_APP_PATH, "admin", ADMIN_APP_DIST), ("", "user", USER_APP_DIST)):
+        if not os.path.isfile(os.path.join(dist_dir, "index.html")):
+            print(f"Frontend '{name}' not served: no build in {dist_dir}.")
+            continue
+        bundle = FrontendBundle(name, dist_dir)
+        count = bundle.load()
+        print(f"Frontend '{name}' served at {prefix or '/'}: {count} files, {bundle.compressed_now} compressed now.")
+        bundles.append((prefix, bundle))
+    return bundles
+
+
+def frontend_stats(bundles):
+    def collect():
+        return {f"{bundle.name}_{key}": value for _, bundle in bundles for key, value in bundle.stats().items()}
+    return collect
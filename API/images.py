@@ -0,0 +1,521 @@
+"""Resized WebP derivatives of artwork and event images.
+
+Image URLs saved on artworks and events are registered in image_sources. Each
+original is fetched once, decoded once at the largest size a variant needs,
+and written as thumbnail / card / full WebP files to an on-disk cache
+addressed by the sha256 of the original's bytes, so identical images share
+files and a derivative URL never changes meaning. The cache evicts the least
+recently served files once it grows past IMAGE_CACHE_MAX_MB; an evicted file
+is regenerated from the original on its next request.
+
+API payloads carry an `image_srcset`. Once an original has been processed it
+points at /api/images/{content_hash}/{variant}.webp, which is served as
+immutable. Before that it points at /api/images/source/{url_hash}/..., which
+processes the original on first request.
+
+Originals are fetched without proxies and only over connections to public
+addresses: the check runs on the address actually connected to, for the
+first request and every redirect hop.
+
+Process every pending original from the API directory with:
+
+    python -m images
+"""
+import argparse
+import hashlib
+import http.client
+import ipaddress
+import os
+import re
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from datetime import datetime, timedelta
+from io import BytesIO
+from urllib.parse import urlparse
+from database import SessionLocal, ImageSource
+from timestamps import format_timestamp, timestamp_now
+from versioning import bump_version
+
+try:
+    from PIL import Image, ImageOps # type: ignore
+except ImportError:  # without Pillow payloads carry no srcset and originals are used as-is
+    Image = None
+
+IMAGE_CACHE_DIR = os.environ.get("IMAGE_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "image_cache"))
+IMAGE_CACHE_MAX_BYTES = int(float(os.environ.get("IMAGE_CACHE_MAX_MB", "1024")) * 1024 * 1024)
+# Prefix for derivative URLs in payloads, e.g. https://api.high.org when the frontend is on another origin
+IMAGE_PUBLIC_BASE_URL = os.environ.get("IMAGE_PUBLIC_BASE_URL", "").rstrip("/")
+IMAGE_FETCH_TIMEOUT_SECONDS = float(os.environ.get("IMAGE_FETCH_TIMEOUT_SECONDS", "10"))
+IMAGE_MAX_SOURCE_BYTES = int(os.environ.get("IMAGE_MAX_SOURCE_MB", "25")) * 1024 * 1024
+# Comma separated; empty allows any host. Only URLs saved by admins are ever fetched.
+IMAGE_ALLOWED_HOSTS = {h.strip().lower() for h in os.environ.get("IMAGE_ALLOWED_HOSTS", "").split(",") if h.strip()}
+# Loopback, private, link-local and reserved addresses are refused unless this is set (local development)
+IMAGE_ALLOW_PRIVATE_ADDRESSES = os.environ.get("IMAGE_ALLOW_PRIVATE_ADDRESSES", "false").lower() == "true"
+IMAGE_MAX_REDIRECTS = 3
+# A failed original is not fetched again for this long
+IMAGE_RETRY_SECONDS = int(os.environ.get("IMAGE_RETRY_SECONDS", "3600"))
+IMAGE_MAX_PIXELS = 80_000_000
+
+# name -> (max width, WebP quality), smallest first. To change a variant, add
+# one under a new name; published immutable URLs must keep their meaning.
+VARIANTS = {"thumbnail": (320, 75), "card": (640, 78), "full": (1600, 82)}
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+ON_DEMAND_CACHE_CONTROL = "public, max-age=3600"
+# A served file's mtime is refreshed at most this often; eviction drops the oldest mtimes first
+TOUCH_INTERVAL_SECONDS = 3600
+# Ready sources are loaded in one query instead of an IN list above this many URLs
+SRCSET_IN_LIST_MAX = 500
+
+_HASH = re.compile(r"^[0-9a-f]{32}$")
+
+if Image is not None:
+    Image.MAX_IMAGE_PIXELS = IMAGE_MAX_PIXELS
+
+
+class ImageError(Exception):
+    """An original could not be fetched or decoded."""
+
+
+def url_hash(url: str):
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:32]
+
+
+def is_fetchable(url):
+    if not url:
+        return False
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        return False
+    return not IMAGE_ALLOWED_HOSTS or parsed.hostname.lower() in IMAGE_ALLOWED_HOSTS
+
+
+class DerivativeStore:
+    """Content-addressed derivative files under one directory, bounded by total size."""
+
+    def __init__(self, root: str, max_bytes: int):
+        self.root = root
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = None  # bytes on disk, measured on first write
+        self.counters = {"hits": 0, "misses": 0, "writes": 0, "evicted": 0}
+
+    def path(self, content_hash: str, variant: str):
+        return os.path.join(self.root, content_hash[:2], f"{content_hash}-{variant}.webp")
+
+    def get(self, content_hash: str, variant: str):
+        """Path of a cached derivative, or None."""
+        path = self.path(content_hash, variant)
+        try:
+            mtime = os.stat(path).st_mtime
+        except FileNotFoundError:
+            with self._lock:
+                self.counters["misses"] += 1
+            return None
+        if time.time() - mtime > TOUCH_INTERVAL_SECONDS:
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        with self._lock:
+            self.counters["hits"] += 1
+        return path
+
+    def put(self, content_hash: str, variant: str, data: bytes):
+        path = self.path(content_hash, variant)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp, "wb") as f:
+            f.write(data)
+        os.replace(temp, path)  # readers never see a partial file
+        with self._lock:
+            self.counters["writes"] += 1
+            if self._total is None:
+                self._total = self._disk_usage()
+            else:
+                self._total += len(data)
+            over = self._total > self.max_bytes
+        if over:
+            self.evict()
+        return path
+
+    def _files(self):
+        for directory, _, names in os.walk(self.root):
+            for name in names:
+                if name.endswith(".webp"):
+                    path = os.path.join(directory, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+
+    def _disk_usage(self):
+        return sum(size for _, size, _ in self._files())
+
+    def evict(self):
+        """Delete least recently served files until the cache is back under 90% of its limit."""
+        files = sorted(self._files())
+        total = sum(size for _, size, _ in files)
+        target = self.max_bytes * 0.9
+        evicted = 0
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            evicted += 1
+        with self._lock:
+            self._total = total
+            self.counters["evicted"] += evicted
+        return evicted
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self.counters)
+            snapshot["bytes"] = self._total or 0
+        snapshot["max_bytes"] = self.max_bytes
+        return snapshot
+
+
+store = DerivativeStore(IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_BYTES)
+_stats_lock = threading.Lock()
+_stats = {"processed": 0, "failed": 0, "decode_seconds_total": 0.0}
+# One fetch/render per original at a time in this process
+_source_locks = defaultdict(threading.Lock)
+_source_locks_guard = threading.Lock()
+
+
+def _source_lock(key: str):
+    with _source_locks_guard:
+        return _source_locks[key]
+
+
+def _public_address(address: str):
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if ip.version == 6 and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def _guarded_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+    """socket.create_connection() that resolves once and only connects to public addresses.
+
+    Checking the address actually connected to (not a separate lookup first)
+    also covers DNS rebinding and every redirect hop.
+    """
+    host, port = address
+    try:
+        resolved = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise ImageError(f"cannot resolve {host}: {e}")
+    if not IMAGE_ALLOW_PRIVATE_ADDRESSES:
+        blocked = [info[4][0] for info in resolved if not _public_address(info[4][0])]
+        if blocked:
+            raise ImageError(f"{host} resolves to a non-public address ({blocked[0]})")
+    error = None
+    for family, socktype, proto, _, sockaddr in resolved:
+        sock = socket.socket(family, socktype, proto)
+        try:
+            if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
+                sock.settimeout(timeout)
+            if source_address:
+                sock.bind(source_address)
+            sock.connect(sockaddr)
+            return sock
+        except OSError as e:
+            sock.close()
+            error = e
+    raise error or OSError(f"cannot connect to {host}")
+
+
+class _GuardedHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _guarded_connection
+
+
+class _GuardedHTTPSConnection(http.client.HTTPSConnection):
+    # TLS still verifies the certificate against the URL's host name
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _guarded_connection
+
+
+class _GuardedHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req):
+        return self.do_open(_GuardedHTTPConnection, req)
+
+
+class _GuardedHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req):
+        return self.do_open(_GuardedHTTPSConnection, req)
+
+
+class _CheckedRedirectHandler(urllib.request.HTTPRedirectHandler):
+    max_redirections = IMAGE_MAX_REDIRECTS
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        if not is_fetchable(newurl):
+            raise urllib.error.HTTPError(newurl, code, "redirect to a URL that is not allowed", headers, fp)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+def _build_opener():
+    # Assembled by hand rather than with build_opener(): no proxy, file:, ftp: or data: handlers
+    opener = urllib.request.OpenerDirector()
+    for handler in (_GuardedHTTPHandler(), _GuardedHTTPSHandler(), _CheckedRedirectHandler(),
+                    urllib.request.HTTPDefaultErrorHandler(), urllib.request.HTTPErrorProcessor()):
+        opener.add_handler(handler)
+    return opener
+
+
+_opener = _build_opener()
+
+
+def fetch_original(url: str):
+    if not is_fetchable(url):
+        raise ImageError("URL is not an allowed http(s) image URL")
+    request = urllib.request.Request(url, headers={"User-Agent": "HighMuseumImageService/1.0"})
+    try:
+        with _opener.open(request, timeout=IMAGE_FETCH_TIMEOUT_SECONDS) as response:
+            data = response.read(IMAGE_MAX_SOURCE_BYTES + 1)
+    except OSError as e:
+        raise ImageError(f"fetch failed: {e}")
+    if len(data) > IMAGE_MAX_SOURCE_BYTES:
+        raise ImageError(f"original larger than {IMAGE_MAX_SOURCE_BYTES // (1024 * 1024)} MB")
+    return data
+
+
+def render_variants(data: bytes):
+    """Decode an original once and encode every variant. Returns (width, height, {variant: webp bytes})."""
+    largest = max(width for width, _ in VARIANTS.values())
+    try:
+        with Image.open(BytesIO(data)) as original:
+            source_width, source_height = original.size
+            if source_width > largest:
+                # JPEGs decode straight at 1/2, 1/4 or 1/8 scale when that still covers the largest variant
+                original.draft("RGB", (largest, max(1, source_height * largest // source_width)))
+            image = ImageOps.exif_transpose(original)
+    except (OSError, ValueError, Image.DecompressionBombError) as e:
+        raise ImageError(f"decode failed: {e}")
+    if image.size[0] < image.size[1] and source_width > source_height:
+        source_width, source_height = source_height, source_width  # rotated by EXIF orientation
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    image = image.convert("RGBA" if has_alpha else "RGB")
+
+    outputs = {}
+    # Largest first, each variant resized from the previous one
+    for name, (max_width, quality) in sorted(VARIANTS.items(), key=lambda item: -item[1][0]):
+        if image.width > max_width:
+            image = image.resize((max_width, max(1, round(image.height * max_width / image.width))), Image.LANCZOS)
+        buffer = BytesIO()
+        image.save(buffer, "WEBP", quality=quality, method=4)
+        outputs[name] = buffer.getvalue()
+    return source_width, source_height, outputs
+
+
+def _has_all_variants(content_hash: str):
+    return all(os.path.exists(store.path(content_hash, name)) for name in VARIANTS)
+
+
+def process_source(db, source: ImageSource, expected_hash: str = None):
+    """Fetch an original and make sure all of its derivatives are on disk. Commits.
+
+    With expected_hash, only derivatives of that exact content are written
+    (used to regenerate evicted files behind an immutable URL).
+    """
+    with _source_lock(source.url_hash):
+        started = time.perf_counter()
+        try:
+            data = fetch_original(source.url)
+            content_hash = hashlib.sha256(data).hexdigest()[:32]
+            if expected_hash is not None and content_hash != expected_hash:
+                raise ImageError("original has changed since this derivative was published")
+            if _has_all_variants(content_hash) and source.content_hash == content_hash:
+                return source
+            width, height, outputs = render_variants(data)
+        except ImageError as e:
+            with _stats_lock:
+                _stats["failed"] += 1
+            if expected_hash is None:
+                if source.status == "pending":
+                    bump_version(db, "images")  # payloads stop offering derivatives of this original
+                # A published original stays ready; only the error is recorded
+                if source.status != "ready":
+                    source.status = "failed"
+                source.error = str(e)[:500]
+                source.updated_at = timestamp_now()
+                db.commit()
+            print(f"Image {source.url} failed: {e}")
+            return None
+        for name, payload in outputs.items():
+            store.put(content_hash, name, payload)
+        with _stats_lock:
+            _stats["processed"] += 1
+            _stats["decode_seconds_total"] += time.perf_counter() - started
+
+        changed = source.content_hash != content_hash or source.status != "ready"
+        source.content_hash = content_hash
+        source.width = width
+        source.height = height
+        source.status = "ready"
+        source.error = None
+        source.updated_at = timestamp_now()
+        if changed:
+            # Cached payloads switch their srcsets to the immutable content URLs
+            bump_version(db, "images")
+        db.commit()
+        return source
+
+
+def register_images(db, urls):
+    """Record new image URLs as pending sources. Caller commits. Returns the URLs needing processing."""
+    urls = {url for url in urls if is_fetchable(url)}
+    if Image is None or not urls:
+        return []
+    known = {row.url: row.status for row in db.query(ImageSource.url, ImageSource.status).filter(ImageSource.url.in_(urls))}
+    for url in urls - set(known):
+        db.add(ImageSource(url=url, url_hash=url_hash(url), status="pending", updated_at=timestamp_now()))
+    if len(known) < len(urls):
+        bump_version(db, "images")
+    return sorted(url for url in urls if known.get(url) != "ready")
+
+
+def process_urls(urls):
+    """Generate derivatives for the given URLs; run after the response (FastAPI background task)."""
+    db = SessionLocal()
+    try:
+        for source in db.query(ImageSource).filter(ImageSource.url.in_(list(urls))).all():
+            process_source(db, source)
+    finally:
+        db.close()
+
+
+def _retry_due(source: ImageSource):
+    cutoff = format_timestamp(datetime.now() - timedelta(seconds=IMAGE_RETRY_SECONDS))
+    return source.status != "failed" or (source.updated_at or "") < cutoff
+
+
+def derivative_for_content(content_hash: str, variant: str):
+    """Path of an immutable derivative, regenerating it if it was evicted. None if unknown."""
+    if Image is None or variant not in VARIANTS or not _HASH.match(content_hash):
+        return None
+    path = store.get(content_hash, variant)
+    if path is not None:
+        return path
+    db = SessionLocal()
+    try:
+        source = db.query(ImageSource).filter(ImageSource.content_hash == content_hash).first()
+        if source is None or process_source(db, source, expected_hash=content_hash) is None:
+            return None
+        return store.get(content_hash, variant)
+    finally:
+        db.close()
+
+
+def derivative_for_source(source_hash: str, variant: str):
+    """Path of a derivative of a registered original, processing it on first request. None if unavailable."""
+    if Image is None or variant not in VARIANTS or not _HASH.match(source_hash):
+        return None
+    db = SessionLocal()
+    try:
+        source = db.query(ImageSource).filter(ImageSource.url_hash == source_hash).first()
+        if source is None:
+            return None
+        if source.status == "ready":
+            path = store.get(source.content_hash, variant)
+            if path is not None:
+                return path
+        if not _retry_due(source) or process_source(db, source) is None:
+            return None
+        return store.get(source.content_hash, variant)
+    finally:
+        db.close()
+
+
+def _derivative_url(kind: str, key: str, variant: str):
+    return f"{IMAGE_PUBLIC_BASE_URL}/api/images/{kind}{key}/{variant}.webp"
+
+
+def srcset_for(source):
+    """srcset string for an (url_hash, content_hash, width, status) row, or None for failed originals."""
+    source_hash, content_hash, width, status = source
+    entries = []
+    previous = None
+    for name, (max_width, _) in VARIANTS.items():
+        if status == "ready":
+            actual = min(max_width, width or max_width)
+            if actual == previous:
+                continue  # a small original gives identical variants; list each width once
+            entries.append(f"{_derivative_url('', content_hash, name)} {actual}w")
+            previous = actual
+        elif status == "pending":
+            entries.append(f"{_derivative_url('source/', source_hash, name)} {max_width}w")
+        else:
+            return None
+    return ", ".join(entries)
+
+
+def add_srcsets(db, items):
+    """Set `image_srcset` on every dict in items that has an `image_url`. One query for the whole list.
+
+    Dicts without an `image_url` (e.g. a `fields=` projection) are left as they are; items is
+    returned unchanged. Responses built with this must list "images" among their cache tables.
+    """
+    pictured = [item for item in items if "image_url" in item]
+    if not pictured:
+        return items
+    if Image is None:
+        for item in pictured:
+            item["image_srcset"] = None
+        return items
+    urls = {item["image_url"] for item in pictured if item["image_url"]}
+    query = db.query(ImageSource.url, ImageSource.url_hash, ImageSource.content_hash, ImageSource.width,
+                     ImageSource.status)
+    if len(urls) <= SRCSET_IN_LIST_MAX:
+        query = query.filter(ImageSource.url.in_(urls))
+    sources = {} if not urls else {row[0]: row[1:] for row in query}
+    for item in pictured:
+        source = sources.get(item["image_url"])
+        item["image_srcset"] = srcset_for(source) if source is not None else None
+    return items
+
+
+def image_stats():
+    with _stats_lock:
+        snapshot = dict(_stats)
+    snapshot.update({f"cache_{key}": value for key, value in store.stats().items()})
+    snapshot["pillow"] = 1 if Image is not None else 0
+    return snapshot
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate derivatives for pending image sources.")
+    parser.add_argument("--retry-failed", action="store_true", help="also retry originals that failed before")
+    parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+    if Image is None:
+        raise SystemExit("Pillow is not installed.")
+
+    statuses = ["pending"] + (["failed"] if args.retry_failed else [])
+    db = SessionLocal()
+    try:
+        query = db.query(ImageSource).filter(ImageSource.status.in_(statuses)).order_by(ImageSource.id)
+        sources = query.limit(args.limit).all() if args.limit else query.all()
+        started = time.perf_counter()
+        ready = sum(1 for source in sources if process_source(db, source) is not None)
+        print(f"Processed {len(sources)} originals in {time.perf_counter() - started:.1f} s: "
+              f"{ready} ready, {len(sources) - ready} failed.")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
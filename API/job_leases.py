@@ -0,0 +1,127 @@
+import os
+import threading
+from datetime import datetime, timedelta
+from sqlalchemy import text # type: ignore
+from database import engine
+from timestamps import format_timestamp, lease_owner
+
+# How long a lease lasts without a heartbeat; a crashed holder is taken over after this
+JOB_LEASE_SECONDS = int(os.environ.get("JOB_LEASE_SECONDS", "120"))
+JOB_HEARTBEAT_SECONDS = max(1, JOB_LEASE_SECONDS // 3)
+
+# Identifies this process in job_leases.owner
+OWNER = lease_owner()
+
+_ENSURE_ROW = text("INSERT OR IGNORE INTO job_leases (name) VALUES (:name)")
+# Free or lapsed lease, and this tick has not already been run by another process
+_ACQUIRE = text("""
+    UPDATE job_leases
+    SET owner = :owner, expires_at = :expires_at, heartbeat_at = :now, started_at = :now,
+        finished_at = NULL, run_key = :run_key, status = 'running'
+    WHERE name = :name
+      AND (owner IS NULL OR expires_at < :now)
+      AND NOT (run_key IS :run_key AND status IN ('completed', 'failed'))
+""")
+_HEARTBEAT = text("""
+    UPDATE job_leases SET expires_at = :expires_at, heartbeat_at = :now
+    WHERE name = :name AND owner = :owner
+""")
+_RELEASE = text("""
+    UPDATE job_leases SET owner = NULL, expires_at = NULL, status = :status, finished_at = :now
+    WHERE name = :name AND owner = :owner
+""")
+
+_stats_lock = threading.Lock()
+_stats = {"runs": 0, "skipped": 0, "takeovers": 0, "lost": 0, "errors": 0}
+
+
+def _count(name: str):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def acquire(name: str, run_key: str, owner: str = OWNER):
+    """Try to take the lease on `name` for one tick. Returns True when this process should run it."""
+    now = datetime.now()
+    with engine.begin() as conn:
+        conn.execute(_ENSURE_ROW, {"name": name})
+        previous = conn.execute(text("SELECT owner, status FROM job_leases WHERE name = :name"), {"name": name}).first()
+        acquired = conn.execute(_ACQUIRE, {
+            "name": name, "owner": owner, "run_key": run_key,
+            "now": format_timestamp(now), "expires_at": format_timestamp(now + timedelta(seconds=JOB_LEASE_SECONDS)),
+        }).rowcount == 1
+    if acquired and previous.owner is not None and previous.status == "running":
+        _count("takeovers")
+        print(f"[{now}] Job {name}: lease of {previous.owner} lapsed, taking over ({run_key}).")
+    return acquired
+
+
+def heartbeat(name: str, owner: str = OWNER):
+    """Extend a held lease. Returns False if another process has taken it over."""
+    now = datetime.now()
+    with engine.begin() as conn:
+        return conn.execute(_HEARTBEAT, {
+            "name": name, "owner": owner,
+            "now": format_timestamp(now), "expires_at": format_timestamp(now + timedelta(seconds=JOB_LEASE_SECONDS)),
+        }).rowcount == 1
+
+
+def release(name: str, status: str, owner: str = OWNER):
+    with engine.begin() as conn:
+        conn.execute(_RELEASE, {"name": name, "owner": owner, "status": status, "now": format_timestamp(datetime.now())})
+
+
+def _keep_alive(name: str, stop: threading.Event):
+    while not stop.wait(JOB_HEARTBEAT_SECONDS):
+        try:
+            if not heartbeat(name):
+                _count("lost")
+                print(f"[{datetime.now()}] Job {name}: lease lost to another process.")
+                return
+        except Exception as e:
+            print(f"Error renewing lease for job {name}: {e}")
+
+
+def run_once(name: str, run_key: str, fn, *args, **kwargs):
+    """Run fn for this tick only if no other process holds or already finished it.
+
+    A heartbeat thread keeps the lease alive while fn runs. Returns True if fn ran here.
+    """
+    try:
+        if not acquire(name, run_key):
+            _count("skipped")
+            return False
+    except Exception as e:
+        _count("errors")
+        print(f"Error acquiring lease for job {name}: {e}")
+        return False
+
+    _count("runs")
+    stop = threading.Event()
+    keeper = threading.Thread(target=_keep_alive, args=(name, stop), name=f"lease-{name}", daemon=True)
+    keeper.start()
+    status = "failed"
+    try:
+        fn(*args, **kwargs)
+        status = "completed"
+    finally:
+        stop.set()
+        keeper.join()
+        try:
+            release(name, status)
+        except Exception as e:
+            print(f"Error releasing lease for job {name}: {e}")
+    return True
+
+
+def lease_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+
+def list_leases(db):
+    rows = db.execute(text(
+        "SELECT name, owner, expires_at, run_key, status, started_at, heartbeat_at, finished_at "
+        "FROM job_leases ORDER BY name"
+    )).mappings().all()
+    return [dict(row) for row in rows]
@@ -1,18 +1,50 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Header # type: ignore
+import os
+from fastapi import FastAPI, Depends, HTTPException, status, Header, Request, Query, UploadFile, File, BackgroundTasks # type: ignore
 from fastapi.middleware.cors import CORSMiddleware # type: ignore
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse, FileResponse # type: ignore
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm # type: ignore
+from sqlalchemy import select # type: ignore
+from sqlalchemy.exc import IntegrityError # type: ignore
+from starlette.concurrency import run_in_threadpool # type: ignore
 from sqlalchemy.orm import Session # type: ignore
-from database import SessionLocal, Event, Holiday, OperatingHour, User, Newsletter, NewsletterLog, EmailQueue, Artwork, EventException, engine, Base
+from sqlalchemy.ext.asyncio import AsyncSession # type: ignore
+from database import SessionLocal, Event, Holiday, OperatingHour, User, Newsletter, NewsletterLog, EmailQueue, Artwork, EventException, engine, Base, AsyncSessionLocal, ReadSessionLocal
+from versioning import bump_version
+from timestamps import timestamp_now
+from cache import cached_json_response, cached_json_response_async, reference_cache
+from fastjson import dumps, rows_to_dicts, fast_json_response
+from passwords import hash_password, check_password, auth_metrics, AuthBusyError
+from admission import admission, admit_auth_request, AdmissionRejected
+from metrics import MetricsMiddleware, registry as metrics_registry
+from migrations import run_migrations
+from scheduler import build_scheduler, on_start, email_worker, send_monthly_newsletter_task, SCHEDULER_MODE
+from job_leases import lease_stats, list_leases
+from principals import Principal, principal_cache
+from newsletter_editions import edition_resolver
+from search import ensure_artwork_index, index_artwork, unindex_artwork, search_artworks, SEARCH_PAGE_MAX
+from frontends import SERVE_FRONTENDS, load_bundles, frontend_stats
+from opening_hours import hours_engine, TABLES as HOURS_TABLES, STATUS_MAX_AGE_SECONDS
+from images import add_srcsets, register_images, process_urls, derivative_for_content, derivative_for_source, image_stats, IMMUTABLE_CACHE_CONTROL, ON_DEMAND_CACHE_CONTROL
+from table_io import stream_export, export_filename, import_rows, EXPORT_TABLES, IMPORT_TABLES, FORMATS
+from bulk import apply_event_batch, apply_artwork_batch, apply_holiday_batch, batch_size, failed, BATCH_MAX_ITEMS
+from occurrences import parse_range, query_occurrences, rebuild_event_occurrences, delete_event_occurrences
 from datetime import date, datetime, timedelta
 from collections import defaultdict
 from pydantic import BaseModel
 from typing import Optional, List
 from jose import JWTError, jwt # type: ignore
-import bcrypt # type: ignore
-from apscheduler.schedulers.background import BackgroundScheduler # type: ignore
 
-# Create tables if they don't exist
-Base.metadata.create_all(bind=engine)
+# `python -m serve` runs the setup once before forking workers and turns this off
+SCHEMA_SETUP_ON_IMPORT = os.environ.get("SCHEMA_SETUP_ON_IMPORT", "true").lower() == "true"
+
+def setup_database():
+    """Create tables if they don't exist, then bring existing ones up to date."""
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    ensure_artwork_index(engine)
+
+if SCHEMA_SETUP_ON_IMPORT:
+    setup_database()
 
 app = FastAPI()
 
@@ -45,85 +77,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# --- Scheduler Setup ---
-def send_monthly_newsletter_task():
-    """Background task to 'dispatch' newsletter links to all members."""
-    print(f"[{datetime.now()}] Monthly Newsletter Task Started...")
-    db = SessionLocal()
-    try:
-        users = db.query(User).all()
-        for user in users:
-            print(f"Dispatched January 2026 Newsletter link to: {user.email}")
-            # In a real app, logic to send email via SMTP/SendGrid would go here
-            
-            # Log the dispatch
-            log_entry = NewsletterLog(
-                user_email=user.email,
-                sent_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                status="sent"
-            )
-            db.add(log_entry)
-        
-        db.commit()
-        print(f"[{datetime.now()}] Monthly Newsletter Task Completed. {len(users)} users notified.")
-    except Exception as e:
-        print(f"Error in newsletter task: {e}")
-    finally:
-        db.close()
+# Outermost so latency includes CORS handling
+app.add_middleware(MetricsMiddleware)
 
-scheduler = BackgroundScheduler()
-# Schedule for the 1st day of every month at 9:00 AM
-scheduler.add_job(send_monthly_newsletter_task, 'cron', day=1, hour=9, minute=0)
+@app.exception_handler(AuthBusyError)
+async def auth_busy_handler(request: Request, exc: AuthBusyError):
+    # Only the auth endpoints hash passwords, so only they are shed under a login storm
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication is busy, please retry shortly"},
+        headers={"Retry-After": "2"},
+    )
 
-def process_email_queue_task():
-    """Background task to send queued emails with retry logic for slow connections."""
-    print(f"[{datetime.now()}] Email Queue Processing Started...")
-    db = SessionLocal()
-    try:
-        # Get pending or failed emails that haven't reached max retries
-        queued_emails = db.query(EmailQueue).filter(
-            EmailQueue.status.in_(["pending", "failed"]),
-            EmailQueue.retry_count < 5
-        ).all()
-
-        if not queued_emails:
-            print("No emails in queue.")
-            return
-
-        for email in queued_emails:
-            try:
-                print(f"Attempting to send email to: {email.recipient} (Subject: {email.subject})")
-                
-                # SIMULATION: In a real app, use smtplib or an API here.
-                # If network is slow/unstable, this would raise an exception.
-                # For this project, we simulate success unless the logic is changed.
-                
-                email.status = "sent"
-                email.sent_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                print(f"Successfully sent email to {email.recipient}")
-                
-            except Exception as send_error:
-                print(f"Failed to send email to {email.recipient}: {send_error}")
-                email.status = "failed"
-                email.retry_count += 1
-            
-        db.commit()
-    except Exception as e:
-        print(f"Error in email queue task: {e}")
-    finally:
-        db.close()
+@app.exception_handler(AdmissionRejected)
+async def admission_rejected_handler(request: Request, exc: AdmissionRejected):
+    # 429 for one noisy address, 503 when the auth endpoints as a whole are saturated
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
-# Check the email queue every minute for resilience
-scheduler.add_job(process_email_queue_task, 'interval', minutes=1)
+# --- Scheduler Setup ---
+# Jobs live in scheduler.py; leases make each tick run in one process however many workers start.
+# Built at startup rather than import so a preloading parent never owns scheduler threads.
+scheduler = None
 
 @app.on_event("startup")
 def startup_event():
+    global scheduler
+    if SCHEDULER_MODE != "embedded":
+        print("Scheduler disabled in this process (SCHEDULER_MODE=external).")
+        return
+    on_start()
+    scheduler = build_scheduler()
     scheduler.start()
     print("Background Scheduler Started.")
 
 @app.on_event("shutdown")
 def shutdown_event():
+    if scheduler is None:
+        return
     scheduler.shutdown()
+    email_worker.close()
     print("Background Scheduler Shutdown.")
 
 # Dependency to get DB session
@@ -134,6 +130,19 @@ def get_db():
     finally:
         db.close()
 
+# Read-only session for GET endpoints (separate pool, see database.py)
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Async dependency for the hot public read endpoints
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
 # --- Schemas ---
 class EventCreate(BaseModel):
     title: str
@@ -152,6 +161,31 @@ class HolidayCreate(BaseModel):
     name: str
     date: date
 
+# --- Batch schemas: every list is optional; `atomic` rolls back the whole batch if any item fails ---
+class EventUpdateItem(EventCreate):
+    id: int
+
+class EventExceptionChange(BaseModel):
+    event_id: int
+    exception_date: date
+
+class EventBatch(BaseModel):
+    create: List[EventCreate] = []
+    update: List[EventUpdateItem] = []
+    delete: List[int] = []
+    add_exceptions: List[EventExceptionChange] = []
+    remove_exceptions: List[EventExceptionChange] = []
+    atomic: bool = False
+
+class HolidayUpdateItem(HolidayCreate):
+    id: int
+
+class HolidayBatch(BaseModel):
+    create: List[HolidayCreate] = []
+    update: List[HolidayUpdateItem] = []
+    delete: List[int] = []
+    atomic: bool = False
+
 class UserRegister(BaseModel):
     email: str
     password: str
@@ -187,6 +221,15 @@ class ArtworkCreate(BaseModel):
     department: str
     curators_insight: str
 
+class ArtworkUpdateItem(ArtworkCreate):
+    id: int
+
+class ArtworkBatch(BaseModel):
+    create: List[ArtworkCreate] = []
+    update: List[ArtworkUpdateItem] = []
+    delete: List[int] = []
+    atomic: bool = False
+
 class NewsletterSection(BaseModel):
     title: str
     content: str
@@ -206,16 +249,47 @@ class NewsletterUpdate(BaseModel):
 
 
 # --- Security Utils ---
-def get_password_hash(password: str):
-    pwd_bytes = password.encode('utf-8')
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(pwd_bytes, salt)
-    return hashed.decode('utf-8')
+# bcrypt runs on a bounded pool (see passwords.py) so auth bursts cannot starve other requests.
+# The auth routes are async and await it; their short DB steps below run on the threadpool.
+async def get_password_hash(password: str):
+    return await hash_password(password)
+
+async def verify_password(plain_password: str, hashed_password: str):
+    return await check_password(plain_password, hashed_password)
+
+def find_credentials(email: str):
+    """(email, hashed_password, role) for an account, or None."""
+    db = SessionLocal()
+    try:
+        return db.query(User.email, User.hashed_password, User.role).filter(User.email == email).first()
+    finally:
+        db.close()
 
-def verify_password(plain_password: str, hashed_password: str):
-    password_byte_enc = plain_password.encode('utf-8')
-    hashed_password_byte_enc = hashed_password.encode('utf-8')
-    return bcrypt.checkpw(password_byte_enc, hashed_password_byte_enc)
+def add_user(email: str, hashed_password: str, role: str):
+    """Insert an account; returns its id, or None if the email was registered meanwhile."""
+    db = SessionLocal()
+    try:
+        new_user = User(email=email, hashed_password=hashed_password, role=role)
+        db.add(new_user)
+        try:
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            return None
+        return new_user.id
+    finally:
+        db.close()
+
+def delete_member(email: str):
+    db = SessionLocal()
+    try:
+        # Delete associated newsletter logs, then the user
+        db.query(NewsletterLog).filter(NewsletterLog.user_email == email).delete()
+        db.query(User).filter(User.email == email).delete()
+        db.commit()
+    finally:
+        db.close()
+    principal_cache.invalidate_user(email)
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -224,22 +298,23 @@ def create_access_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_read_db)):
+    # Resolved principals are cached per token, so repeat calls skip JWT decoding and the users lookup
+    principal = principal_cache.get(token)
+    if principal is not None:
+        return principal
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        print(f"Validating token: {token[:10]}...")
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
-        print(f"Token payload email: {email}")
         if email is None:
-            print("Email is None in payload")
             raise credentials_exception
     except JWTError as e:
-        print(f"JWT Error: {e}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Token validation failed: {str(e)}",
@@ -247,15 +322,16 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
         )
     user = db.query(User).filter(User.email == email).first()
     if user is None:
-        print(f"User not found for email: {email}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User associated with token not found",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    return user
+    principal = Principal.from_user(user)
+    principal_cache.put(token, principal, payload.get("exp"))
+    return principal
 
-async def get_current_super_admin(user: User = Depends(get_current_user)):
+async def get_current_super_admin(user: Principal = Depends(get_current_user)):
     if user.role != "super_admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -263,7 +339,7 @@ async def get_current_super_admin(user: User = Depends(get_current_user)):
         )
     return user
 
-async def get_current_any_admin(user: User = Depends(get_current_user)):
+async def get_current_any_admin(user: Principal = Depends(get_current_user)):
     if user.role not in ["super_admin", "admin"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -278,29 +354,63 @@ def read_root():
     return {"message": "Welcome to the High Museum of Art API"}
 
 @app.get("/api/hours")
-def get_hours(db: Session = Depends(get_db)):
-    hours = db.query(OperatingHour).all()
-    return {h.day: h.hours for h in hours}
+async def get_hours(request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def build():
+        hours = (await db.execute(select(OperatingHour))).scalars().all()
+        return {h.day: h.hours for h in hours}
+    return await cached_json_response_async(request, ("operating_hours",), build)
 
 @app.get("/api/holidays")
-def get_holidays(db: Session = Depends(get_db)):
-    holidays = db.query(Holiday).all()
-    return {h.name: str(h.date) for h in holidays}
+async def get_holidays(request: Request, db: AsyncSession = Depends(get_async_db)):
+    async def build():
+        holidays = (await db.execute(select(Holiday))).scalars().all()
+        return {h.name: str(h.date) for h in holidays}
+    return await cached_json_response_async(request, ("holidays",), build)
+
+@app.get("/api/status/now")
+def get_status_now():
+    """Open or closed right now, with the next opening and closing; computed from the hours calendar."""
+    payload = hours_engine.status()
+    # Cacheable until the next change of state, capped so holiday edits show up quickly
+    changes = [datetime.fromisoformat(t) for t in (payload["next_opening"], payload["next_closing"]) if t]
+    until = (min(changes) - datetime.fromisoformat(payload["as_of"])).total_seconds() if changes else STATUS_MAX_AGE_SECONDS
+    max_age = max(0, min(STATUS_MAX_AGE_SECONDS, int(until)))
+    return Response(content=dumps(payload), media_type="application/json", headers={"Cache-Control": f"public, max-age={max_age}"})
+
+@app.get("/api/hours/calendar")
+def get_hours_calendar(request: Request):
+    """Opening hours for each of the next HOURS_CALENDAR_DAYS days, holidays applied."""
+    calendar = hours_engine.calendar()
+    return cached_json_response(request, HOURS_TABLES, calendar.payload, variant=calendar.start.isoformat())
 
 @app.get("/api/admin/holidays")
-def get_all_holidays(db: Session = Depends(get_db)):
+def get_all_holidays(db: Session = Depends(get_read_db)):
     # Admin endpoint: flat list with IDs
     holidays = db.query(Holiday).order_by(Holiday.date).all()
     return holidays
 
+@app.post("/api/holidays/batch")
+def batch_holidays(
+    batch: HolidayBatch,
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_any_admin),
+    db: Session = Depends(get_db)
+):
+    """Apply many holiday creates/updates/deletes in one transaction."""
+    check_batch_size(batch)
+    results, changed, deleted = apply_holiday_batch(db, batch)
+    commit_batch(db, batch, results, "holidays", background_tasks)
+    return {"results": results, "changed": changed, "deleted": deleted}
+
 @app.post("/api/holidays")
 def create_holiday(
     holiday: HolidayCreate,
-    current_user: User = Depends(get_current_any_admin),
+    current_user: Principal = Depends(get_current_any_admin),
     db: Session = Depends(get_db)
 ):
     db_holiday = Holiday(name=holiday.name, date=holiday.date)
     db.add(db_holiday)
+    bump_version(db, "holidays")
     db.commit()
     db.refresh(db_holiday)
     return db_holiday
@@ -308,13 +418,14 @@ def create_holiday(
 @app.delete("/api/holidays/{holiday_id}")
 def delete_holiday(
     holiday_id: int,
-    current_user: User = Depends(get_current_any_admin),
+    current_user: Principal = Depends(get_current_any_admin),
     db: Session = Depends(get_db)
 ):
     db_holiday = db.query(Holiday).filter(Holiday.id == holiday_id).first()
     if not db_holiday:
         raise HTTPException(status_code=404, detail="Holiday not found")
     db.delete(db_holiday)
+    bump_version(db, "holidays")
     db.commit()
     return {"status": "deleted"}
 
@@ -322,7 +433,7 @@ def delete_holiday(
 def update_holiday(
     holiday_id: int,
     holiday: HolidayCreate,
-    current_user: User = Depends(get_current_any_admin),
+    current_user: Principal = Depends(get_current_any_admin),
     db: Session = Depends(get_db)
 ):
     db_holiday = db.query(Holiday).filter(Holiday.id == holiday_id).first()
@@ -330,13 +441,51 @@ def update_holiday(
         raise HTTPException(status_code=404, detail="Holiday not found")
     db_holiday.name = holiday.name
     db_holiday.date = holiday.date
+    bump_version(db, "holidays")
     db.commit()
     db.refresh(db_holiday)
     return db_holiday
 
 @app.get("/api/events")
-def get_events(db: Session = Depends(get_db)):
-    # Public endpoint: grouped by date, including descriptions
+async def get_events(
+    request: Request,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Public endpoint: with a start/end window, return concrete occurrences for
+    # that window only (recurrences expanded and exceptions removed server-side)
+    if start is not None or end is not None:
+        if start is None or end is None:
+            raise HTTPException(status_code=400, detail="Both start and end are required")
+        try:
+            window_start, window_end = parse_range(start, end)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        async def build_window():
+            return {
+                "start": str(window_start),
+                "end": str(window_end),
+                "occurrences": await db.run_sync(occurrences_payload, window_start, window_end)
+            }
+        return await cached_json_response_async(request, ("events", "images"), build_window, variant=f"{window_start}:{window_end}")
+
+    async def build_grouped():
+        return await db.run_sync(grouped_events_payload)
+    return await cached_json_response_async(request, ("events", "images"), build_grouped)
+
+
+def occurrences_payload(db: Session, window_start: date, window_end: date):
+    occurrences = query_occurrences(db, window_start, window_end)
+    # Each event's dict is shared by all of its occurrences; add its srcset once
+    unique = {id(item): item for items in occurrences.values() for item in items}
+    add_srcsets(db, unique.values())
+    return occurrences
+
+
+def grouped_events_payload(db: Session):
+    # Legacy shape: grouped by date, including descriptions
     events = db.query(Event).all()
     
     # fetch all exceptions
@@ -356,35 +505,75 @@ def get_events(db: Session = Depends(get_db)):
             "exception_dates": exceptions_by_event.get(event.id, [])
         }
         grouped_events[str(event.date)].append(event_data)
+    add_srcsets(db, [item for items in grouped_events.values() for item in items])
     return {"monthly_events": [grouped_events]}
 
 
-@app.get("/api/admin/events")
-def get_all_events(db: Session = Depends(get_db)):
-    # Admin endpoint: flat list with IDs
-    events = db.query(Event).order_by(Event.date).all()
-    
-    exceptions = db.query(EventException).all()
+ADMIN_EVENT_FIELDS = ("id", "date", "title", "category", "description", "image_url", "recurrence")
+
+def admin_event_rows(db: Session, event_ids=None):
+    """Admin list rows (with exception_dates), for every event or only `event_ids`."""
+    exceptions = db.query(EventException.event_id, EventException.exception_date)
+    events = db.query(*[getattr(Event, c) for c in ADMIN_EVENT_FIELDS])
+    if event_ids is not None:
+        if not event_ids:
+            return []
+        exceptions = exceptions.filter(EventException.event_id.in_(event_ids))
+        events = events.filter(Event.id.in_(event_ids))
     exceptions_by_event = defaultdict(list)
-    for ext in exceptions:
-        exceptions_by_event[ext.event_id].append(str(ext.exception_date))
-        
-    return [{
-        "id": e.id, 
-        "date": e.date, 
-        "title": e.title, 
-        "category": e.category, 
-        "description": e.description, 
-        "image_url": e.image_url, 
-        "recurrence": e.recurrence,
-        "exception_dates": exceptions_by_event.get(e.id, [])
-    } for e in events]
+    for event_id, exception_date in exceptions:
+        exceptions_by_event[event_id].append(str(exception_date))
+    rows = rows_to_dicts(ADMIN_EVENT_FIELDS, events.order_by(Event.date).all())
+    for e in rows:
+        e["exception_dates"] = exceptions_by_event.get(e["id"], [])
+    return rows
+
+@app.get("/api/admin/events")
+def get_all_events(request: Request, db: Session = Depends(get_read_db)):
+    # Admin endpoint: flat list with IDs, built from column tuples and cached serialized
+    return cached_json_response(request, ("events",), lambda: admin_event_rows(db), variant="admin")
+
+def check_batch_size(batch):
+    if batch_size(batch) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"Batch too large, maximum is {BATCH_MAX_ITEMS} items")
+
+def process_images_after_commit(db: Session, background_tasks: BackgroundTasks, urls):
+    """Register saved image URLs in the caller's transaction; derivatives are rendered after the response."""
+    pending = register_images(db, urls)
+    if pending:
+        background_tasks.add_task(process_urls, pending)
+
+def commit_batch(db: Session, batch, results, table: str, background_tasks: BackgroundTasks):
+    """Roll back an atomic batch with failed items; otherwise bump the table version and commit once."""
+    problems = failed(results)
+    if batch.atomic and problems:
+        db.rollback()
+        raise HTTPException(status_code=409, detail={"message": "Batch rolled back", "failed": problems})
+    if len(problems) < len(results):
+        bump_version(db, table)
+    if table != "holidays":
+        process_images_after_commit(db, background_tasks, [item.image_url for item in batch.create + batch.update])
+    db.commit()
+
+@app.post("/api/events/batch")
+def batch_events(
+    batch: EventBatch,
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_any_admin),
+    db: Session = Depends(get_db)
+):
+    """Apply many event creates/updates/deletes and exception changes in one transaction."""
+    check_batch_size(batch)
+    results, changed, deleted = apply_event_batch(db, batch)
+    commit_batch(db, batch, results, "events", background_tasks)
+    return {"results": results, "changed": admin_event_rows(db, changed), "deleted": deleted}
 
 
 @app.post("/api/events")
 def create_event(
     event: EventCreate,
-    current_user: User = Depends(get_current_any_admin),
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_any_admin),
     db: Session = Depends(get_db)
 ):
     db_event = Event(
@@ -396,7 +585,11 @@ def create_event(
         recurrence=event.recurrence
     )
     db.add(db_event)
+    db.flush()
+    rebuild_event_occurrences(db, db_event)
 
+    bump_version(db, "events")
+    process_images_after_commit(db, background_tasks, [event.image_url])
     db.commit()
     db.refresh(db_event)
     return db_event
@@ -404,13 +597,15 @@ def create_event(
 @app.delete("/api/events/{event_id}")
 def delete_event(
     event_id: int,
-    current_user: User = Depends(get_current_any_admin),
+    current_user: Principal = Depends(get_current_any_admin),
     db: Session = Depends(get_db)
 ):
     db_event = db.query(Event).filter(Event.id == event_id).first()
     if not db_event:
         raise HTTPException(status_code=404, detail="Event not found")
+    delete_event_occurrences(db, db_event.id)
     db.delete(db_event)
+    bump_version(db, "events")
     db.commit()
     return {"status": "deleted"}
 
@@ -418,7 +613,8 @@ def delete_event(
 def update_event(
     event_id: int,
     event: EventCreate,
-    current_user: User = Depends(get_current_any_admin),
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_any_admin),
     db: Session = Depends(get_db)
 ):
     db_event = db.query(Event).filter(Event.id == event_id).first()
@@ -430,12 +626,15 @@ def update_event(
     db_event.image_url = event.image_url
     db_event.category = event.category
     db_event.recurrence = event.recurrence
+    rebuild_event_occurrences(db, db_event)
+    bump_version(db, "events")
+    process_images_after_commit(db, background_tasks, [event.image_url])
     db.commit()
     db.refresh(db_event)
     return db_event
 
 @app.post("/api/events/{event_id}/exceptions")
-def add_event_exception(event_id: int, exception: EventExceptionCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_any_admin)):
+def add_event_exception(event_id: int, exception: EventExceptionCreate, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_any_admin)):
     db_event = db.query(Event).filter(Event.id == event_id).first()
     if not db_event:
         raise HTTPException(status_code=404, detail="Event not found")
@@ -447,11 +646,14 @@ def add_event_exception(event_id: int, exception: EventExceptionCreate, db: Sess
         
     new_exception = EventException(event_id=event_id, exception_date=exception.exception_date)
     db.add(new_exception)
+    db.flush()
+    rebuild_event_occurrences(db, db_event)
+    bump_version(db, "events")
     db.commit()
     return {"message": "Exception added"}
     
 @app.delete("/api/events/{event_id}/exceptions/{date_str}")
-def delete_event_exception(event_id: int, date_str: str, db: Session = Depends(get_db), current_user: User = Depends(get_current_any_admin)):
+def delete_event_exception(event_id: int, date_str: str, db: Session = Depends(get_db), current_user: Principal = Depends(get_current_any_admin)):
     try:
         dt = date.fromisoformat(date_str)
     except ValueError:
@@ -462,23 +664,141 @@ def delete_event_exception(event_id: int, date_str: str, db: Session = Depends(g
         raise HTTPException(status_code=404, detail="Exception not found")
         
     db.delete(ext)
+    db.flush()
+    db_event = db.query(Event).filter(Event.id == event_id).first()
+    if db_event:
+        rebuild_event_occurrences(db, db_event)
+    bump_version(db, "events")
     db.commit()
     return {"message": "Exception deleted"}
 
 
 
+# Columns a client may project with ?fields=, and the compact set used by ?view=list
+ARTWORK_FIELDS = ("id", "title", "creator", "image_url", "metadata_info", "department", "curators_insight")
+ARTWORK_LIST_FIELDS = ("id", "title", "creator", "image_url", "department")
+ARTWORK_PAGE_MAX = 200
+
+def resolve_artwork_fields(fields: Optional[str], view: Optional[str]):
+    if fields:
+        requested = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in requested if f not in ARTWORK_FIELDS]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown artwork fields: {', '.join(unknown)}")
+        # id is always returned since it is the pagination cursor
+        return ("id",) + tuple(f for f in ARTWORK_FIELDS if f in requested and f != "id")
+    if view in (None, "detail"):
+        return ARTWORK_FIELDS
+    if view == "list":
+        return ARTWORK_LIST_FIELDS
+    raise HTTPException(status_code=400, detail="view must be 'list' or 'detail'")
+
+def all_artworks(db: Session):
+    """Every artwork as plain dicts, read as column tuples rather than ORM objects."""
+    return add_srcsets(db, rows_to_dicts(ARTWORK_FIELDS, db.query(*[getattr(Artwork, c) for c in ARTWORK_FIELDS]).all()))
+
+def artwork_page(db: Session, columns, limit: int, after: Optional[int]):
+    """Keyset page of artworks ordered by id, selecting only `columns` in SQL."""
+    query = db.query(*[getattr(Artwork, c) for c in columns])
+    if after is not None:
+        query = query.filter(Artwork.id > after)
+    rows = query.order_by(Artwork.id).limit(limit + 1).all()
+    items = add_srcsets(db, rows_to_dicts(columns, rows[:limit]))
+    next_cursor = items[-1]["id"] if len(rows) > limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
 @app.get("/api/artworks")
-def get_artworks(db: Session = Depends(get_db)):
-    return db.query(Artwork).all()
+async def get_artworks(
+    request: Request,
+    limit: Optional[int] = None,
+    after: Optional[int] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db)
+):
+    # Without paging/projection parameters keep returning the full list
+    if limit is None and after is None and fields is None and view is None:
+        async def build_all():
+            return await db.run_sync(all_artworks)
+        return await cached_json_response_async(request, ("artworks", "images"), build_all)
+
+    columns = resolve_artwork_fields(fields, view)
+    limit = max(1, min(limit or 50, ARTWORK_PAGE_MAX))
+
+    async def build_page():
+        return await db.run_sync(artwork_page, columns, limit, after)
+    return await cached_json_response_async(
+        request, ("artworks", "images"), build_page, variant=f"{','.join(columns)}:{limit}:{after}"
+    )
+
+@app.get("/api/artworks/search")
+async def search_artwork_collection(
+    request: Request,
+    q: str,
+    limit: int = 20,
+    offset: int = 0,
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Full-text search over title, creator, department, metadata and curator notes."""
+    if not q.strip():
+        raise HTTPException(status_code=400, detail="Query must not be empty")
+    limit = max(1, min(limit, SEARCH_PAGE_MAX))
+    offset = max(0, offset)
+
+    def search_with_srcsets(session: Session):
+        results = search_artworks(session, q, limit, offset)
+        add_srcsets(session, results["items"])
+        return results
+
+    async def build():
+        return await db.run_sync(search_with_srcsets)
+    return await cached_json_response_async(request, ("artworks", "images"), build, variant=f"search:{q}:{limit}:{offset}")
+
+@app.get("/api/artworks/{artwork_id}")
+async def get_artwork(artwork_id: int, db: AsyncSession = Depends(get_async_db)):
+    # Detail view: every column for a single artwork
+    db_artwork = await db.get(Artwork, artwork_id)
+    if not db_artwork:
+        raise HTTPException(status_code=404, detail="Artwork not found")
+    item = {c: getattr(db_artwork, c) for c in ARTWORK_FIELDS}
+    return await db.run_sync(lambda session: add_srcsets(session, [item])[0])
 
 @app.get("/api/admin/artworks")
-def get_admin_artworks(db: Session = Depends(get_db)):
-    return db.query(Artwork).all()
+def get_admin_artworks(
+    request: Request,
+    limit: Optional[int] = None,
+    after: Optional[int] = None,
+    fields: Optional[str] = None,
+    view: Optional[str] = None,
+    db: Session = Depends(get_read_db)
+):
+    if limit is None and after is None and fields is None and view is None:
+        return cached_json_response(request, ("artworks", "images"), lambda: all_artworks(db), variant="admin")
+    columns = resolve_artwork_fields(fields, view)
+    limit = max(1, min(limit or 50, ARTWORK_PAGE_MAX))
+    return cached_json_response(
+        request, ("artworks", "images"), lambda: artwork_page(db, columns, limit, after),
+        variant=f"admin:{','.join(columns)}:{limit}:{after}"
+    )
+
+@app.post("/api/artworks/batch")
+def batch_artworks(
+    batch: ArtworkBatch,
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_any_admin),
+    db: Session = Depends(get_db)
+):
+    """Apply many artwork creates/updates/deletes in one transaction."""
+    check_batch_size(batch)
+    results, changed, deleted = apply_artwork_batch(db, batch)
+    commit_batch(db, batch, results, "artworks", background_tasks)
+    return {"results": results, "changed": changed, "deleted": deleted}
 
 @app.post("/api/artworks")
 def create_artwork(
     artwork: ArtworkCreate,
-    current_user: User = Depends(get_current_any_admin),
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_any_admin),
     db: Session = Depends(get_db)
 ):
     db_artwork = Artwork(
@@ -490,6 +810,10 @@ def create_artwork(
         curators_insight=artwork.curators_insight
     )
     db.add(db_artwork)
+    db.flush()
+    index_artwork(db, db_artwork)
+    bump_version(db, "artworks")
+    process_images_after_commit(db, background_tasks, [artwork.image_url])
     db.commit()
     db.refresh(db_artwork)
     return db_artwork
@@ -497,13 +821,15 @@ def create_artwork(
 @app.delete("/api/artworks/{artwork_id}")
 def delete_artwork(
     artwork_id: int,
-    current_user: User = Depends(get_current_any_admin),
+    current_user: Principal = Depends(get_current_any_admin),
     db: Session = Depends(get_db)
 ):
     db_artwork = db.query(Artwork).filter(Artwork.id == artwork_id).first()
     if not db_artwork:
         raise HTTPException(status_code=404, detail="Artwork not found")
+    unindex_artwork(db, db_artwork.id)
     db.delete(db_artwork)
+    bump_version(db, "artworks")
     db.commit()
     return {"status": "deleted"}
 
@@ -511,7 +837,8 @@ def delete_artwork(
 def update_artwork(
     artwork_id: int,
     artwork: ArtworkCreate,
-    current_user: User = Depends(get_current_any_admin),
+    background_tasks: BackgroundTasks,
+    current_user: Principal = Depends(get_current_any_admin),
     db: Session = Depends(get_db)
 ):
     db_artwork = db.query(Artwork).filter(Artwork.id == artwork_id).first()
@@ -523,35 +850,104 @@ def update_artwork(
     db_artwork.metadata_info = artwork.metadata_info
     db_artwork.department = artwork.department
     db_artwork.curators_insight = artwork.curators_insight
+    index_artwork(db, db_artwork)
+    bump_version(db, "artworks")
+    process_images_after_commit(db, background_tasks, [artwork.image_url])
     db.commit()
     db.refresh(db_artwork)
     return db_artwork
 
+@app.get("/api/images/{content_hash}/{variant}.webp")
+def get_image(content_hash: str, variant: str):
+    """A derivative by the hash of its original; the URL never changes meaning, so it is cached forever."""
+    path = derivative_for_content(content_hash, variant)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(path, media_type="image/webp", headers={"Cache-Control": IMMUTABLE_CACHE_CONTROL})
+
+@app.get("/api/images/source/{url_hash}/{variant}.webp")
+def get_image_by_source(url_hash: str, variant: str):
+    """A derivative of a registered original that may not be processed yet; renders it on first request."""
+    path = derivative_for_source(url_hash, variant)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    return FileResponse(path, media_type="image/webp", headers={"Cache-Control": ON_DEMAND_CACHE_CONTROL})
+
 @app.get("/api/status")
 def get_status():
     return {"status": "operational", "version": "1.0.0", "source": "database"}
 
+metrics_registry.register_collector(
+    "response_cache", "Reference data response cache counters.", reference_cache.stats
+)
+metrics_registry.register_collector(
+    "principal_cache", "Resolved principal cache counters.", principal_cache.stats
+)
+metrics_registry.register_collector(
+    "newsletter_editions", "Live newsletter edition cache counters.", edition_resolver.stats
+)
+metrics_registry.register_collector(
+    "auth_pool", "Password hashing pool counters.", auth_metrics
+)
+metrics_registry.register_collector(
+    "opening_hours", "Opening hours calendar lookups, version checks and rebuilds.", hours_engine.stats
+)
+metrics_registry.register_collector(
+    "images", "Image derivative rendering and disk cache counters.", image_stats
+)
+metrics_registry.register_collector(
+    "job_leases", "Scheduled job ticks run, skipped and taken over by this process.", lease_stats
+)
+metrics_registry.register_collector(
+    "auth_admission", "Admitted and shed requests on the auth endpoints.", admission.stats
+)
+
+@app.get("/api/admin/metrics", response_class=PlainTextResponse)
+def get_metrics(current_user: Principal = Depends(get_current_any_admin)):
+    """Request, job and cache metrics in Prometheus text format."""
+    return PlainTextResponse(metrics_registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/admin/auth/metrics")
+def get_auth_metrics(current_user: Principal = Depends(get_current_any_admin)):
+    """Queue time and throughput of the password hashing pool, and admission counters."""
+    return {**auth_metrics(), "admission": admission.stats()}
+
+@app.get("/api/admin/jobs")
+def get_job_leases(current_user: Principal = Depends(get_current_any_admin), db: Session = Depends(get_read_db)):
+    """Lease state of every scheduled job, across all processes."""
+    return {"scheduler_mode": SCHEDULER_MODE, "jobs": list_leases(db)}
+
+@app.get("/api/admin/cache")
+def get_cache_stats(current_user: Principal = Depends(get_current_any_admin)):
+    """Hit/miss counters and size of the reference data response cache."""
+    return reference_cache.stats()
+
+@app.delete("/api/admin/cache")
+def clear_cache(current_user: Principal = Depends(get_current_any_admin)):
+    """Drop every cached reference data response and newsletter edition in this worker."""
+    reference_cache.clear()
+    edition_resolver.invalidate()
+    return {"message": "Cache cleared"}
+
 # --- Auth Endpoints ---
 
-@app.post("/api/register")
-def register(user: UserRegister, db: Session = Depends(get_db)):
+@app.post("/api/register", dependencies=[Depends(admit_auth_request)])
+async def register(user: UserRegister):
     clean_email = user.email.strip().lower()
-    db_user = db.query(User).filter(User.email == clean_email).first()
-    if db_user:
+    if await run_in_threadpool(find_credentials, clean_email):
         raise HTTPException(status_code=400, detail="Email already registered")
     
-    hashed_password = get_password_hash(user.password)
-    new_user = User(email=clean_email, hashed_password=hashed_password)
-    db.add(new_user)
-    db.commit()
+    hashed_password = await get_password_hash(user.password)
+    if await run_in_threadpool(add_user, clean_email, hashed_password, "member") is None:
+        raise HTTPException(status_code=400, detail="Email already registered")
     return {"message": "User created successfully"}
 
-@app.post("/api/login")
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+@app.post("/api/login", dependencies=[Depends(admit_auth_request)])
+async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     clean_username = form_data.username.strip().lower()
     print(f"Login attempt for: {clean_username}")
     
-    user = db.query(User).filter(User.email == clean_username).first()
+    user = await run_in_threadpool(find_credentials, clean_username)
     if not user:
         print(f"Login failed: User {clean_username} not found")
         raise HTTPException(
@@ -560,7 +956,7 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
             headers={"WWW-Authenticate": "Bearer"},
         )
         
-    if not verify_password(form_data.password, user.hashed_password):
+    if not await verify_password(form_data.password, user.hashed_password):
         print(f"Login failed: Incorrect password for {clean_username}")
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -576,35 +972,32 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
 
 @app.get("/api/admin/users", response_model=List[UserAdminResponse])
 def get_admin_users(
-    current_user: User = Depends(get_current_super_admin),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_super_admin),
+    db: Session = Depends(get_read_db)
 ):
     """List all administrators (Super Admin only)."""
     return db.query(User).filter(User.role.in_(["super_admin", "admin"])).all()
 
 @app.post("/api/admin/users")
-def create_admin_user(
+async def create_admin_user(
     user_data: UserCreate,
-    current_user: User = Depends(get_current_super_admin),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_super_admin)
 ):
     """Create a new administrator (Super Admin only)."""
     clean_email = user_data.email.strip().lower()
-    existing = db.query(User).filter(User.email == clean_email).first()
-    if existing:
+    if await run_in_threadpool(find_credentials, clean_email):
         raise HTTPException(status_code=400, detail="User already exists")
     
-    hashed_pwd = get_password_hash(user_data.password)
-    new_user = User(email=clean_email, hashed_password=hashed_pwd, role=user_data.role)
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
-    return {"message": "Admin user created successfully", "id": new_user.id}
+    hashed_pwd = await get_password_hash(user_data.password)
+    user_id = await run_in_threadpool(add_user, clean_email, hashed_pwd, user_data.role)
+    if user_id is None:
+        raise HTTPException(status_code=400, detail="User already exists")
+    return {"message": "Admin user created successfully", "id": user_id}
 
 @app.delete("/api/admin/users/{user_id}")
 def delete_admin_user(
     user_id: int,
-    current_user: User = Depends(get_current_super_admin),
+    current_user: Principal = Depends(get_current_super_admin),
     db: Session = Depends(get_db)
 ):
     """Delete an administrator (Super Admin only)."""
@@ -617,16 +1010,17 @@ def delete_admin_user(
         
     db.delete(user)
     db.commit()
+    principal_cache.invalidate_user(user.email)
     return {"message": "Admin user deleted successfully"}
 
 # --- Protected Newsletter Endpoint ---
 
 @app.get("/api/newsletter")
 def get_newsletter(
-    current_user: User = Depends(get_current_user),
-    accept_language: Optional[str] = Header(None),
-    db: Session = Depends(get_db)
+    current_user: Principal = Depends(get_current_user),
+    accept_language: Optional[str] = Header(None)
 ):
+    """Live edition for the caller's language, served from the edition resolver."""
     lang = "en"
     if accept_language:
         if "es" in accept_language.lower():
@@ -634,49 +1028,32 @@ def get_newsletter(
         elif "fr" in accept_language.lower():
             lang = "fr"
 
-    now_str = datetime.now().strftime("%Y-%m-%dT%H:%M:%S")
-    
-    # Get the latest published newsletter for this language
-    newsletter = db.query(Newsletter).filter(
-        Newsletter.lang == lang,
-        Newsletter.publish_at <= now_str
-    ).order_by(Newsletter.publish_at.desc()).first()
-
-    if not newsletter:
-        # Fallback to English if no newsletter for specific language
-        newsletter = db.query(Newsletter).filter(
-            Newsletter.lang == "en",
-            Newsletter.publish_at <= now_str
-        ).order_by(Newsletter.publish_at.desc()).first()
-
-    if not newsletter:
+    body = edition_resolver.get(lang)
+    if body is None:
         raise HTTPException(status_code=404, detail="No published newsletter found")
-
-    return {
-        "month": newsletter.month,
-        "title": newsletter.title,
-        "subtitle": newsletter.subtitle,
-        "introduction": newsletter.introduction,
-        "sections": newsletter.sections,
-        "citation": newsletter.citation,
-        "verification_hash": newsletter.verification_hash,
-        "publish_at": newsletter.publish_at
-    }
+    return Response(content=body, media_type="application/json")
 
 # --- Admin Newsletter Endpoints ---
 
+NEWSLETTER_FIELDS = ("id", "lang", "month", "title", "subtitle", "introduction", "sections", "citation",
+                     "verification_hash", "publish_at")
+
 @app.get("/api/admin/newsletters")
 def get_all_newsletters(
-    current_user: User = Depends(get_current_any_admin),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: Principal = Depends(get_current_any_admin),
+    db: Session = Depends(get_read_db)
 ):
     """List all newsletters (including future drafts) for admin management."""
-    return db.query(Newsletter).order_by(Newsletter.publish_at.desc()).all()
+    def build():
+        rows = db.query(*[getattr(Newsletter, c) for c in NEWSLETTER_FIELDS]).order_by(Newsletter.publish_at.desc()).all()
+        return rows_to_dicts(NEWSLETTER_FIELDS, rows)
+    return cached_json_response(request, ("newsletters",), build, variant="admin")
 
 @app.post("/api/admin/newsletter")
 def create_or_update_newsletter(
     news_data: NewsletterUpdate,
-    current_user: User = Depends(get_current_any_admin),
+    current_user: Principal = Depends(get_current_any_admin),
     db: Session = Depends(get_db)
 ):
     """Create or update a newsletter for a specific language and publish date."""
@@ -710,12 +1087,14 @@ def create_or_update_newsletter(
         )
         db.add(new_news)
     
+    bump_version(db, "newsletters")
     db.commit()
+    edition_resolver.invalidate()
     return {"message": "Newsletter saved successfully"}
 @app.delete("/api/admin/newsletter/{news_id}")
 def delete_newsletter(
     news_id: int,
-    current_user: User = Depends(get_current_any_admin),
+    current_user: Principal = Depends(get_current_any_admin),
     db: Session = Depends(get_db)
 ):
     """Delete a newsletter by ID."""
@@ -724,27 +1103,69 @@ def delete_newsletter(
         raise HTTPException(status_code=404, detail="Newsletter not found")
     
     db.delete(newsletter)
+    bump_version(db, "newsletters")
     db.commit()
+    edition_resolver.invalidate()
     return {"message": "Newsletter deleted successfully"}
 
 # --- Internal / Admin Endpoints for Verification ---
 
 @app.post("/api/admin/newsletter/test-trigger")
-def trigger_newsletter_test(current_user: User = Depends(get_current_any_admin)):
+def trigger_newsletter_test(current_user: Principal = Depends(get_current_any_admin)):
     """Manually trigger the monthly newsletter task for testing/verification."""
-    send_monthly_newsletter_task()
+    send_monthly_newsletter_task(f"manual-{datetime.now().strftime('%Y%m%d%H%M%S%f')}")
     return {"message": "Newsletter task triggered manually. Check server logs and newsletter_logs table."}
 
+NEWSLETTER_LOG_FIELDS = ("id", "user_email", "sent_at", "status")
+
 @app.get("/api/admin/newsletter/logs")
 def get_newsletter_logs(
-    current_user: User = Depends(get_current_any_admin),
-    db: Session = Depends(get_db)
+    request: Request,
+    current_user: Principal = Depends(get_current_any_admin),
+    db: Session = Depends(get_read_db)
+):
+    # Changes on every dispatch, so not cached; just the fast serialization path
+    rows = db.query(*[getattr(NewsletterLog, c) for c in NEWSLETTER_LOG_FIELDS]).order_by(NewsletterLog.id.desc()).limit(50).all()
+    return fast_json_response(request, rows_to_dicts(NEWSLETTER_LOG_FIELDS, rows))
+
+# --- Bulk Export / Import ---
+
+@app.get("/api/admin/export/{table}")
+def export_table(
+    table: str,
+    fmt: str = Query("ndjson", alias="format"),
+    after: Optional[int] = None,
+    current_user: Principal = Depends(get_current_any_admin)
 ):
-    return db.query(NewsletterLog).order_by(NewsletterLog.id.desc()).limit(50).all()
+    """Stream users, email_queue or newsletter_logs as NDJSON or CSV, in constant memory."""
+    if table not in EXPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table, use one of: {', '.join(EXPORT_TABLES)}")
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    return StreamingResponse(
+        stream_export(table, fmt, after),
+        media_type=FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{export_filename(table, fmt)}"'}
+    )
+
+@app.post("/api/admin/import/{table}")
+def import_table(
+    table: str,
+    file: UploadFile = File(...),
+    fmt: Optional[str] = Query(None, alias="format"),
+    current_user: Principal = Depends(get_current_super_admin)
+):
+    """Import an NDJSON or CSV upload, parsed line by line and inserted in chunked transactions (Super Admin only)."""
+    if table not in IMPORT_TABLES:
+        raise HTTPException(status_code=404, detail=f"Unknown table, use one of: {', '.join(IMPORT_TABLES)}")
+    fmt = fmt or ("csv" if (file.filename or "").lower().endswith(".csv") else "ndjson")
+    if fmt not in FORMATS:
+        raise HTTPException(status_code=400, detail="format must be 'ndjson' or 'csv'")
+    return import_rows(table, fmt, file.file)
 
 @app.delete("/api/membership/unsubscribe")
 def unsubscribe(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """Permanently delete user account and associated logs."""
@@ -752,8 +1173,9 @@ def unsubscribe(
     db.query(NewsletterLog).filter(NewsletterLog.user_email == current_user.email).delete()
     
     # Delete the user
-    db.delete(current_user)
+    db.query(User).filter(User.id == current_user.id).delete()
     db.commit()
+    principal_cache.invalidate_user(current_user.email)
     
     return {"message": "Successfully unsubscribed and account deleted"}
 
@@ -762,30 +1184,22 @@ class CancelMembershipRequest(BaseModel):
     password: str
     confirm_password: str
 
-@app.post("/api/membership/cancel")
-def cancel_membership_with_credentials(
-    req: CancelMembershipRequest,
-    db: Session = Depends(get_db)
-):
+@app.post("/api/membership/cancel", dependencies=[Depends(admit_auth_request)])
+async def cancel_membership_with_credentials(req: CancelMembershipRequest):
     """Cancel membership by providing credentials in a form."""
     if req.password != req.confirm_password:
         raise HTTPException(status_code=400, detail="Passwords do not match")
         
     clean_email = req.email.strip().lower()
-    user = db.query(User).filter(User.email == clean_email).first()
+    user = await run_in_threadpool(find_credentials, clean_email)
     
     if not user:
         raise HTTPException(status_code=404, detail="Account not found")
         
-    if not verify_password(req.password, user.hashed_password):
+    if not await verify_password(req.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Incorrect password")
         
-    # Delete associated newsletter logs
-    db.query(NewsletterLog).filter(NewsletterLog.user_email == user.email).delete()
-    
-    # Delete the user
-    db.delete(user)
-    db.commit()
+    await run_in_threadpool(delete_member, user.email)
     
     return {"message": "Membership successfully cancelled"}
 
@@ -796,10 +1210,35 @@ def queue_email(email: EmailCreate, db: Session = Depends(get_db)):
         recipient=email.recipient,
         subject=email.subject,
         body=email.body,
-        created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        created_at=timestamp_now(),
         status="pending"
     )
     db.add(new_email)
     db.commit()
     db.refresh(new_email)
     return {"message": "Email queued for delivery", "queue_id": new_email.id}
+
+# --- Built frontends (SERVE_FRONTENDS=true) ---
+# Registered after every API route so the SPA fallback never shadows one
+frontend_bundles = load_bundles() if SERVE_FRONTENDS else []
+
+def frontend_endpoint(bundle):
+    async def serve_frontend(request: Request, path: str = ""):
+        if path == "api" or path.startswith("api/"):
+            raise HTTPException(status_code=404, detail="Not Found")
+        response = bundle.response(request, path)
+        if response is None:
+            raise HTTPException(status_code=404, detail="Not Found")
+        return response
+    return serve_frontend
+
+for prefix, bundle in frontend_bundles:
+    endpoint = frontend_endpoint(bundle)
+    if prefix:
+        app.add_api_route(prefix, endpoint, methods=["GET", "HEAD"], include_in_schema=False)
+    app.add_api_route(prefix + "/{path:path}", endpoint, methods=["GET", "HEAD"], include_in_schema=False)
+
+if frontend_bundles:
+    metrics_registry.register_collector(
+        "frontend_assets", "Built frontend files served per encoding, 304s and SPA fallbacks.", frontend_stats(frontend_bundles)
+    )
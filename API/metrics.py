@@ -0,0 +1,220 @@
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Upper bounds (seconds) of the latency histogram buckets, Prometheus style
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+JOB_BUCKETS = (0.01, 0.1, 0.5, 1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    """Fixed-bucket histogram; observe() is a bisect plus two additions."""
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float):
+        """Estimate a quantile by linear interpolation inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.bounds[-1]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = {}   # (method, route, status) -> count
+        self.latency = {}    # (method, route) -> Histogram
+        self.job_runs = {}   # (job, outcome) -> count
+        self.job_latency = {}  # job -> Histogram
+        self.job_last_success = {}  # job -> unix time
+        self._collectors = []
+
+    def request_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def request_finished(self, method: str, route: str, status_code: int, seconds: float):
+        with self._lock:
+            self.in_flight -= 1
+            key = (method, route, status_code)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.latency.get((method, route))
+            if histogram is None:
+                histogram = self.latency[(method, route)] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+
+    def job_finished(self, job: str, ok: bool, seconds: float):
+        with self._lock:
+            key = (job, "success" if ok else "error")
+            self.job_runs[key] = self.job_runs.get(key, 0) + 1
+            histogram = self.job_latency.get(job)
+            if histogram is None:
+                histogram = self.job_latency[job] = Histogram(JOB_BUCKETS)
+            histogram.observe(seconds)
+            if ok:
+                self.job_last_success[job] = time.time()
+
+    def register_collector(self, name: str, help_text: str, collect):
+        """Expose a gauge family whose values come from `collect()` -> {label_value: number}."""
+        self._collectors.append((name, help_text, collect))
+
+    def render(self):
+        """Prometheus text exposition format (0.0.4)."""
+        with self._lock:
+            in_flight = self.in_flight
+            requests = dict(self.requests)
+            latency = {k: _copy(h) for k, h in self.latency.items()}
+            job_runs = dict(self.job_runs)
+            job_latency = {k: _copy(h) for k, h in self.job_latency.items()}
+            job_last_success = dict(self.job_last_success)
+
+        lines = [
+            "# HELP http_requests_in_flight Requests currently being served.",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {in_flight}",
+            "# HELP http_requests_total Requests served by route and status code.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status_code), count in sorted(requests.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status_code}"}} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(latency.items()):
+            lines += _histogram_lines("http_request_duration_seconds", f'method="{method}",route="{_escape(route)}"', histogram)
+        lines += [
+            "# HELP http_request_duration_seconds_estimate Latency quantiles estimated from the histogram.",
+            "# TYPE http_request_duration_seconds_estimate gauge",
+        ]
+        for (method, route), histogram in sorted(latency.items()):
+            for q in QUANTILES:
+                lines.append(
+                    f'http_request_duration_seconds_estimate{{method="{method}",route="{_escape(route)}",quantile="{q}"}} '
+                    f"{histogram.quantile(q):.6f}"
+                )
+
+        lines += [
+            "# HELP job_runs_total Background job runs by outcome.",
+            "# TYPE job_runs_total counter",
+        ]
+        for (job, outcome), count in sorted(job_runs.items()):
+            lines.append(f'job_runs_total{{job="{job}",outcome="{outcome}"}} {count}')
+        lines += [
+            "# HELP job_duration_seconds Background job duration.",
+            "# TYPE job_duration_seconds histogram",
+        ]
+        for job, histogram in sorted(job_latency.items()):
+            lines += _histogram_lines("job_duration_seconds", f'job="{job}"', histogram)
+        lines += [
+            "# HELP job_last_success_timestamp_seconds Unix time of the last successful run.",
+            "# TYPE job_last_success_timestamp_seconds gauge",
+        ]
+        for job, ts in sorted(job_last_success.items()):
+            lines.append(f'job_last_success_timestamp_seconds{{job="{job}"}} {ts:.3f}')
+
+        for name, help_text, collect in self._collectors:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            for label, value in sorted(collect().items()):
+                lines.append(f'{name}{{stat="{_escape(str(label))}"}} {value}')
+
+        return "\n".join(lines) + "\n"
+
+
+def _copy(histogram: Histogram):
+    clone = Histogram(histogram.bounds)
+    clone.counts = list(histogram.counts)
+    clone.count = histogram.count
+    clone.sum = histogram.sum
+    return clone
+
+
+def _histogram_lines(name: str, labels: str, histogram: Histogram):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.bounds, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+def _escape(value: str):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = MetricsRegistry()
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording per-route counts, status codes and latency.
+
+    Routes are labelled by their path template (e.g. /api/events/{event_id}) so
+    label cardinality stays bounded; unrouted requests share one label.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry = registry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        self.registry.request_started()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            self.registry.request_finished(scope["method"], route, status_code, time.perf_counter() - started)
+
+
+def track_job(name: str):
+    """Decorator recording duration and outcome of a scheduled job."""
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                registry.job_finished(name, ok, time.perf_counter() - started)
+        return wrapper
+    return decorator
@@ -0,0 +1,170 @@
+"""Versioned, in-place schema migrations for the live database.
+
+`Base.metadata.create_all` only creates missing tables; it never adds columns
+or indexes to a museum.db that already exists. Each migration below runs once,
+in order, and is recorded in schema_migrations. Run from the API directory:
+
+    python -m migrations                # apply pending migrations
+    python -m migrations --check-plans  # assert hot queries use an index
+"""
+import argparse
+import hashlib
+import sys
+from datetime import date
+from sqlalchemy import text, inspect # type: ignore
+from sqlalchemy.sql.elements import TextClause # type: ignore
+from timestamps import timestamp_now
+
+
+def _add_email_queue_delivery_columns(conn):
+    existing = {column["name"] for column in inspect(conn).get_columns("email_queue")}
+    for name in ("sent_at", "next_attempt_at", "lease_owner", "lease_expires_at", "last_error"):
+        if name not in existing:
+            conn.execute(text(f"ALTER TABLE email_queue ADD COLUMN {name} VARCHAR"))
+
+
+def _create_hot_query_indexes(conn):
+    for statement in (
+        "CREATE INDEX IF NOT EXISTS ix_email_queue_status_retry ON email_queue (status, retry_count)",
+        "CREATE INDEX IF NOT EXISTS ix_newsletter_logs_user_email ON newsletter_logs (user_email)",
+        "CREATE INDEX IF NOT EXISTS ix_newsletters_lang_publish_at ON newsletters (lang, publish_at)",
+        "CREATE INDEX IF NOT EXISTS ix_holidays_date ON holidays (date)",
+        "CREATE INDEX IF NOT EXISTS ix_event_exceptions_event_date ON event_exceptions (event_id, exception_date)",
+    ):
+        conn.execute(text(statement))
+    conn.execute(text("ANALYZE"))
+
+
+def _register_image_sources(conn):
+    # Existing image URLs become pending sources; derivatives are generated on first request
+    rows = conn.execute(text(
+        "SELECT image_url FROM artworks WHERE image_url LIKE 'http%' "
+        "UNION SELECT image_url FROM events WHERE image_url LIKE 'http%'"
+    )).fetchall()
+    now = timestamp_now()
+    if rows:
+        conn.execute(text(
+            "INSERT OR IGNORE INTO image_sources (url, url_hash, status, updated_at) "
+            "VALUES (:url, :url_hash, 'pending', :now)"
+        ), [{"url": url, "url_hash": hashlib.sha256(url.encode("utf-8")).hexdigest()[:32], "now": now}
+            for (url,) in rows])
+
+
+def _create_email_claim_index(conn):
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_email_queue_claimable ON email_queue (id) "
+        "WHERE status IN ('pending', 'failed', 'sending')"
+    ))
+    conn.execute(text("ANALYZE email_queue"))
+
+
+# (version, description, function). Append only; never edit an applied migration.
+MIGRATIONS = [
+    (1, "email_queue delivery and lease columns", _add_email_queue_delivery_columns),
+    (2, "indexes for hot queries", _create_hot_query_indexes),
+    (3, "register existing artwork and event images", _register_image_sources),
+    (4, "partial index for the email queue claim", _create_email_claim_index),
+]
+
+
+def applied_versions(conn):
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migrations "
+        "(version INTEGER PRIMARY KEY, description VARCHAR, applied_at VARCHAR)"
+    ))
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def run_migrations(engine):
+    """Apply pending migrations, each in its own transaction. Returns the versions applied."""
+    with engine.begin() as conn:
+        done = applied_versions(conn)
+    applied = []
+    for version, description, migrate in MIGRATIONS:
+        if version in done:
+            continue
+        with engine.begin() as conn:
+            migrate(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) VALUES (:v, :d, :t)"),
+                {"v": version, "d": description, "t": timestamp_now()},
+            )
+        print(f"Applied migration {version}: {description}")
+        applied.append(version)
+    return applied
+
+
+def hot_queries(db):
+    """(name, statement, parameters, index) for each hot query, taken from the code that runs it."""
+    from database import Holiday, EventException, NewsletterLog
+    from email_worker import _CLAIM, EMAIL_MAX_RETRIES
+    from newsletter_editions import latest_edition_query, next_publish_at_query, FALLBACK_LANG
+    from occurrences import occurrence_range_query
+
+    now = "2026-01-01 00:00:00"
+    publish_now = "2026-01-01T00:00:00"
+    return [
+        ("email queue claim", _CLAIM,
+         {"owner": "plan-check", "lease_expires_at": now, "now": now, "max_retries": EMAIL_MAX_RETRIES, "limit": 200},
+         "ix_email_queue_claimable"),
+        ("current newsletter", latest_edition_query(db, "es", publish_now).limit(1), None,
+         "ix_newsletters_lang_publish_at"),
+        ("next newsletter", next_publish_at_query(db, ["es", FALLBACK_LANG], publish_now), None,
+         "ix_newsletters_lang_publish_at"),
+        ("calendar occurrence range", occurrence_range_query(db, date(2026, 1, 1), date(2026, 2, 1)), None,
+         "ix_event_occurrences_date_event"),
+        ("unsubscribe log cleanup",
+         db.query(NewsletterLog.id).filter(NewsletterLog.user_email == "member@example.com"), None,
+         "ix_newsletter_logs_user_email"),
+        ("admin holidays", db.query(Holiday).order_by(Holiday.date), None, "ix_holidays_date"),
+        ("event exception lookup",
+         db.query(EventException).filter(EventException.event_id == 1, EventException.exception_date == date(2026, 1, 1)),
+         None, "ix_event_exceptions_event_date"),
+    ]
+
+
+def query_plan(conn, statement, parameters=None):
+    """EXPLAIN QUERY PLAN of a text() statement or an ORM query, as one line."""
+    if isinstance(statement, TextClause):
+        rows = conn.execute(text("EXPLAIN QUERY PLAN " + statement.text), parameters or {})
+    else:
+        sql = statement.statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")
+    return " | ".join(row[-1] for row in rows)
+
+
+def check_query_plans(engine):
+    """([(name, plan)] for hot queries that miss their index or sort in a temp b-tree, number of queries checked)."""
+    from sqlalchemy.orm import Session # type: ignore
+    failures = []
+    with Session(bind=engine) as db, engine.connect() as conn:
+        queries = hot_queries(db)
+        for name, statement, parameters, index in queries:
+            plan = query_plan(conn, statement, parameters)
+            if index not in plan or "TEMP B-TREE" in plan:
+                failures.append((name, plan))
+    return failures, len(queries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply schema migrations to the configured database.")
+    parser.add_argument("--check-plans", action="store_true", help="verify hot queries use their indexes")
+    args = parser.parse_args()
+
+    from database import Base, engine
+    Base.metadata.create_all(bind=engine)
+    applied = run_migrations(engine)
+    if not applied:
+        print("Schema is up to date.")
+
+    if args.check_plans:
+        failures, checked = check_query_plans(engine)
+        for name, plan in failures:
+            print(f"NO INDEX: {name}: {plan}")
+        if failures:
+            sys.exit(1)
+        print(f"All {checked} hot queries use their indexes.")
+
+
+if __name__ == "__main__":
+    main()
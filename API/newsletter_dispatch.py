@@ -0,0 +1,79 @@
+import os
+from datetime import datetime, timedelta
+from database import SessionLocal, User, NewsletterLog, NewsletterDispatch
+from timestamps import format_timestamp, timestamp_now
+
+# Users handled per transaction; memory use is bounded by this, not by the member count
+NEWSLETTER_CHUNK_SIZE = int(os.environ.get("NEWSLETTER_CHUNK_SIZE", "2000"))
+# A running dispatch whose checkpoint has not moved for this long is treated as crashed
+NEWSLETTER_STALE_AFTER = timedelta(minutes=int(os.environ.get("NEWSLETTER_STALE_MINUTES", "10")))
+
+def _get_or_start_run(db, run_key: str):
+    run = db.query(NewsletterDispatch).filter(NewsletterDispatch.run_key == run_key).first()
+    if run is None:
+        run = NewsletterDispatch(run_key=run_key, status="running", last_user_id=0, sent_count=0,
+                                 started_at=timestamp_now(), updated_at=timestamp_now())
+        db.add(run)
+        db.commit()
+    return run
+
+
+def dispatch_newsletter(run_key: str, chunk_size: int = NEWSLETTER_CHUNK_SIZE):
+    """Stream every member through the newsletter dispatch in id order.
+
+    Each chunk's log rows and the checkpoint (last user id) commit together, so
+    a crash loses at most the chunk in flight and a rerun with the same run_key
+    continues after the last committed user. Returns the number of users
+    notified by this call.
+    """
+    db = SessionLocal()
+    try:
+        run = _get_or_start_run(db, run_key)
+        if run.status == "completed":
+            print(f"Newsletter run {run_key} already completed ({run.sent_count} users), skipping.")
+            return 0
+        if run.last_user_id:
+            print(f"Resuming newsletter run {run_key} after user id {run.last_user_id}.")
+
+        notified = 0
+        while True:
+            # Keyset scan selecting only the needed columns; no ORM objects are built
+            batch = db.query(User.id, User.email).filter(
+                User.id > run.last_user_id
+            ).order_by(User.id).limit(chunk_size).all()
+            if not batch:
+                break
+
+            sent_at = timestamp_now()
+            # In a real app, logic to send email via SMTP/SendGrid would go here
+            db.bulk_insert_mappings(NewsletterLog, [
+                {"user_email": email, "sent_at": sent_at, "status": "sent"} for _, email in batch
+            ])
+            run.last_user_id = batch[-1][0]
+            run.sent_count += len(batch)
+            run.updated_at = sent_at
+            db.commit()
+            notified += len(batch)
+
+            if len(batch) < chunk_size:
+                break
+
+        run.status = "completed"
+        run.finished_at = timestamp_now()
+        db.commit()
+        return notified
+    finally:
+        db.close()
+
+
+def stale_runs():
+    """Run keys of dispatches that stopped checkpointing (e.g. the process died)."""
+    cutoff = format_timestamp(datetime.now() - NEWSLETTER_STALE_AFTER)
+    db = SessionLocal()
+    try:
+        return [key for (key,) in db.query(NewsletterDispatch.run_key).filter(
+            NewsletterDispatch.status == "running",
+            NewsletterDispatch.updated_at < cutoff
+        ).all()]
+    finally:
+        db.close()
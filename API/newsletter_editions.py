@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import func # type: ignore
+from database import ReadSessionLocal, Newsletter
+from fastjson import dumps
+
+# Bound on staleness across worker processes (see cache.py)
+NEWSLETTER_CACHE_TTL_SECONDS = float(os.environ.get("NEWSLETTER_CACHE_TTL_SECONDS", "300"))
+PUBLISH_AT_FORMAT = "%Y-%m-%dT%H:%M:%S"
+FALLBACK_LANG = "en"
+
+
+class Edition:
+    """Pre-serialized live edition for one language, valid until the next publish_at boundary."""
+    __slots__ = ("body", "valid_until", "expires_at")
+
+    def __init__(self, body, valid_until, expires_at: float):
+        self.body = body                # JSON bytes, or None when nothing is published yet
+        self.valid_until = valid_until  # next publish_at that could change the answer, or None
+        self.expires_at = expires_at
+
+    def is_live(self, now_str: str):
+        if self.expires_at <= time.monotonic():
+            return False
+        return self.valid_until is None or now_str < self.valid_until
+
+
+def _payload(newsletter: Newsletter):
+    return {
+        "month": newsletter.month,
+        "title": newsletter.title,
+        "subtitle": newsletter.subtitle,
+        "introduction": newsletter.introduction,
+        "sections": newsletter.sections,
+        "citation": newsletter.citation,
+        "verification_hash": newsletter.verification_hash,
+        "publish_at": newsletter.publish_at
+    }
+
+
+def latest_edition_query(db, lang: str, now_str: str):
+    """Newest edition in `lang` published by now_str, newest first (the caller takes the first)."""
+    return db.query(Newsletter).filter(
+        Newsletter.lang == lang,
+        Newsletter.publish_at <= now_str
+    ).order_by(Newsletter.publish_at.desc())
+
+
+def next_publish_at_query(db, langs, now_str: str):
+    """Earliest publish_at after now_str in any of `langs`; min() keeps it one index seek per language."""
+    return db.query(func.min(Newsletter.publish_at)).filter(
+        Newsletter.lang.in_(langs),
+        Newsletter.publish_at > now_str
+    )
+
+
+def _latest(db, lang: str, now_str: str):
+    return latest_edition_query(db, lang, now_str).first()
+
+
+def _next_publish_at(db, langs, now_str: str):
+    return next_publish_at_query(db, langs, now_str).scalar()
+
+
+class EditionResolver:
+    """Per-language cache of the live newsletter edition.
+
+    Each entry remembers the next scheduled publish_at that could replace it,
+    so the first request after that instant rebuilds it; there is no timer or
+    polling. Rebuilds are single-flight per language, so the rush on the 1st
+    of the month costs one query pair, not one per member.
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._editions = {}
+        self._lock = threading.Lock()
+        self._build_locks = {}
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.rebuilds = 0
+
+    def get(self, lang: str):
+        """Return the live edition's JSON bytes for `lang` (English fallback), or None."""
+        now_str = datetime.now().strftime(PUBLISH_AT_FORMAT)
+        edition = self._editions.get(lang)
+        if edition is not None and edition.is_live(now_str):
+            with self._lock:  # held only for bookkeeping, never while building
+                self.hits += 1
+            return edition.body
+
+        with self._lock:
+            self.misses += 1
+            build_lock = self._build_locks.setdefault(lang, threading.Lock())
+        with build_lock:
+            # Another request may have rebuilt it while this one waited
+            edition = self._editions.get(lang)
+            if edition is not None and edition.is_live(now_str):
+                return edition.body
+            generation = self.generation
+            edition = self._build(lang, now_str)
+            with self._lock:
+                self.rebuilds += 1
+                if generation == self.generation:
+                    self._editions[lang] = edition
+            return edition.body
+
+    def _build(self, lang: str, now_str: str):
+        db = ReadSessionLocal()
+        try:
+            newsletter = _latest(db, lang, now_str)
+            # A first edition in `lang` would also replace the English fallback
+            watch = [lang]
+            if newsletter is None and lang != FALLBACK_LANG:
+                newsletter = _latest(db, FALLBACK_LANG, now_str)
+                watch.append(FALLBACK_LANG)
+            valid_until = _next_publish_at(db, watch, now_str)
+        finally:
+            db.close()
+        body = dumps(_payload(newsletter)) if newsletter else None
+        return Edition(body, valid_until, time.monotonic() + self.ttl)
+
+    def invalidate(self):
+        """Drop every cached edition; call after a newsletter is saved or deleted."""
+        with self._lock:
+            self.generation += 1
+            self._editions = {}
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._editions),
+                "hits": self.hits,
+                "misses": self.misses,
+                "rebuilds": self.rebuilds,
+            }
+
+
+edition_resolver = EditionResolver(NEWSLETTER_CACHE_TTL_SECONDS)
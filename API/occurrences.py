@@ -0,0 +1,246 @@
+from datetime import date, timedelta
+from collections import defaultdict
+from sqlalchemy import or_ # type: ignore
+from database import Event, EventException, EventOccurrence, OccurrenceHorizon
+
+# Largest window a single calendar request may expand (a year plus some slack)
+MAX_RANGE_DAYS = 400
+
+RECURRING_TYPES = ("weekly", "monthly")
+
+
+def parse_range(start: str, end: str):
+    """Parse and validate a YYYY-MM-DD window. Raises ValueError on bad input."""
+    start_date = date.fromisoformat(start)
+    end_date = date.fromisoformat(end)
+    if end_date < start_date:
+        raise ValueError("end must not be before start")
+    if (end_date - start_date).days > MAX_RANGE_DAYS:
+        raise ValueError(f"Range too large, maximum is {MAX_RANGE_DAYS} days")
+    return start_date, end_date
+
+
+def expand_dates(first_date: date, recurrence: str, window_start: date, window_end: date):
+    """Yield every date an event falls on inside [window_start, window_end].
+
+    Mirrors the rules the calendar used client-side: 'weekly' repeats on the same
+    weekday, 'monthly' on the same day of month (months without that day are
+    skipped), anything else is a one-off on its own date.
+    """
+    if first_date > window_end:
+        return
+
+    if recurrence == "weekly":
+        current = max(first_date, window_start)
+        offset = (first_date.weekday() - current.weekday()) % 7
+        current += timedelta(days=offset)
+        while current <= window_end:
+            yield current
+            current += timedelta(days=7)
+
+    elif recurrence == "monthly":
+        begin = max(first_date, window_start)
+        year, month = begin.year, begin.month
+        while True:
+            try:
+                current = date(year, month, first_date.day)
+            except ValueError:
+                current = None  # e.g. the 31st in a 30 day month
+            if current is not None:
+                if current > window_end:
+                    break
+                if current >= first_date and current >= window_start:
+                    yield current
+            elif date(year, month, 1) > window_end:
+                break
+            month += 1
+            if month > 12:
+                year, month = year + 1, 1
+
+    elif window_start <= first_date <= window_end:
+        yield first_date
+
+
+def _serialize_event(event):
+    return {
+        "id": event.id,
+        "title": event.title,
+        "description": event.description,
+        "image_url": event.image_url,
+        "category": event.category,
+        "recurrence": event.recurrence,
+    }
+
+
+def build_occurrences(events, exceptions, window_start: date, window_end: date):
+    """Group concrete occurrences in the window by ISO date.
+
+    `events` is an iterable of Event rows, `exceptions` an iterable of
+    (event_id, exception_date) pairs already narrowed to the window.
+    """
+    skipped = set(exceptions)
+    grouped = defaultdict(list)
+    for event in events:
+        event_data = None
+        for day in expand_dates(event.date, event.recurrence, window_start, window_end):
+            if (event.id, day) in skipped:
+                continue
+            if event_data is None:
+                event_data = _serialize_event(event)
+            grouped[day.isoformat()].append(event_data)
+    return dict(sorted(grouped.items()))
+
+
+# --- Materialized occurrence index ---
+
+# How far ahead / behind today the event_occurrences table is kept filled
+HORIZON_DAYS_AHEAD = 548  # ~18 months
+HORIZON_DAYS_BEHIND = 365
+
+
+def _insert_occurrences(db, event, window_start: date, window_end: date, skipped=None):
+    if skipped is None:
+        skipped = {
+            row.exception_date for row in
+            db.query(EventException.exception_date).filter(EventException.event_id == event.id)
+        }
+    rows = [
+        {"event_id": event.id, "occurrence_date": day}
+        for day in expand_dates(event.date, event.recurrence, window_start, window_end)
+        if day not in skipped
+    ]
+    if rows:
+        db.bulk_insert_mappings(EventOccurrence, rows)
+    return len(rows)
+
+
+def _exceptions_by_event(db, since: date):
+    exceptions_by_event = defaultdict(set)
+    for event_id, exception_date in db.query(EventException.event_id, EventException.exception_date).filter(
+        EventException.exception_date >= since
+    ):
+        exceptions_by_event[event_id].add(exception_date)
+    return exceptions_by_event
+
+
+def get_horizon(db):
+    return db.query(OccurrenceHorizon).first()
+
+
+def rebuild_event_occurrences(db, event):
+    """Rewrite the materialized occurrences of a single event. Caller commits."""
+    db.query(EventOccurrence).filter(EventOccurrence.event_id == event.id).delete(synchronize_session=False)
+    horizon = get_horizon(db)
+    if horizon is None:
+        return 0
+    return _insert_occurrences(db, event, horizon.start_date, horizon.end_date)
+
+
+def rebuild_occurrences_for(db, event_ids):
+    """Rewrite the occurrences of many events with a fixed number of queries. Caller commits."""
+    event_ids = list(event_ids)
+    if not event_ids:
+        return 0
+    db.query(EventOccurrence).filter(EventOccurrence.event_id.in_(event_ids)).delete(synchronize_session=False)
+    horizon = get_horizon(db)
+    if horizon is None:
+        return 0
+    skipped = defaultdict(set)
+    for event_id, exception_date in db.query(EventException.event_id, EventException.exception_date).filter(
+        EventException.event_id.in_(event_ids)
+    ):
+        skipped[event_id].add(exception_date)
+    rows = [
+        {"event_id": event_id, "occurrence_date": day}
+        for event_id, first_date, recurrence in db.query(Event.id, Event.date, Event.recurrence).filter(Event.id.in_(event_ids))
+        for day in expand_dates(first_date, recurrence, horizon.start_date, horizon.end_date)
+        if day not in skipped[event_id]
+    ]
+    if rows:
+        db.bulk_insert_mappings(EventOccurrence, rows)
+    return len(rows)
+
+
+def delete_event_occurrences(db, event_id: int):
+    """Drop the materialized occurrences of a deleted event. Caller commits."""
+    db.query(EventOccurrence).filter(EventOccurrence.event_id == event_id).delete(synchronize_session=False)
+
+
+def refresh_occurrence_horizon(db, today: date = None):
+    """Slide the horizon to [today - behind, today + ahead] and commit.
+
+    On first run the whole table is built. Afterwards only the newly uncovered
+    tail is expanded and rows that fell out of the back are pruned.
+    """
+    today = today or date.today()
+    new_start = today - timedelta(days=HORIZON_DAYS_BEHIND)
+    new_end = today + timedelta(days=HORIZON_DAYS_AHEAD)
+    horizon = get_horizon(db)
+
+    if horizon is None:
+        db.query(EventOccurrence).delete(synchronize_session=False)
+        exceptions_by_event = _exceptions_by_event(db, new_start)
+        inserted = 0
+        for event in db.query(Event).filter(Event.date <= new_end).all():
+            inserted += _insert_occurrences(db, event, new_start, new_end, exceptions_by_event[event.id])
+        db.add(OccurrenceHorizon(start_date=new_start, end_date=new_end))
+        db.commit()
+        return inserted
+
+    inserted = 0
+    if new_end > horizon.end_date:
+        tail_start = horizon.end_date + timedelta(days=1)
+        events = db.query(Event).filter(
+            Event.date <= new_end,
+            or_(Event.date >= tail_start, Event.recurrence.in_(RECURRING_TYPES))
+        ).all()
+        exceptions_by_event = _exceptions_by_event(db, tail_start)
+        for event in events:
+            inserted += _insert_occurrences(db, event, tail_start, new_end, exceptions_by_event[event.id])
+        horizon.end_date = new_end
+    if new_start > horizon.start_date:
+        db.query(EventOccurrence).filter(
+            EventOccurrence.occurrence_date < new_start
+        ).delete(synchronize_session=False)
+        horizon.start_date = new_start
+    db.commit()
+    return inserted
+
+
+def occurrence_range_query(db, window_start: date, window_end: date):
+    """(occurrence_date, Event) pairs in the window, read by one range scan of the materialized index."""
+    return db.query(EventOccurrence.occurrence_date, Event).join(
+        Event, Event.id == EventOccurrence.event_id
+    ).filter(
+        EventOccurrence.occurrence_date >= window_start,
+        EventOccurrence.occurrence_date <= window_end
+    ).order_by(EventOccurrence.occurrence_date, EventOccurrence.event_id)
+
+
+def query_occurrences(db, window_start: date, window_end: date):
+    """Occurrences in the window grouped by ISO date.
+
+    Served from the materialized index with one range scan when the window is
+    inside the horizon, otherwise expanded on the fly.
+    """
+    horizon = get_horizon(db)
+    if horizon is None or window_start < horizon.start_date or window_end > horizon.end_date:
+        events = db.query(Event).filter(
+            Event.date <= window_end,
+            or_(Event.date >= window_start, Event.recurrence.in_(RECURRING_TYPES))
+        ).all()
+        exceptions = db.query(EventException.event_id, EventException.exception_date).filter(
+            EventException.exception_date >= window_start,
+            EventException.exception_date <= window_end
+        ).all()
+        return build_occurrences(events, exceptions, window_start, window_end)
+
+    rows = occurrence_range_query(db, window_start, window_end).all()
+
+    grouped = defaultdict(list)
+    serialized = {}
+    for occurrence_date, event in rows:
+        if event.id not in serialized:
+            serialized[event.id] = _serialize_event(event)
+        grouped[occurrence_date.isoformat()].append(serialized[event.id])
+    return dict(grouped)
@@ -0,0 +1,238 @@
+"""Opening hours as a structured schedule: is the museum open now, and when does that change.
+
+OperatingHour.hours is free text ("10:00 AM - 5:00 PM", "Closed"). It is
+parsed once per table version into a weekly index of (opens, closes) minute
+intervals, merged with the Holiday dates, and expanded into a calendar of the
+next CALENDAR_DAYS days. Status lookups then only index into that calendar.
+
+The calendar is rebuilt when the day changes, when operating_hours or
+holidays get a new version (checked whenever this process commits a write,
+and at least every HOURS_REVALIDATE_SECONDS for writes made by other
+processes), and never on a plain read.
+"""
+import os
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+from database import ReadSessionLocal, OperatingHour, Holiday
+from versioning import current_versions
+from cache import reference_cache
+
+# IANA zone the hours are given in, e.g. "America/New_York"; empty means the server's local time
+MUSEUM_TIMEZONE = os.environ.get("MUSEUM_TIMEZONE", "")
+CALENDAR_DAYS = int(os.environ.get("HOURS_CALENDAR_DAYS", "366"))
+HOURS_REVALIDATE_SECONDS = float(os.environ.get("HOURS_REVALIDATE_SECONDS", "60"))
+# Longest a client may reuse /api/status/now, even when nothing changes for days
+STATUS_MAX_AGE_SECONDS = 60
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%S"
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+TABLES = ("operating_hours", "holidays")
+
+_TIME = r"(\d{1,2})(?:[:.](\d{2}))?\s*([ap])?\.?\s*m?\.?"
+_RANGE = re.compile(rf"^\s*{_TIME}\s*(?:-|–|—|to)\s*{_TIME}\s*$", re.IGNORECASE)
+_CLOSED = {"", "closed", "-"}
+
+
+def weekday_index(day: str):
+    """0 (Monday) to 6 for "Mon", "Tues", "Thursday", ...; ValueError otherwise."""
+    return WEEKDAYS.index(day.strip().lower()[:3])
+
+
+def _minutes(hour: str, minute: str, meridiem: str, closing: bool):
+    hour, minute = int(hour), int(minute or 0)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            raise ValueError(f"bad hour {hour}")
+        hour = hour % 12 + (12 if meridiem.lower() == "p" else 0)
+    if hour > 24 or minute > 59:
+        raise ValueError(f"bad time {hour}:{minute:02d}")
+    value = hour * 60 + minute
+    # "- 12:00 AM" / "- 0:00" closes at midnight, the end of the day
+    return 24 * 60 if closing and value == 0 else value
+
+
+def parse_hours(text: str):
+    """Free-text hours -> sorted tuple of (opens, closes) minutes after midnight; () when closed.
+
+    Accepts 12 or 24 hour times and several ranges separated by "," or ";",
+    e.g. "10:00 AM - 5:00 PM", "10am-1pm, 2pm-6pm", "09:30 - 17:00". Raises
+    ValueError for anything else.
+    """
+    text = (text or "").strip()
+    if text.lower() in _CLOSED:
+        return ()
+    intervals = []
+    for part in re.split(r"[,;&]", text):
+        match = _RANGE.match(part)
+        if match is None:
+            raise ValueError(f"unrecognized hours {text!r}")
+        opens = _minutes(*match.group(1, 2, 3), closing=False)
+        closes = _minutes(*match.group(4, 5, 6), closing=True)
+        if closes <= opens:
+            raise ValueError(f"closing time before opening time in {text!r}")
+        intervals.append((opens, closes))
+    intervals.sort()
+    for (_, previous_close), (next_open, _) in zip(intervals, intervals[1:]):
+        if next_open < previous_close:
+            raise ValueError(f"overlapping ranges in {text!r}")
+    return tuple(intervals)
+
+
+def museum_now():
+    """Current wall-clock time at the museum, as a naive datetime."""
+    if MUSEUM_TIMEZONE:
+        return datetime.now(ZoneInfo(MUSEUM_TIMEZONE)).replace(tzinfo=None)
+    return datetime.now()
+
+
+def _clock(minutes: int):
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class HoursCalendar:
+    """Opening intervals for each day from `start`, holidays already applied."""
+    __slots__ = ("start", "days", "holidays", "unparsed")
+
+    def __init__(self, start: date, days, holidays: dict, unparsed: list):
+        self.start = start
+        self.days = days          # one tuple of (opens, closes) per day
+        self.holidays = holidays  # date -> holiday name, within the calendar
+        self.unparsed = unparsed  # weekday texts that could not be parsed (treated as closed)
+
+    def _instant(self, index: int, minutes: int):
+        return datetime.combine(self.start + timedelta(days=index), datetime.min.time()) + timedelta(minutes=minutes)
+
+    def status(self, now: datetime):
+        """Open/closed at `now`, with the next opening and closing inside the calendar."""
+        index = (now.date() - self.start).days
+        minute = now.hour * 60 + now.minute
+        is_open = False
+        next_opening = next_closing = None
+        for offset in range(index, len(self.days)):
+            for opens, closes in self.days[offset]:
+                if offset == index and closes <= minute:
+                    continue  # already over today
+                if offset == index and opens <= minute:
+                    is_open = True
+                elif next_opening is None:
+                    next_opening = self._instant(offset, opens)
+                if next_closing is None:
+                    next_closing = self._instant(offset, closes)
+            if next_opening is not None and next_closing is not None:
+                break
+        today = self.start + timedelta(days=index)
+        return {
+            "open": is_open,
+            "as_of": now.strftime(TIME_FORMAT),
+            "next_opening": next_opening.strftime(TIME_FORMAT) if next_opening else None,
+            "next_closing": next_closing.strftime(TIME_FORMAT) if next_closing else None,
+            "holiday": self.holidays.get(today),
+            "today": [[_clock(opens), _clock(closes)] for opens, closes in self.days[index]],
+        }
+
+    def payload(self):
+        """The whole calendar: one entry per day, for clients that render a year at a time."""
+        return {
+            "start": self.start.isoformat(),
+            "days": [
+                {
+                    "date": (self.start + timedelta(days=i)).isoformat(),
+                    "hours": [[_clock(opens), _clock(closes)] for opens, closes in intervals],
+                    "holiday": self.holidays.get(self.start + timedelta(days=i)),
+                }
+                for i, intervals in enumerate(self.days)
+            ],
+        }
+
+
+def build_calendar(db, start: date, days: int = CALENDAR_DAYS):
+    weekly = [()] * 7
+    unparsed = []
+    for row in db.query(OperatingHour.day, OperatingHour.hours):
+        try:
+            weekly[weekday_index(row.day)] = parse_hours(row.hours)
+        except ValueError as e:
+            unparsed.append(row.day)
+            print(f"Operating hours for {row.day!r} not understood, treated as closed: {e}")
+    end = start + timedelta(days=days - 1)
+    holidays = {
+        row.date: row.name
+        for row in db.query(Holiday.date, Holiday.name).filter(Holiday.date >= start, Holiday.date <= end)
+    }
+    expanded = []
+    for i in range(days):
+        day = start + timedelta(days=i)
+        expanded.append(() if day in holidays else weekly[day.weekday()])
+    return HoursCalendar(start, tuple(expanded), holidays, unparsed)
+
+
+class HoursEngine:
+    """Per-process holder of the current HoursCalendar, rebuilt single-flight when stale."""
+
+    def __init__(self, revalidate_seconds: float):
+        self.revalidate_seconds = revalidate_seconds
+        self._calendar = None
+        self._versions = None
+        self._generation = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()  # held for the whole rebuild
+        self._stats_lock = threading.Lock()  # counters only, so hits never wait on a rebuild
+        self.hits = 0
+        self.revalidations = 0
+        self.rebuilds = 0
+
+    def _fresh(self, today: date):
+        return (
+            self._calendar is not None
+            and self._calendar.start == today
+            and self._generation == reference_cache.generation
+            and time.monotonic() - self._checked_at < self.revalidate_seconds
+        )
+
+    def calendar(self, today: date = None):
+        today = today or museum_now().date()
+        if self._fresh(today):
+            self._count("hits")
+            return self._calendar
+        with self._lock:
+            if self._fresh(today):
+                self._count("hits")
+                return self._calendar
+            # Any local commit bumps the cache generation; only our two tables matter
+            generation = reference_cache.generation
+            versions, _ = current_versions(*TABLES)
+            self._count("revalidations")
+            if self._calendar is None or self._calendar.start != today or versions != self._versions:
+                db = ReadSessionLocal()
+                try:
+                    self._calendar = build_calendar(db, today)
+                finally:
+                    db.close()
+                self._versions = versions
+                self._count("rebuilds")
+            self._generation = generation
+            self._checked_at = time.monotonic()
+            return self._calendar
+
+    def _count(self, counter: str):
+        with self._stats_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def status(self):
+        now = museum_now()
+        return self.calendar(now.date()).status(now)
+
+    def stats(self):
+        calendar = self._calendar
+        with self._stats_lock:
+            counters = {"hits": self.hits, "revalidations": self.revalidations, "rebuilds": self.rebuilds}
+        return {
+            **counters,
+            "calendar_days": len(calendar.days) if calendar else 0,
+            "unparsed_days": len(calendar.unparsed) if calendar else 0,
+        }
+
+
+hours_engine = HoursEngine(HOURS_REVALIDATE_SECONDS)
@@ -0,0 +1,110 @@
+import asyncio
+import os
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt # type: ignore
+
+# bcrypt releases the GIL while hashing, so a small dedicated thread pool caps
+# how many cores auth can burn. Callers await it from the event loop, so a
+# login burst queues as coroutines instead of parking request threads.
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", "12"))
+AUTH_WORKERS = int(os.environ.get("AUTH_WORKERS", str(max(1, (os.cpu_count() or 2) // 2))))
+# Hash/verify calls allowed to be running or queued at once; beyond this callers wait
+AUTH_MAX_PENDING = int(os.environ.get("AUTH_MAX_PENDING", str(AUTH_WORKERS * 8)))
+# How long a caller may wait for a slot before the request is refused
+AUTH_QUEUE_TIMEOUT_SECONDS = float(os.environ.get("AUTH_QUEUE_TIMEOUT_SECONDS", "5"))
+
+
+class AuthBusyError(Exception):
+    """Raised when the password hashing pool is saturated."""
+
+
+_executor = ThreadPoolExecutor(max_workers=AUTH_WORKERS, thread_name_prefix="bcrypt")
+# One semaphore per event loop (a worker process normally has exactly one)
+_slots = weakref.WeakKeyDictionary()
+_metrics_lock = threading.Lock()
+_metrics = {
+    "completed": 0,
+    "rejected": 0,
+    "in_flight": 0,
+    "queue_seconds_total": 0.0,
+    "queue_seconds_max": 0.0,
+    "work_seconds_total": 0.0,
+}
+
+
+def _loop_slots():
+    loop = asyncio.get_running_loop()
+    slots = _slots.get(loop)
+    if slots is None:
+        slots = _slots[loop] = asyncio.Semaphore(AUTH_MAX_PENDING)
+    return slots
+
+
+async def _run(fn, *args):
+    slots = _loop_slots()
+    try:
+        await asyncio.wait_for(slots.acquire(), AUTH_QUEUE_TIMEOUT_SECONDS)
+    except asyncio.TimeoutError:
+        with _metrics_lock:
+            _metrics["rejected"] += 1
+        raise AuthBusyError("Password hashing pool is saturated")
+
+    submitted = time.perf_counter()
+    timings = {}
+
+    def task():
+        started = time.perf_counter()
+        timings["queue"] = started - submitted
+        try:
+            return fn(*args)
+        finally:
+            timings["work"] = time.perf_counter() - started
+
+    with _metrics_lock:
+        _metrics["in_flight"] += 1
+    try:
+        return await asyncio.wrap_future(_executor.submit(task))
+    finally:
+        slots.release()
+        with _metrics_lock:
+            _metrics["in_flight"] -= 1
+            _metrics["completed"] += 1
+            _metrics["queue_seconds_total"] += timings.get("queue", 0.0)
+            _metrics["queue_seconds_max"] = max(_metrics["queue_seconds_max"], timings.get("queue", 0.0))
+            _metrics["work_seconds_total"] += timings.get("work", 0.0)
+
+
+def _hash(password: str):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode('utf-8')
+
+
+def _verify(plain_password: str, hashed_password: str):
+    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+async def hash_password(password: str):
+    """Hash on the bounded bcrypt pool. Raises AuthBusyError when saturated."""
+    return await _run(_hash, password)
+
+
+async def check_password(plain_password: str, hashed_password: str):
+    """Verify on the bounded bcrypt pool. Raises AuthBusyError when saturated."""
+    return await _run(_verify, plain_password, hashed_password)
+
+
+def hash_password_sync(password: str):
+    """Hash on the calling thread, bypassing the pool; for scripts and benchmarks."""
+    return _hash(password)
+
+
+def auth_metrics():
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+    completed = snapshot["completed"]
+    snapshot["queue_seconds_avg"] = snapshot["queue_seconds_total"] / completed if completed else 0.0
+    snapshot["work_seconds_avg"] = snapshot["work_seconds_total"] / completed if completed else 0.0
+    snapshot.update(workers=AUTH_WORKERS, max_pending=AUTH_MAX_PENDING, bcrypt_rounds=BCRYPT_ROUNDS)
+    return snapshot
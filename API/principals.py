@@ -0,0 +1,71 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Resolved principals are reused for at most this long, and never past the token's exp
+# (how this bounds staleness across workers: see cache.py)
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.environ.get("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_ENTRIES = int(os.environ.get("PRINCIPAL_CACHE_MAX_ENTRIES", "10000"))
+
+
+class Principal:
+    """The authenticated caller: just what authorization checks need, detached from any session."""
+    __slots__ = ("id", "email", "role")
+
+    def __init__(self, id: int, email: str, role: str):
+        self.id = id
+        self.email = email
+        self.role = role
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.email, user.role)
+
+
+class PrincipalCache:
+    """Thread-safe LRU mapping bearer tokens to Principals with per-entry expiry."""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[1] <= time.time():
+                if entry is not None:
+                    del self._entries[token]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, token: str, principal: Principal, token_exp: float = None):
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            self._entries[token] = (principal, expires_at)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, email: str):
+        """Forget every cached token of a user (deleted account or changed role)."""
+        with self._lock:
+            stale = [token for token, (principal, _) in self._entries.items() if principal.email == email]
+            for token in stale:
+                del self._entries[token]
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL_SECONDS, PRINCIPAL_CACHE_MAX_ENTRIES)
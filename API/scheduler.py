@@ -0,0 +1,164 @@
+"""Scheduled background jobs, each tick run by exactly one process.
+
+Every job goes through a lease in the job_leases table: whichever process
+claims it first runs the tick, the others skip it, and a heartbeat keeps the
+lease alive. If the holder dies, its lease lapses after JOB_LEASE_SECONDS and
+the next process to fire takes over.
+
+With SCHEDULER_MODE=embedded (the default) each API process runs the
+scheduler in a background thread. With SCHEDULER_MODE=external the API
+processes start no job threads, and a separate worker runs the jobs from the
+API directory:
+
+    python -m scheduler
+"""
+import os
+import signal
+import time
+from datetime import datetime
+from typing import Optional
+from database import SessionLocal, engine, Base
+from email_worker import EmailDeliveryWorker
+from job_leases import run_once, OWNER
+from metrics import track_job
+from migrations import run_migrations
+from newsletter_dispatch import dispatch_newsletter, stale_runs
+from occurrences import refresh_occurrence_horizon
+from timestamps import format_timestamp
+
+# "embedded" runs jobs inside the API processes, "external" leaves them to `python -m scheduler`
+SCHEDULER_MODE = os.environ.get("SCHEDULER_MODE", "embedded")
+
+
+def _send_newsletter(run_key: str):
+    # Untracked so a resumed run is counted once, under the job that resumed it
+    print(f"[{datetime.now()}] Monthly Newsletter Task Started ({run_key})...")
+    try:
+        notified = dispatch_newsletter(run_key)
+        print(f"[{datetime.now()}] Monthly Newsletter Task Completed. {notified} users notified.")
+    except Exception as e:
+        print(f"Error in newsletter task: {e}")
+        raise  # recorded as an error by track_job and as a failed tick by the lease
+
+
+@track_job("send_monthly_newsletter")
+def send_monthly_newsletter_task(run_key: Optional[str] = None):
+    """Background task to 'dispatch' newsletter links to all members, in resumable chunks."""
+    _send_newsletter(run_key or datetime.now().strftime("%Y-%m"))
+
+
+@track_job("resume_newsletter_dispatch")
+def resume_newsletter_dispatch_task():
+    """Background task to finish newsletter runs that crashed part way through."""
+    error = None
+    for run_key in stale_runs():
+        try:
+            _send_newsletter(run_key)
+        except Exception as e:
+            error = e  # keep resuming the other runs
+    if error is not None:
+        raise error
+
+
+email_worker = EmailDeliveryWorker()
+
+
+@track_job("process_email_queue")
+def process_email_queue_task():
+    """Background task to deliver queued emails; leases rows and backs off failed ones."""
+    try:
+        totals = email_worker.drain()
+        if totals["batches"]:
+            print(f"[{datetime.now()}] Email queue drained: {totals['sent']} sent, {totals['failed']} failed.")
+    except Exception as e:
+        print(f"Error in email queue task: {e}")
+        raise
+
+
+@track_job("extend_occurrence_horizon")
+def extend_occurrence_horizon_task():
+    """Background task to roll the materialized event_occurrences horizon forward."""
+    db = SessionLocal()
+    try:
+        inserted = refresh_occurrence_horizon(db)
+        print(f"[{datetime.now()}] Event occurrence horizon refreshed. {inserted} occurrences added.")
+    except Exception as e:
+        print(f"Error in occurrence horizon task: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def every(seconds: int):
+    """Run key for interval jobs: the start of the current `seconds`-long slot."""
+    def run_key():
+        slot = int(time.time()) // seconds * seconds
+        return format_timestamp(datetime.fromtimestamp(slot))
+    return run_key
+
+
+def calendar(fmt: str):
+    """Run key for cron jobs: the current time in `fmt`, e.g. "%Y-%m" for a monthly job."""
+    return lambda: datetime.now().strftime(fmt)
+
+
+def leased(name: str, run_key, fn):
+    """Wrap fn so that each tick (as named by run_key()) runs in one process only."""
+    def job():
+        run_once(name, run_key(), fn)
+    job.__name__ = f"leased_{name}"
+    return job
+
+
+# (lease name, run key, task, trigger, trigger arguments)
+JOBS = [
+    # 1st day of every month at 9:00 AM; the run key is also the dispatch checkpoint key
+    ("send_monthly_newsletter", calendar("%Y-%m"), send_monthly_newsletter_task, "cron", {"day": 1, "hour": 9, "minute": 0}),
+    # Pick up interrupted runs from their last checkpoint
+    ("resume_newsletter_dispatch", every(300), resume_newsletter_dispatch_task, "interval", {"minutes": 5}),
+    # Check the email queue every minute for resilience
+    ("process_email_queue", every(60), process_email_queue_task, "interval", {"minutes": 1}),
+    # Keep ~18 months of occurrences materialized ahead of today
+    ("extend_occurrence_horizon", calendar("%Y-%m-%d"), extend_occurrence_horizon_task, "cron", {"hour": 2, "minute": 0}),
+]
+
+
+def build_scheduler(blocking: bool = False):
+    # Imported here so processes that never schedule (SCHEDULER_MODE=external) skip APScheduler
+    if blocking:
+        from apscheduler.schedulers.blocking import BlockingScheduler as Scheduler # type: ignore
+    else:
+        from apscheduler.schedulers.background import BackgroundScheduler as Scheduler # type: ignore
+    scheduler = Scheduler()
+    for name, run_key, task, trigger, trigger_args in JOBS:
+        scheduler.add_job(leased(name, run_key, task), trigger, id=name, **trigger_args)
+    return scheduler
+
+
+def on_start():
+    # The horizon is refreshed once per day at startup too; other processes skip it
+    try:
+        run_once("extend_occurrence_horizon", calendar("%Y-%m-%d")(), extend_occurrence_horizon_task)
+    except Exception:
+        pass  # already logged and counted; a failed refresh must not stop startup
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    run_migrations(engine)
+    on_start()
+    scheduler = build_scheduler(blocking=True)
+    # Stop cleanly under a process manager; a running job finishes and releases its lease first
+    signal.signal(signal.SIGTERM, lambda signum, frame: scheduler.shutdown(wait=False))
+    print(f"Scheduler worker {OWNER} started with {len(JOBS)} jobs.")
+    try:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        email_worker.close()
+        print("Scheduler worker stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import html
+import re
+from sqlalchemy import text, or_ # type: ignore
+from sqlalchemy.exc import OperationalError # type: ignore
+from database import Artwork
+
+# Columns indexed for full-text search, in the order their bm25 weights are given
+FTS_COLUMNS = ("title", "creator", "department", "metadata_info", "curators_insight")
+FTS_WEIGHTS = (10.0, 6.0, 3.0, 1.5, 1.0)
+
+SEARCH_PAGE_MAX = 100
+
+# Set by ensure_artwork_index(); False when SQLite was built without FTS5
+fts_available = False
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_MARK_OPEN, _MARK_CLOSE = "\x02", "\x03"
+
+
+def ensure_artwork_index(engine):
+    """Create the artworks_fts virtual table and backfill it the first time."""
+    global fts_available
+    columns = ", ".join(FTS_COLUMNS)
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'artworks_fts'")
+            ).first()
+            if not exists:
+                conn.execute(text(
+                    f"CREATE VIRTUAL TABLE artworks_fts USING fts5({columns}, "
+                    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+                ))
+                conn.execute(text(
+                    f"INSERT INTO artworks_fts (rowid, {columns}) SELECT id, {columns} FROM artworks"
+                ))
+        fts_available = True
+    except OperationalError as e:
+        print(f"Full-text search unavailable, falling back to LIKE matching: {e}")
+        fts_available = False
+
+
+def index_artwork(db, artwork):
+    """(Re)index one artwork inside the caller's transaction. Caller commits."""
+    index_artworks(db, [{"id": artwork.id, **{c: getattr(artwork, c) for c in FTS_COLUMNS}}])
+
+
+def index_artworks(db, rows):
+    """(Re)index many artworks given as dicts with id and the FTS columns. Caller commits."""
+    if not fts_available or not rows:
+        return
+    columns = ", ".join(FTS_COLUMNS)
+    params = ", ".join(f":{c}" for c in FTS_COLUMNS)
+    db.execute(text("DELETE FROM artworks_fts WHERE rowid = :id"), [{"id": row["id"]} for row in rows])
+    db.execute(
+        text(f"INSERT INTO artworks_fts (rowid, {columns}) VALUES (:id, {params})"),
+        [{"id": row["id"], **{c: row.get(c) for c in FTS_COLUMNS}} for row in rows],
+    )
+
+
+def unindex_artwork(db, artwork_id: int):
+    unindex_artworks(db, [artwork_id])
+
+
+def unindex_artworks(db, artwork_ids):
+    if not fts_available or not artwork_ids:
+        return
+    db.execute(text("DELETE FROM artworks_fts WHERE rowid = :id"), [{"id": i} for i in artwork_ids])
+
+
+def build_match_query(q: str):
+    """Turn free text into an FTS5 query: every word must match, each as a prefix.
+
+    Words are quoted so user input can never inject FTS5 operators.
+    """
+    tokens = _TOKEN.findall(q)
+    return " ".join(f'"{token}"*' for token in tokens)
+
+
+def _highlight(snippet: str):
+    # Escape the stored text, then turn the private markers into <mark> tags
+    return html.escape(snippet or "").replace(_MARK_OPEN, "<mark>").replace(_MARK_CLOSE, "</mark>")
+
+
+def search_artworks(db, q: str, limit: int, offset: int):
+    """BM25-ranked artwork search with highlighted snippets, paged by offset."""
+    match = build_match_query(q)
+    if not match:
+        return {"items": [], "next_offset": None}
+
+    if not fts_available:
+        return _search_artworks_like(db, q, limit, offset)
+
+    weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+    rows = db.execute(text(
+        "SELECT a.id, a.title, a.creator, a.image_url, a.department, "
+        f"snippet(artworks_fts, -1, '{_MARK_OPEN}', '{_MARK_CLOSE}', '…', 12) AS snippet, "
+        f"bm25(artworks_fts, {weights}) AS score "
+        "FROM artworks_fts JOIN artworks a ON a.id = artworks_fts.rowid "
+        "WHERE artworks_fts MATCH :match "
+        "ORDER BY score LIMIT :limit OFFSET :offset"
+    ), {"match": match, "limit": limit + 1, "offset": offset}).fetchall()
+
+    items = [{
+        "id": row.id,
+        "title": row.title,
+        "creator": row.creator,
+        "image_url": row.image_url,
+        "department": row.department,
+        "snippet": _highlight(row.snippet),
+        "score": round(-row.score, 6),
+    } for row in rows[:limit]]
+    return {"items": items, "next_offset": offset + limit if len(rows) > limit else None}
+
+
+def _search_artworks_like(db, q: str, limit: int, offset: int):
+    query = db.query(Artwork.id, Artwork.title, Artwork.creator, Artwork.image_url, Artwork.department)
+    for token in _TOKEN.findall(q):
+        pattern = f"%{token}%"
+        query = query.filter(or_(*[getattr(Artwork, c).ilike(pattern) for c in FTS_COLUMNS]))
+    rows = query.order_by(Artwork.id).offset(offset).limit(limit + 1).all()
+    items = [{
+        "id": row.id,
+        "title": row.title,
+        "creator": row.creator,
+        "image_url": row.image_url,
+        "department": row.department,
+        "snippet": None,
+        "score": None,
+    } for row in rows[:limit]]
+    return {"items": items, "next_offset": offset + limit if len(rows) > limit else None}
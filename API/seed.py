@@ -1,6 +1,7 @@
 from database import Base, engine, SessionLocal, Event, Holiday, OperatingHour, Newsletter, User
 from datetime import date, datetime
 import bcrypt
+from versioning import bump_version
 
 # 1. Create Tables
 Base.metadata.create_all(bind=engine)
@@ -52,7 +53,10 @@ for o in hours_data:
     if not db.query(OperatingHour).filter_by(day=o["day"]).first():
         db.add(OperatingHour(**o))
 
-# 6. Commit
+# 6. Invalidate cached copies held by clients (ETags on /api/hours and /api/holidays)
+bump_version(db, "holidays", "operating_hours")
+
+# 7. Commit
 db.commit()
 db.close()
 print("Database seeded successfully with Artworks and Newsletters!")
\ No newline at end of file
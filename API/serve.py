@@ -0,0 +1,214 @@
+"""Production entry point: preloaded, pre-forked uvicorn workers with warmup.
+
+Run from the API directory:
+
+    python -m serve --workers 4 --port 8000
+
+The parent process imports the app and runs schema setup (create_all,
+migrations, the search index) exactly once, binds the listening socket, then
+forks the workers. Each worker inherits the imported modules copy-on-write
+instead of importing them again, drops the parent's pooled connections, and
+runs a warmup step (connection pools, reference data caches, live newsletter
+editions) during startup, before it accepts its first request. The parent
+restarts workers that die and forwards SIGTERM for a graceful shutdown.
+
+Platforms without os.fork (Windows) run a single in-process worker.
+"""
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+from contextlib import AsyncExitStack
+from datetime import date, timedelta
+
+SERVE_HOST = os.environ.get("SERVE_HOST", "127.0.0.1")
+SERVE_PORT = int(os.environ.get("SERVE_PORT", "8000"))
+WEB_CONCURRENCY = int(os.environ.get("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+# Connections opened per pool during warmup (capped by each pool's size)
+WARMUP_CONNECTIONS = int(os.environ.get("WARMUP_CONNECTIONS", "4"))
+# Public GETs replayed through the app during warmup to fill the response caches
+WARMUP_PATHS = ("/api", "/api/status", "/api/status/now", "/api/hours", "/api/holidays", "/api/events", "/api/artworks")
+# A worker that dies this soon after starting is treated as a startup failure, not restarted
+MIN_WORKER_LIFETIME_SECONDS = 5
+
+
+async def _asgi_get(app, path: str, query: str = ""):
+    """One in-process GET through the full middleware stack. Returns the status code."""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+        "headers": [(b"host", b"warmup"), (b"accept-encoding", b"gzip")],
+        "client": ("127.0.0.1", 0), "server": ("warmup", 80),
+    }
+    response = {}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+
+    await app(scope, receive, send)
+    return response.get("status")
+
+
+def _open_connections(bind, count: int):
+    connections = [bind.connect() for _ in range(count)]
+    for connection in connections:
+        connection.exec_driver_sql("SELECT 1")
+        connection.close()  # back into the pool, still open
+
+
+async def warmup():
+    """Startup hook run in each worker's event loop before it serves traffic."""
+    from starlette.concurrency import run_in_threadpool # type: ignore
+    from database import engine, read_engine, async_engine, DB_POOL_SIZE, DB_READ_POOL_SIZE
+    from newsletter_editions import edition_resolver
+    import main
+
+    started = time.perf_counter()
+    await run_in_threadpool(_open_connections, engine, min(WARMUP_CONNECTIONS, DB_POOL_SIZE))
+    await run_in_threadpool(_open_connections, read_engine, min(WARMUP_CONNECTIONS, DB_READ_POOL_SIZE))
+    async with AsyncExitStack() as stack:
+        for _ in range(min(WARMUP_CONNECTIONS, DB_READ_POOL_SIZE)):
+            connection = await stack.enter_async_context(async_engine.connect())
+            await connection.exec_driver_sql("SELECT 1")
+
+    month_start = date.today().replace(day=1)
+    month_end = (month_start + timedelta(days=31)).replace(day=1) - timedelta(days=1)
+    requests = [(path, "") for path in WARMUP_PATHS]
+    requests.append(("/api/events", f"start={month_start.isoformat()}&end={month_end.isoformat()}"))
+    failures = 0
+    for path, query in requests:
+        try:
+            if await _asgi_get(main.app, path, query) != 200:
+                failures += 1
+        except Exception as e:
+            failures += 1
+            print(f"Warmup request {path} failed: {e}")
+    for lang in ("en", "es", "fr"):
+        await run_in_threadpool(edition_resolver.get, lang)
+
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"Worker {os.getpid()} warmed up in {elapsed:.0f} ms ({len(requests)} requests, {failures} failed).")
+
+
+def _bind(host: str, port: int):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock, log_level: str):
+    import uvicorn # type: ignore
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on", timeout_graceful_shutdown=20)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _spawn(app, sock, log_level: str):
+    pid = os.fork()
+    if pid:
+        return pid
+    # Worker: default signal handling (uvicorn installs its own), fresh DB pools
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    from database import reset_pools
+    reset_pools(close=False)
+    code = 0
+    try:
+        _run_worker(app, sock, log_level)
+    except BaseException as e:
+        print(f"Worker {os.getpid()} crashed: {e}")
+        code = 1
+    finally:
+        sys.stdout.flush()
+        os._exit(code)
+
+
+def serve(host: str, port: int, workers: int, warm: bool, log_level: str):
+    started = time.perf_counter()
+    # Schema setup runs below, once, instead of in every worker's import
+    os.environ["SCHEMA_SETUP_ON_IMPORT"] = "false"
+    import main
+    from database import reset_pools
+    imported = time.perf_counter()
+    main.setup_database()
+    reset_pools()
+    if warm:
+        main.app.router.add_event_handler("startup", warmup)
+    ready = time.perf_counter()
+    print(f"Preloaded app in {(imported - started) * 1000:.0f} ms, schema setup {(ready - imported) * 1000:.0f} ms.")
+
+    sock = _bind(host, port)
+    if workers <= 1 or not hasattr(os, "fork"):
+        print(f"Serving on {host}:{port} with 1 worker.")
+        _run_worker(main.app, sock, log_level)
+        return 0
+
+    # Move everything imported so far out of the collector's reach, so that
+    # collections in the workers do not write to (and un-share) these pages
+    gc.collect()
+    gc.freeze()
+
+    children = {}
+    stopping = []
+
+    def on_term(signum, frame):
+        stopping.append(signum)
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, on_term)
+    # Ctrl-C reaches every worker through the process group already; just stop restarting them
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.append(signum))
+
+    for _ in range(workers):
+        children[_spawn(main.app, sock, log_level)] = time.monotonic()
+    print(f"Serving on {host}:{port} with {workers} workers: {', '.join(map(str, children))}.")
+
+    exit_code = 0
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        spawned_at = children.pop(pid, None)
+        if spawned_at is None or stopping:
+            continue
+        code = os.waitstatus_to_exitcode(status)
+        if time.monotonic() - spawned_at < MIN_WORKER_LIFETIME_SECONDS:
+            print(f"Worker {pid} exited during startup ({code}); shutting down.")
+            exit_code = 1
+            on_term(signal.SIGTERM, None)
+            continue
+        new_pid = _spawn(main.app, sock, log_level)
+        children[new_pid] = time.monotonic()
+        print(f"Worker {pid} exited ({code}); started {new_pid}.")
+    sock.close()
+    print("All workers stopped.")
+    return exit_code
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=SERVE_HOST)
+    parser.add_argument("--port", type=int, default=SERVE_PORT)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument("--no-warmup", action="store_true", help="accept traffic without priming pools and caches")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args()
+    sys.exit(serve(args.host, args.port, args.workers, not args.no_warmup, args.log_level))
+
+
+if __name__ == "__main__":
+    main_cli()
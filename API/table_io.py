@@ -0,0 +1,191 @@
+import csv
+import io
+import json
+import os
+import re
+from datetime import datetime
+from sqlalchemy import insert # type: ignore
+from database import engine, ReadSessionLocal, User, EmailQueue, NewsletterLog
+from fastjson import dumps
+from timestamps import timestamp_now
+
+# Rows fetched per server-side cursor round trip, and bytes buffered before each chunk is sent
+EXPORT_FETCH_ROWS = int(os.environ.get("EXPORT_FETCH_ROWS", "2000"))
+EXPORT_CHUNK_BYTES = 64 * 1024
+# Rows inserted per import transaction; each chunk commits on its own
+IMPORT_CHUNK_ROWS = int(os.environ.get("IMPORT_CHUNK_ROWS", "5000"))
+IMPORT_MAX_ERRORS = 50
+# $2a$/$2b$/$2y$, two-digit cost, then 22 salt + 31 hash characters
+BCRYPT_HASH = re.compile(r"^\$2[aby]\$\d\d\$[./A-Za-z0-9]{53}$")
+
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Exported columns per table. Password hashes never leave the database.
+EXPORT_TABLES = {
+    "users": (User, ("id", "email", "role")),
+    "email_queue": (EmailQueue, ("id", "recipient", "subject", "body", "status", "created_at", "retry_count",
+                                 "sent_at", "next_attempt_at", "last_error")),
+    "newsletter_logs": (NewsletterLog, ("id", "user_email", "sent_at", "status")),
+}
+
+
+class ImportSpec:
+    """Columns an import accepts for one table: required ones, and defaults for the rest."""
+
+    def __init__(self, model, required, optional):
+        self.model = model
+        self.required = required
+        self.optional = optional  # column -> default value, or a callable producing one
+
+
+IMPORT_TABLES = {
+    # Users arrive with existing bcrypt hashes; rows whose email already exists are skipped
+    "users": ImportSpec(User, ("email", "hashed_password"), {"role": "member"}),
+    "email_queue": ImportSpec(EmailQueue, ("recipient", "subject", "body"), {
+        "status": "pending",
+        "created_at": timestamp_now,
+        "retry_count": 0,
+    }),
+    "newsletter_logs": ImportSpec(NewsletterLog, ("user_email",), {
+        "sent_at": timestamp_now,
+        "status": "imported",
+    }),
+}
+IMPORTABLE_ROLES = ("member", "admin")
+
+
+def stream_export(table: str, fmt: str, after: int = None):
+    """Yield an export as byte chunks from a server-side cursor, in constant memory.
+
+    Runs in Starlette's threadpool when handed to StreamingResponse, so a long
+    export never blocks the event loop. The read session holds a single WAL
+    snapshot, which does not block writers.
+    """
+    model, columns = EXPORT_TABLES[table]
+    db = ReadSessionLocal()
+    try:
+        query = db.query(*[getattr(model, c) for c in columns])
+        if after is not None:
+            query = query.filter(model.id > after)
+        rows = query.order_by(model.id).yield_per(EXPORT_FETCH_ROWS)
+
+        if fmt == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            for row in rows:
+                writer.writerow(row)
+                if buffer.tell() >= EXPORT_CHUNK_BYTES:
+                    yield buffer.getvalue().encode("utf-8")
+                    buffer.seek(0)
+                    buffer.truncate()
+            yield buffer.getvalue().encode("utf-8")
+        else:
+            chunk = bytearray()
+            for row in rows:
+                chunk += dumps(dict(zip(columns, row)))
+                chunk += b"\n"
+                if len(chunk) >= EXPORT_CHUNK_BYTES:
+                    yield bytes(chunk)
+                    chunk.clear()
+            yield bytes(chunk)
+    finally:
+        db.close()
+
+
+def export_filename(table: str, fmt: str):
+    return f"{table}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+
+
+def _ndjson_records(text):
+    for line in text:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield None, "each line must be a JSON object"
+            continue
+        yield record, None
+
+
+def _csv_records(text):
+    for record in csv.DictReader(text):
+        yield record, None
+
+
+def _clean(spec: ImportSpec, table: str, record: dict):
+    """Map one uploaded record to an insertable row, or return an error message."""
+    row = {}
+    for column in spec.required:
+        value = record.get(column)
+        if value in (None, ""):
+            return None, f"missing {column}"
+        row[column] = str(value).strip()
+    for column, default in spec.optional.items():
+        value = record.get(column)
+        if value in (None, ""):
+            value = default() if callable(default) else default
+        row[column] = value
+    if table == "users":
+        row["email"] = row["email"].lower()
+        if row["role"] not in IMPORTABLE_ROLES:
+            return None, f"role must be one of {', '.join(IMPORTABLE_ROLES)}"
+        if not BCRYPT_HASH.fullmatch(row["hashed_password"]):
+            return None, "hashed_password must be a bcrypt hash"
+    if table == "email_queue":
+        try:
+            row["retry_count"] = int(row["retry_count"])
+        except (TypeError, ValueError):
+            return None, "retry_count must be an integer"
+    return row, None
+
+
+def _insert_chunk(spec: ImportSpec, rows):
+    # One short transaction per chunk; OR IGNORE skips rows that hit a unique constraint
+    with engine.begin() as conn:
+        result = conn.execute(insert(spec.model.__table__).prefix_with("OR IGNORE"), rows)
+    return max(result.rowcount, 0)
+
+
+def import_rows(table: str, fmt: str, fileobj):
+    """Parse an uploaded file line by line and insert it in chunked transactions."""
+    spec = IMPORT_TABLES[table]
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    records = _csv_records(text) if fmt == "csv" else _ndjson_records(text)
+    summary = {"table": table, "format": fmt, "rows": 0, "inserted": 0, "skipped": 0, "invalid": 0,
+               "chunks": 0, "errors": []}
+    chunk = []
+
+    def flush():
+        inserted = _insert_chunk(spec, chunk)
+        summary["inserted"] += inserted
+        summary["skipped"] += len(chunk) - inserted
+        summary["chunks"] += 1
+        chunk.clear()
+
+    try:
+        for number, (record, error) in enumerate(records, start=1):
+            summary["rows"] += 1
+            row = None
+            if error is None:
+                row, error = _clean(spec, table, record)
+            if error is not None:
+                summary["invalid"] += 1
+                if len(summary["errors"]) < IMPORT_MAX_ERRORS:
+                    summary["errors"].append({"record": number, "error": error})
+                continue
+            chunk.append(row)
+            if len(chunk) >= IMPORT_CHUNK_ROWS:
+                flush()
+        if chunk:
+            flush()
+    except (UnicodeDecodeError, csv.Error) as e:
+        summary["errors"].append({"record": summary["rows"] + 1, "error": f"unreadable upload: {e}"})
+    finally:
+        text.detach()
+    return summary
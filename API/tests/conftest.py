@@ -0,0 +1,38 @@
+"""Shared fixtures: every test run gets a throwaway SQLite database and the real app.
+
+The environment is set before anything imports database.py, since the engine
+and most settings are module constants read at import time.
+"""
+import os
+import sys
+import tempfile
+
+_TMP = tempfile.mkdtemp(prefix="museum-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP, 'museum.db')}"
+os.environ.pop("ASYNC_DATABASE_URL", None)
+os.environ["IMAGE_CACHE_DIR"] = os.path.join(_TMP, "image_cache")
+os.environ["ADMISSION_ENABLED"] = "false"
+os.environ["SCHEDULER_MODE"] = "external"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest # type: ignore
+from fastapi.testclient import TestClient # type: ignore
+import main # noqa: E402  (creates the schema on import)
+from cache import reference_cache
+from database import SessionLocal
+
+
+@pytest.fixture
+def db():
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def client():
+    reference_cache.clear()
+    with TestClient(main.app) as test_client:
+        yield test_client
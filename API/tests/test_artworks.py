@@ -0,0 +1,34 @@
+from database import Artwork
+from versioning import bump_version
+
+
+def _seed(db, count):
+    db.query(Artwork).delete()
+    db.add_all(Artwork(title=f"Work {i}", creator="Anon", image_url=f"https://example.org/{i}.jpg") for i in range(count))
+    bump_version(db, "artworks")
+    db.commit()
+
+
+def test_projection_without_image_url_keeps_every_item(client, db):
+    _seed(db, 3)
+    response = client.get("/api/artworks", params={"fields": "title", "limit": 50})
+    assert response.status_code == 200
+    body = response.json()
+    assert [sorted(item) for item in body["items"]] == [["id", "title"]] * 3
+    assert body["next_cursor"] is None
+
+
+def test_projection_without_image_url_pages_by_cursor(client, db):
+    _seed(db, 3)
+    first = client.get("/api/artworks", params={"fields": "title", "limit": 1}).json()
+    assert len(first["items"]) == 1
+    assert first["next_cursor"] == first["items"][0]["id"]
+    second = client.get("/api/artworks", params={"fields": "title", "limit": 1, "after": first["next_cursor"]}).json()
+    assert second["items"][0]["id"] > first["next_cursor"]
+
+
+def test_projection_with_image_url_gets_srcset(client, db):
+    _seed(db, 2)
+    items = client.get("/api/artworks", params={"fields": "title,image_url", "limit": 50}).json()["items"]
+    assert len(items) == 2
+    assert all("image_srcset" in item for item in items)
@@ -0,0 +1,55 @@
+from datetime import date
+
+from sqlalchemy import text # type: ignore
+from starlette.requests import Request # type: ignore
+
+from cache import cached_json_response, reference_cache
+from database import engine, Holiday
+from versioning import bump_version
+
+
+def _write_from_another_process(name: str, day: date):
+    # A plain engine transaction never fires the session hooks, like a write made by another worker
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO holidays (name, date) VALUES (:name, :date)"), {"name": name, "date": day})
+        conn.execute(text("UPDATE table_versions SET version = version + 1 WHERE table_name = 'holidays'"))
+
+
+def _seed(db):
+    db.query(Holiday).delete()
+    db.add(Holiday(name="New Year", date=date(2026, 1, 1)))
+    bump_version(db, "holidays")
+    db.commit()
+
+
+def test_hit_is_served_while_versions_match(client, db):
+    _seed(db)
+    assert client.get("/api/holidays").json() == {"New Year": "2026-01-01"}
+    hits = reference_cache.stats()["hits"]
+    assert client.get("/api/holidays").json() == {"New Year": "2026-01-01"}
+    assert reference_cache.stats()["hits"] == hits + 1
+
+
+def test_write_from_another_process_is_seen_on_the_next_request(client, db):
+    _seed(db)
+    first = client.get("/api/holidays")
+    _write_from_another_process("Founders Day", date(2026, 3, 1))
+    stale = reference_cache.stats()["stale"]
+
+    second = client.get("/api/holidays", headers={"If-None-Match": first.headers["etag"]})
+    assert second.status_code == 200
+    assert second.json() == {"New Year": "2026-01-01", "Founders Day": "2026-03-01"}
+    assert second.headers["etag"] != first.headers["etag"]
+    assert reference_cache.stats()["stale"] == stale + 1
+
+
+def test_sync_lookup_revalidates_too(db):
+    _seed(db)
+    reference_cache.clear()
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+    build = lambda: {"names": [name for (name,) in db.query(Holiday.name).order_by(Holiday.id)]}
+
+    assert cached_json_response(request, ("holidays",), build).body == b'{"names":["New Year"]}'
+    _write_from_another_process("Founders Day", date(2026, 3, 1))
+    db.rollback()  # end the read snapshot so build() sees the new row
+    assert cached_json_response(request, ("holidays",), build).body == b'{"names":["New Year","Founders Day"]}'
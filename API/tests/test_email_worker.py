@@ -0,0 +1,177 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest # type: ignore
+
+import email_worker
+from database import SessionLocal, EmailQueue
+from email_worker import EmailDeliveryWorker, EMAIL_MAX_RETRIES
+from timestamps import TIMESTAMP_FORMAT
+
+
+class FakePool:
+    """Stands in for SMTPPool: records recipients, optionally failing or stalling each send."""
+
+    def __init__(self, fail: bool = False, delay: float = 0.0):
+        self.fail = fail
+        self.delay = delay
+        self.sent = []
+        self._lock = threading.Lock()
+
+    def send(self, message):
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionRefusedError("relay down")
+        with self._lock:
+            self.sent.append(message["To"])
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def make_worker():
+    workers = []
+
+    def make(pool=None, batch_size=50, concurrency=4):
+        worker = EmailDeliveryWorker(host=None, concurrency=concurrency, batch_size=batch_size)
+        worker.pool = pool or FakePool()
+        workers.append(worker)
+        return worker
+
+    yield make
+    for worker in workers:
+        worker.close()
+
+
+@pytest.fixture
+def queued(db):
+    def enqueue(count, retry_count=0):
+        db.query(EmailQueue).delete()
+        db.add_all(EmailQueue(recipient=f"member{i}@example.org", subject="Hi", body="News", status="pending",
+                              retry_count=retry_count) for i in range(count))
+        db.commit()
+
+    return enqueue
+
+
+def _rows(db):
+    db.expire_all()
+    return {row.id: row for row in db.query(EmailQueue).order_by(EmailQueue.id)}
+
+
+def _claim(worker):
+    session = SessionLocal()
+    try:
+        return worker.claim_batch(session)
+    finally:
+        session.close()
+
+
+def _lapse_leases(db):
+    past = (datetime.now() - timedelta(seconds=1)).strftime(TIMESTAMP_FORMAT)
+    db.query(EmailQueue).filter(EmailQueue.status == "sending").update({"lease_expires_at": past})
+    db.commit()
+
+
+def test_two_claimers_never_share_a_row(queued, make_worker):
+    queued(10)
+    first, second = make_worker(batch_size=4), make_worker(batch_size=4)
+    claims = {}
+    threads = [threading.Thread(target=lambda w=w, key=key: claims.__setitem__(key, _claim(w)))
+               for key, w in (("first", first), ("second", second))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    (owner_a, rows_a), (owner_b, rows_b) = claims["first"], claims["second"]
+    assert owner_a != owner_b
+    assert len(rows_a) == len(rows_b) == 4
+    assert not {row.id for row in rows_a} & {row.id for row in rows_b}
+    # Leased rows stay out of further claims until the lease lapses
+    assert len(_claim(make_worker(batch_size=10))[1]) == 2
+
+
+def test_lease_is_renewed_while_a_batch_is_sending(monkeypatch, db, queued, make_worker):
+    monkeypatch.setattr(email_worker, "EMAIL_LEASE_SECONDS", 1)
+    monkeypatch.setattr(email_worker, "EMAIL_LEASE_RENEW_SECONDS", 0.05)
+    queued(3)
+    worker = make_worker(FakePool(delay=0.2), concurrency=1)
+    renewals = []
+    renew = worker.renew_lease
+    monkeypatch.setattr(worker, "renew_lease", lambda session, owner: (renewals.append(owner), renew(session, owner)))
+
+    session = SessionLocal()
+    try:
+        owner, batch = worker.claim_batch(session)
+        assert worker.process_batch(session, owner, batch) == (3, 0, 0)
+    finally:
+        session.close()
+    assert renewals and set(renewals) == {owner}
+    assert {row.status for row in _rows(db).values()} == {"sent"}
+
+
+def test_outcomes_for_a_taken_over_lease_are_dropped(db, queued, make_worker):
+    queued(3)
+    slow, successor = make_worker(), make_worker()
+    session = SessionLocal()
+    try:
+        owner, batch = slow.claim_batch(session)
+        _lapse_leases(db)
+        new_owner, reclaimed = _claim(successor)
+        assert {row.id for row in reclaimed} == {row.id for row in batch}
+
+        assert slow.process_batch(session, owner, batch) == (3, 0, 3)
+        rows = _rows(db).values()
+        assert {(row.status, row.lease_owner) for row in rows} == {("sending", new_owner)}
+
+        assert successor.process_batch(session, new_owner, reclaimed) == (3, 0, 0)
+    finally:
+        session.close()
+    assert {row.status for row in _rows(db).values()} == {"sent"}
+
+
+def test_failed_sends_back_off_until_next_attempt_at(db, queued, make_worker):
+    queued(2)
+    worker = make_worker(FakePool(fail=True))
+    session = SessionLocal()
+    try:
+        owner, batch = worker.claim_batch(session)
+        before = datetime.now().replace(microsecond=0)
+        assert worker.process_batch(session, owner, batch) == (0, 2, 0)
+    finally:
+        session.close()
+
+    for row in _rows(db).values():
+        assert (row.status, row.retry_count, row.lease_owner) == ("failed", 1, None)
+        assert "relay down" in row.last_error
+        # Full jitter keeps the delay between half and all of base * 2^0
+        delay = datetime.strptime(row.next_attempt_at, TIMESTAMP_FORMAT) - before
+        assert timedelta(seconds=email_worker.EMAIL_BACKOFF_BASE_SECONDS // 2 - 1) <= delay
+        assert delay <= timedelta(seconds=email_worker.EMAIL_BACKOFF_BASE_SECONDS + 1)
+
+    assert _claim(worker)[1] == []
+    db.query(EmailQueue).update({"next_attempt_at": "2000-01-01 00:00:00"})
+    db.commit()
+    assert len(_claim(worker)[1]) == 2
+
+
+def test_rows_stop_retrying_after_the_cap(db, queued, make_worker):
+    queued(1, retry_count=EMAIL_MAX_RETRIES - 1)
+    worker = make_worker(FakePool(fail=True))
+    session = SessionLocal()
+    try:
+        owner, batch = worker.claim_batch(session)
+        assert len(batch) == 1
+        worker.process_batch(session, owner, batch)
+    finally:
+        session.close()
+    (row,) = _rows(db).values()
+    assert (row.status, row.retry_count) == ("failed", EMAIL_MAX_RETRIES)
+
+    db.query(EmailQueue).update({"next_attempt_at": "2000-01-01 00:00:00"})
+    db.commit()
+    assert _claim(worker)[1] == []
+    assert worker.drain(max_seconds=1)["batches"] == 0
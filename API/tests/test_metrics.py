@@ -0,0 +1,69 @@
+import asyncio
+
+from benchmarks.metrics_overhead import drive, trivial_app
+from metrics import MetricsMiddleware, MetricsRegistry, registry
+
+# Same budget the benchmark gates on; best of three runs to ride out scheduler noise
+OVERHEAD_BUDGET_US = 25.0
+OVERHEAD_REQUESTS = 20_000
+
+
+def _count(method, route, status_code):
+    return registry.requests.get((method, route, status_code), 0)
+
+
+def test_overhead_within_budget():
+    wrapped = MetricsMiddleware(trivial_app, MetricsRegistry())
+    bare = min(asyncio.run(drive(trivial_app, OVERHEAD_REQUESTS)) for _ in range(3))
+    instrumented = min(asyncio.run(drive(wrapped, OVERHEAD_REQUESTS)) for _ in range(3))
+    assert (instrumented - bare) / OVERHEAD_REQUESTS * 1e6 <= OVERHEAD_BUDGET_US
+
+
+def test_routes_are_labelled_by_template(client):
+    before = _count("GET", "/api/artworks/{artwork_id}", 404)
+    for artwork_id in (987654, 987655):
+        assert client.get(f"/api/artworks/{artwork_id}").status_code == 404
+    assert _count("GET", "/api/artworks/{artwork_id}", 404) == before + 2
+
+    rendered = registry.render()
+    assert 'route="/api/artworks/{artwork_id}"' in rendered
+    assert "/api/artworks/987654" not in rendered
+
+
+def test_unrouted_paths_share_one_label(client):
+    before = _count("GET", "unmatched", 404)
+    client.get("/no/such/path/1")
+    client.get("/no/such/path/2")
+    assert _count("GET", "unmatched", 404) == before + 2
+    assert not any(route.startswith("/no/such") for _, route, _ in registry.requests)
+
+
+def test_status_codes_are_counted_separately(client):
+    ok_before = _count("GET", "/api/hours", 200)
+    client.get("/api/hours")
+    client.get("/api/hours")
+    assert _count("GET", "/api/hours", 200) == ok_before + 2
+
+    rejected_before = _count("GET", "/api/artworks", 400)
+    assert client.get("/api/artworks", params={"view": "bogus"}).status_code == 400
+    assert _count("GET", "/api/artworks", 400) == rejected_before + 1
+
+
+def test_in_flight_returns_to_zero(client):
+    client.get("/api/hours")
+    client.get("/api/artworks/987654")
+    client.get("/no/such/path")
+    assert registry.in_flight == 0
+    assert "\nhttp_requests_in_flight 0\n" in registry.render()
+
+
+def test_resumed_newsletter_run_is_counted_once(monkeypatch):
+    import scheduler
+
+    monkeypatch.setattr(scheduler, "stale_runs", lambda: ["2026-09", "2026-10"])
+    monkeypatch.setattr(scheduler, "dispatch_newsletter", lambda run_key: 0)
+    before = dict(registry.job_runs)
+    scheduler.resume_newsletter_dispatch_task()
+    after = registry.job_runs
+    assert after.get(("resume_newsletter_dispatch", "success"), 0) == before.get(("resume_newsletter_dispatch", "success"), 0) + 1
+    assert after.get(("send_monthly_newsletter", "success"), 0) == before.get(("send_monthly_newsletter", "success"), 0)
@@ -0,0 +1,27 @@
+import pytest # type: ignore
+
+import email_worker
+from database import engine
+from migrations import check_query_plans, hot_queries, query_plan
+
+
+def test_hot_queries_use_their_indexes():
+    failures, checked = check_query_plans(engine)
+    assert checked >= 7
+    assert failures == []
+
+
+def test_claim_plan_comes_from_the_worker(db):
+    (claim,) = [query for query in hot_queries(db) if query[0] == "email queue claim"]
+    assert claim[1] is email_worker._CLAIM
+
+
+@pytest.mark.parametrize("name", ["email queue claim", "current newsletter", "next newsletter", "calendar occurrence range"])
+def test_no_sort_or_full_scan(db, name):
+    (_, statement, parameters, index) = [query for query in hot_queries(db) if query[0] == name][0]
+    with engine.connect() as conn:
+        plan = query_plan(conn, statement, parameters)
+    assert index in plan, plan
+    assert "TEMP B-TREE" not in plan, plan
+    for step in plan.split(" | "):
+        assert not (step.startswith("SCAN") and "USING" not in step), plan
@@ -0,0 +1,24 @@
+"""Timestamps as stored in the database's string columns, and lease owner names.
+
+Every *_at column is local time in TIMESTAMP_FORMAT (table_versions.updated_at
+is UTC in the same format), so timestamps compare correctly as strings in SQL.
+"""
+import os
+import socket
+import uuid
+from datetime import datetime
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def format_timestamp(dt: datetime):
+    return dt.strftime(TIMESTAMP_FORMAT)
+
+
+def timestamp_now():
+    return format_timestamp(datetime.now())
+
+
+def lease_owner():
+    """host-pid-nonce: unique per call, and says which process holds a lease when read back."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from hashlib import sha1
+from fastapi import Request, Response # type: ignore
+from sqlalchemy import text, bindparam # type: ignore
+from database import read_engine, async_engine
+from fastjson import encoded_etag, identity_etag
+from timestamps import TIMESTAMP_FORMAT, format_timestamp
+
+# Public read endpoints revalidate on every use but can be answered with a 304
+CACHE_CONTROL = "no-cache"
+
+_SELECT_VERSIONS = text(
+    "SELECT table_name, version, updated_at FROM table_versions WHERE table_name IN :names"
+).bindparams(bindparam("names", expanding=True))
+
+
+def current_versions(*tables: str):
+    """Return ({table: version}, latest updated_at) with one lightweight query, bypassing the ORM."""
+    with read_engine.connect() as conn:
+        rows = conn.execute(_SELECT_VERSIONS, {"names": list(tables)}).fetchall()
+    return _collect_versions(tables, rows)
+
+
+async def current_versions_async(*tables: str):
+    """Same as current_versions() but on the async engine."""
+    async with async_engine.connect() as conn:
+        rows = (await conn.execute(_SELECT_VERSIONS, {"names": list(tables)})).fetchall()
+    return _collect_versions(tables, rows)
+
+
+def _collect_versions(tables, rows):
+    versions = {name: 0 for name in tables}
+    last_modified = None
+    for name, version, updated_at in rows:
+        versions[name] = version
+        if updated_at and (last_modified is None or updated_at > last_modified):
+            last_modified = updated_at
+    return versions, last_modified
+
+
+def make_etag(versions: dict, variant: str = ""):
+    """Strong ETag from table versions plus any request variant (e.g. a date window)."""
+    tag = "-".join(f"{name}.{versions[name]}" for name in sorted(versions))
+    if variant:
+        tag += "-" + sha1(variant.encode("utf-8")).hexdigest()[:12]
+    return f'"{tag}"'
+
+
+def _http_date(updated_at: str):
+    dt = datetime.strptime(updated_at, TIMESTAMP_FORMAT).replace(tzinfo=timezone.utc)
+    return format_datetime(dt, usegmt=True)
+
+
+def validator_headers(versions: dict, last_modified: str = None, variant: str = ""):
+    """ETag / Last-Modified / Cache-Control headers for a response built at these versions."""
+    headers = {"ETag": make_etag(versions, variant), "Cache-Control": CACHE_CONTROL}
+    if last_modified:
+        headers["Last-Modified"] = _http_date(last_modified)
+    return headers
+
+
+def is_not_modified(request: Request, headers: dict):
+    """True when the request's validators show the client already holds this representation."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # A client holding the gzip bytes sends the "-gzip" form of the same tag
+        candidates = [identity_etag(tag.strip()) for tag in if_none_match.split(",")]
+        return headers["ETag"] in candidates or "*" in candidates
+    if "Last-Modified" in headers and request.headers.get("if-modified-since"):
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"])
+            return parsedate_to_datetime(headers["Last-Modified"]) <= since
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def not_modified_response(headers: dict, request: Request = None):
+    """304 for a matched request, echoing the encoded ETag form the client sent if it sent that one."""
+    headers = dict(headers)
+    if request is not None:
+        sent = [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]
+        gzip_etag = encoded_etag(headers["ETag"], "gzip")
+        if gzip_etag in sent:
+            headers["ETag"] = gzip_etag
+    return Response(status_code=304, headers=headers)
+
+
+def bump_version(db, *tables: str):
+    """Increment the version of each table inside the caller's transaction. Caller commits.
+
+    The tables are also recorded on the session so in-process caches can be
+    dropped once the transaction commits (see cache.py).
+    """
+    db.info.setdefault("bumped_tables", set()).update(tables)
+    now = format_timestamp(datetime.utcnow())
+    for table in tables:
+        updated = db.execute(
+            text("UPDATE table_versions SET version = version + 1, updated_at = :now WHERE table_name = :name"),
+            {"now": now, "name": table},
+        )
+        if updated.rowcount == 0:
+            db.execute(
+                text("INSERT INTO table_versions (table_name, version, updated_at) VALUES (:name, 1, :now)"),
+                {"now": now, "name": table},
+            )
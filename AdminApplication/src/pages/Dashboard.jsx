@@ -403,47 +403,53 @@ export default function Dashboard() {
     }
   };
 
+  // Exception edits go through the batch endpoint, which returns only the changed event rows
+  const applyEventBatch = async (batch) => {
+    const res = await fetch(`${API_URL}/events/batch`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        "Authorization": `Bearer ${token}`
+      },
+      body: JSON.stringify(batch),
+    });
+    if (!res.ok) {
+      const errorData = await res.json();
+      const failed = errorData.detail?.failed;
+      throw new Error(failed ? failed.map(f => f.status.replace("_", " ")).join(", ") : (errorData.detail || "Unknown error"));
+    }
+    const data = await res.json();
+    const changedById = new Map(data.changed.map(ev => [ev.id, ev]));
+    setEvents(prev => prev
+      .filter(ev => !data.deleted.includes(ev.id))
+      .map(ev => changedById.get(ev.id) || ev));
+    return data;
+  };
+
   const handleAddException = async (e) => {
     e.preventDefault();
     if (!newExceptionDate) return;
     try {
-      const res = await fetch(`${API_URL}/events/${editingItem.id}/exceptions`, {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-          "Authorization": `Bearer ${token}`
-        },
-        body: JSON.stringify({ exception_date: newExceptionDate }),
+      const data = await applyEventBatch({
+        add_exceptions: [{ event_id: editingItem.id, exception_date: newExceptionDate }],
+        atomic: true
       });
-      if (res.ok) {
-        setNewExceptionDate("");
-        const updatedEventsRes = await fetch(`${API_URL}/admin/events`);
-        const updatedEvents = await updatedEventsRes.json();
-        setEvents(updatedEvents);
-        const updatedItem = updatedEvents.find(ev => ev.id === editingItem.id);
-        if (updatedItem) setEditingItem(updatedItem);
-      } else {
-        const errorData = await res.json();
-        alert(`Failed to add skip date: ${errorData.detail}`);
-      }
+      setNewExceptionDate("");
+      const updatedItem = data.changed.find(ev => ev.id === editingItem.id);
+      if (updatedItem) setEditingItem(updatedItem);
     } catch (err) {
       console.error(err);
+      alert(`Failed to add skip date: ${err.message}`);
     }
   };
 
   const handleRemoveException = async (dateStr) => {
     try {
-      const res = await fetch(`${API_URL}/events/${editingItem.id}/exceptions/${dateStr}`, {
-        method: "DELETE",
-        headers: { "Authorization": `Bearer ${token}` }
+      const data = await applyEventBatch({
+        remove_exceptions: [{ event_id: editingItem.id, exception_date: dateStr }]
       });
-      if (res.ok) {
-        const updatedEventsRes = await fetch(`${API_URL}/admin/events`);
-        const updatedEvents = await updatedEventsRes.json();
-        setEvents(updatedEvents);
-        const updatedItem = updatedEvents.find(ev => ev.id === editingItem.id);
-        if (updatedItem) setEditingItem(updatedItem);
-      }
+      const updatedItem = data.changed.find(ev => ev.id === editingItem.id);
+      if (updatedItem) setEditingItem(updatedItem);
     } catch (err) {
       console.error(err);
     }
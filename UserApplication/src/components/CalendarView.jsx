@@ -1,6 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useTranslation } from 'react-i18next';
 import { motion, AnimatePresence } from 'framer-motion';
+import { resolveSrcSet, dropSrcSetOnError } from '../imageSources';
 
 function CalendarView({ activeCategory = 'all' }) {
   const { t, i18n } = useTranslation();
@@ -19,6 +20,7 @@ function CalendarView({ activeCategory = 'all' }) {
       return {
         description: event.description || (isGA ? t('calendar.ga_desc') : `${t('nav.featuredArts')} - High Museum of Art.`),
         image: event.image_url || (isGA ? '/src/assets/images/museum-img.png' : '/src/assets/images/featured-arts-img.png'),
+        srcSet: resolveSrcSet(event.image_srcset),
         category: event.category || 'exhibition'
       };
     }
@@ -30,13 +32,22 @@ function CalendarView({ activeCategory = 'all' }) {
     };
   };
 
+  const toDateKey = (dateObj) =>
+    `${dateObj.getFullYear()}-${String(dateObj.getMonth() + 1).padStart(2, '0')}-${String(dateObj.getDate()).padStart(2, '0')}`;
+
   useEffect(() => {
-    // Fetch events
-    fetch('http://127.0.0.1:8000/api/events')
+    // Fetch only the occurrences visible in this month's grid (leading days of the previous month included)
+    const monthStart = new Date(currentDate.getFullYear(), currentDate.getMonth(), 1);
+    const rangeStart = new Date(monthStart.getFullYear(), monthStart.getMonth(), 1 - monthStart.getDay());
+    const rangeEnd = new Date(currentDate.getFullYear(), currentDate.getMonth() + 1, 0);
+
+    fetch(`http://127.0.0.1:8000/api/events?start=${toDateKey(rangeStart)}&end=${toDateKey(rangeEnd)}`)
       .then(res => res.json())
-      .then(data => setEventsData(data.monthly_events[0]))
+      .then(data => setEventsData(data.occurrences || {}))
       .catch(err => console.error("Failed to fetch events:", err));
+  }, [currentDate.getFullYear(), currentDate.getMonth()]);
 
+  useEffect(() => {
     // Fetch holidays
     fetch('http://127.0.0.1:8000/api/holidays')
       .then(res => res.json())
@@ -69,64 +80,23 @@ function CalendarView({ activeCategory = 'all' }) {
   };
 
   const getEventsForDate = (dateObj) => {
-    const year = dateObj.getFullYear();
-    const monthIndex = dateObj.getMonth();
     const day = dateObj.getDate();
     const dayOfWeek = dateObj.getDay();
 
-    const mStr = String(monthIndex + 1).padStart(2, '0');
-    const dStr = String(day).padStart(2, '0');
-    const key = `${year}-${mStr}-${dStr}`;
+    const key = toDateKey(dateObj);
 
     if (holidays[key]) {
       return [];
     }
 
-    // Accumulate all events that fall on this day
+    // Occurrences are already expanded server-side; just de-duplicate by title
     const recurringAndExactEvents = [];
     const seenTitles = new Set();
-    
-    // Check all dates in eventsData
-    Object.keys(eventsData).forEach(eventDateStr => {
-      const eventDate = new Date(`${eventDateStr}T12:00:00`); // Use noon to avoid timezone shift issues
-      const eventsOnThatDate = eventsData[eventDateStr] || [];
-
-      eventsOnThatDate.forEach(ev => {
-        let shouldInclude = false;
-        
-        // Ensure ev is treated as object to access properties
-        const isObject = typeof ev === 'object';
-        const title = isObject ? ev.title : ev;
-        const recurrence = isObject ? ev.recurrence : 'none';
-        const exceptionDates = isObject && ev.exception_dates ? ev.exception_dates : [];
-
-        // 0. Skip if this exact date is in the exceptions list
-        const currentDateStr = `${dateObj.getFullYear()}-${String(dateObj.getMonth() + 1).padStart(2, '0')}-${String(dateObj.getDate()).padStart(2, '0')}`;
-        if (exceptionDates.includes(currentDateStr)) {
-          return; // skip evaluating this event for this date
-        }
-
-        // 1. Exact match
-        if (eventDateStr === key) {
-          shouldInclude = true;
-        } 
-        // Only consider recurrence if the current calendar day is AFTER or ON the event's start date
-        else if (dateObj >= new Date(eventDateStr)) {
-          // 2. Weekly match (same day of week)
-          if (recurrence === 'weekly' && dateObj.getDay() === eventDate.getDay()) {
-            shouldInclude = true;
-          }
-          // 3. Monthly match (same day of month)
-          if (recurrence === 'monthly' && dateObj.getDate() === eventDate.getDate()) {
-            shouldInclude = true;
-          }
-        }
-
-        if (shouldInclude && !seenTitles.has(title)) {
-          recurringAndExactEvents.push(ev);
-          seenTitles.add(title);
-        }
-      });
+    (eventsData[key] || []).forEach(ev => {
+      if (!seenTitles.has(ev.title)) {
+        recurringAndExactEvents.push(ev);
+        seenTitles.add(ev.title);
+      }
     });
 
     const isFirstWeek = day <= 7;
@@ -325,6 +295,10 @@ function CalendarView({ activeCategory = 'all' }) {
               <div className="h-48 overflow-hidden border-b-4 border-black">
                 <img
                   src={getEventMetadata(selectedEvent).image}
+                  srcSet={getEventMetadata(selectedEvent).srcSet}
+                  sizes="(min-width: 1024px) 40vw, 100vw"
+                  decoding="async"
+                  onError={dropSrcSetOnError}
                   alt=""
                   className="w-full h-full object-cover"
                 />
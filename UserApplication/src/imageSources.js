@@ -0,0 +1,16 @@
+// Derivative URLs in API payloads (image_srcset) are relative to the API server
+const API_ORIGIN = "http://127.0.0.1:8000";
+
+// srcset for an <img> from an API `image_srcset`, or undefined to use src alone
+export function resolveSrcSet(srcset) {
+  if (!srcset) return undefined;
+  return srcset
+    .split(', ')
+    .map((entry) => (entry.startsWith('/') ? API_ORIGIN + entry : entry))
+    .join(', ');
+}
+
+// If a derivative cannot be served, fall back to the original image in src
+export function dropSrcSetOnError(e) {
+  if (e.currentTarget.hasAttribute('srcset')) e.currentTarget.removeAttribute('srcset');
+}
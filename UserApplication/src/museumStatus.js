@@ -0,0 +1,31 @@
+// Live open/closed status, computed by the API from the structured hours calendar
+const STATUS_URL = "http://127.0.0.1:8000/api/status/now";
+
+// "2026-10-17T17:00:00" (museum wall-clock time) -> "5:00 PM"
+const formatClock = (timestamp) => {
+  const [hours, minutes] = timestamp.slice(11, 16).split(':').map(Number);
+  const suffix = hours >= 12 ? 'PM' : 'AM';
+  return `${hours % 12 || 12}:${String(minutes).padStart(2, '0')} ${suffix}`;
+};
+
+// { isOpen, message } for the status cards on Home and Visitor Information
+export async function fetchMuseumStatus() {
+  const res = await fetch(STATUS_URL);
+  if (!res.ok) throw new Error(`Status request failed: ${res.status}`);
+  const status = await res.json();
+
+  if (status.open) {
+    return { isOpen: true, message: `Open until ${formatClock(status.next_closing)}` };
+  }
+  if (status.holiday) {
+    return { isOpen: false, message: `Closed for ${status.holiday}` };
+  }
+  if (status.today.length === 0) {
+    return { isOpen: false, message: "Closed today" };
+  }
+  const today = status.as_of.slice(0, 10);
+  if (status.next_opening && status.next_opening.startsWith(today)) {
+    return { isOpen: false, message: `Opens at ${formatClock(status.next_opening)}` };
+  }
+  return { isOpen: false, message: "Closed now" };
+}
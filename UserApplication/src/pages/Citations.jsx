@@ -2,6 +2,7 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { useState, useEffect } from 'react';
 import { useTranslation } from 'react-i18next';
 import Footer from '../components/Footer';
+import { resolveSrcSet, dropSrcSetOnError } from '../imageSources';
 import fiveStars from '../assets/images/five-stars.png';
 
 const API_URL = "http://127.0.0.1:8000/api";
@@ -14,8 +15,17 @@ function Citations() {
   useEffect(() => {
     const fetchArtworks = async () => {
       try {
-        const res = await fetch(`${API_URL}/artworks`);
-        const data = await res.json();
+        // Page through the collection, projecting only the columns a citation needs
+        const fields = 'title,creator,image_url,metadata_info,department';
+        const data = [];
+        let cursor = null;
+        do {
+          const after = cursor !== null ? `&after=${cursor}` : '';
+          const res = await fetch(`${API_URL}/artworks?limit=200&fields=${fields}${after}`);
+          const page = await res.json();
+          data.push(...page.items);
+          cursor = page.next_cursor;
+        } while (cursor !== null);
         setArtworks(data);
       } catch (error) {
         console.error("Error fetching citations:", error);
@@ -150,6 +160,11 @@ function Citations() {
                       <div className="w-24 h-24 flex-shrink-0 grayscale hover:grayscale-0 transition-all duration-500 overflow-hidden bg-slate-100 border border-slate-200">
                         <img
                           src={art.image_url}
+                          srcSet={resolveSrcSet(art.image_srcset)}
+                          sizes="96px"
+                          loading="lazy"
+                          decoding="async"
+                          onError={dropSrcSetOnError}
                           alt={art.title}
                           className="w-full h-full object-cover"
                         />
@@ -4,6 +4,7 @@ import { ChevronLeft, ChevronRight } from 'lucide-react';
 import { motion } from 'framer-motion';
 import { useTranslation } from 'react-i18next';
 import CalendarView from '../components/CalendarView';
+import { resolveSrcSet, dropSrcSetOnError } from '../imageSources';
 import featuredArtsImg from '../assets/images/featured-arts-img.png';
 import artEventImg from '../assets/images/art-event.png';
 import museumImg from '../assets/images/museum-img.png';
@@ -14,20 +15,20 @@ function Events() {
   const [featuredEvents, setFeaturedEvents] = useState([]);
 
   useEffect(() => {
-    fetch('http://127.0.0.1:8000/api/events')
+    // Upcoming occurrences for the next 90 days, expanded server-side
+    const toDateKey = (d) => `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
+    const today = new Date();
+    const horizon = new Date(today.getFullYear(), today.getMonth(), today.getDate() + 90);
+
+    fetch(`http://127.0.0.1:8000/api/events?start=${toDateKey(today)}&end=${toDateKey(horizon)}`)
       .then(res => res.json())
       .then(data => {
         const allEvents = [];
-        const monthlyEvents = data.monthly_events[0];
-        const today = new Date(); // Use actual today instead of mock
 
-        Object.entries(monthlyEvents).forEach(([dateStr, events]) => {
-          const eventDate = new Date(dateStr);
-          if (eventDate >= today) {
-            events.forEach(ev => {
-              allEvents.push({ ...ev, date: dateStr });
-            });
-          }
+        Object.entries(data.occurrences || {}).forEach(([dateStr, events]) => {
+          events.forEach(ev => {
+            allEvents.push({ ...ev, date: dateStr });
+          });
         });
 
         // Sort by date and take first 3 unique titles
@@ -96,7 +97,7 @@ function Events() {
             {featuredEvents.length > 0 ? (
               featuredEvents.map((ev, idx) => (
                 <div key={idx} className="group relative h-[450px] overflow-hidden border-2 border-black">
-                  <img src={ev.image_url || featuredArtsImg} alt="" className="absolute inset-0 w-full h-full object-cover transition-transform duration-700 group-hover:scale-110" />
+                  <img src={ev.image_url || featuredArtsImg} srcSet={ev.image_url ? resolveSrcSet(ev.image_srcset) : undefined} sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw" loading="lazy" decoding="async" onError={dropSrcSetOnError} alt="" className="absolute inset-0 w-full h-full object-cover transition-transform duration-700 group-hover:scale-110" />
                   <div className="absolute inset-0 bg-black/40 group-hover:bg-black/20 transition-all flex flex-col items-center justify-center text-center p-8" />
                   <div className="absolute inset-0 flex flex-col items-center justify-center text-white text-center p-8">
                     <span className="text-[10px] font-black uppercase tracking-widest bg-black px-2 py-1 mb-4">{getBadgeForEvent(ev)}</span>
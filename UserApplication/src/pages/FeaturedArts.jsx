@@ -3,6 +3,7 @@ import { motion, AnimatePresence } from 'framer-motion';
 import { useState, useMemo, useEffect } from 'react';
 import { ChevronLeft, ChevronRight, ChevronDown, Info, LayoutGrid, Layers, Maximize2, X, Heart } from 'lucide-react';
 import { useTranslation } from 'react-i18next';
+import { resolveSrcSet, dropSrcSetOnError } from '../imageSources';
 
 const API_URL = "http://127.0.0.1:8000/api";
 
@@ -28,15 +29,22 @@ function FeaturedArts() {
   useEffect(() => {
     const fetchArtworks = async () => {
       try {
-        const res = await fetch(`${API_URL}/artworks`);
-        const data = await res.json();
+        // Compact list view for the grid/carousel; long text is loaded per artwork on open
+        const data = [];
+        let cursor = null;
+        do {
+          const after = cursor !== null ? `&after=${cursor}` : '';
+          const res = await fetch(`${API_URL}/artworks?view=list&limit=200${after}`);
+          const page = await res.json();
+          data.push(...page.items);
+          cursor = page.next_cursor;
+        } while (cursor !== null);
         const formattedData = data.map(art => ({
           ...art,
           artwork: art.title,
           name: art.creator,
-          description: art.curators_insight,
-          metadata: art.metadata_info,
-          image: art.image_url
+          image: art.image_url,
+          srcSet: resolveSrcSet(art.image_srcset)
         }));
         setArtworks(formattedData);
       } catch (error) {
@@ -48,6 +56,20 @@ function FeaturedArts() {
     fetchArtworks();
   }, []);
 
+  const openArtwork = async (artwork) => {
+    setSelectedArtwork(artwork);
+    if (artwork.description !== undefined) return;
+    try {
+      const res = await fetch(`${API_URL}/artworks/${artwork.id}`);
+      const detail = await res.json();
+      const full = { ...artwork, description: detail.curators_insight, metadata: detail.metadata_info };
+      setArtworks(prev => prev.map(art => (art.id === artwork.id ? full : art)));
+      setSelectedArtwork(current => (current && current.id === artwork.id ? full : current));
+    } catch (error) {
+      console.error("Error fetching artwork details:", error);
+    }
+  };
+
   const departments = useMemo(() => {
     const deps = new Set(artworks.map(art => art.department));
     return ['all', 'favorites', ...Array.from(deps)];
@@ -270,10 +292,14 @@ function FeaturedArts() {
                       {/* Image */}
                       <div
                         className="w-full lg:flex-1 flex items-center justify-center cursor-zoom-in relative group"
-                        onClick={() => setSelectedArtwork(artwork)}
+                        onClick={() => openArtwork(artwork)}
                       >
                         <img
                           src={artwork.image}
+                          srcSet={artwork.srcSet}
+                          sizes="(min-width: 1024px) 50vw, 90vw"
+                          decoding="async"
+                          onError={dropSrcSetOnError}
                           alt={artwork.artwork}
                           className="max-w-full max-h-[260px] md:max-h-[420px] lg:max-h-[520px] object-contain drop-shadow-2xl rounded-2xl pointer-events-none"
                         />
@@ -383,12 +409,17 @@ function FeaturedArts() {
                     <div className="relative aspect-[4/5] overflow-hidden bg-slate-50 rounded-[1.5rem] md:rounded-[2rem] shadow-lg border border-black/5 mb-4 md:mb-6">
                       <img
                         src={artwork.image}
+                        srcSet={artwork.srcSet}
+                        sizes="(min-width: 1024px) 25vw, (min-width: 768px) 33vw, 50vw"
+                        loading="lazy"
+                        decoding="async"
+                        onError={dropSrcSetOnError}
                         alt={artwork.artwork}
                         className="w-full h-full object-cover transition-transform duration-1000 ease-out group-hover:scale-110"
                       />
                       <div className="absolute inset-0 bg-black/0 group-hover:bg-black/30 transition-all duration-500 opacity-0 group-hover:opacity-100 flex flex-col items-center justify-center gap-3">
                         <button
-                          onClick={() => setSelectedArtwork(artwork)}
+                          onClick={() => openArtwork(artwork)}
                           className="w-14 h-14 bg-white/90 backdrop-blur-md rounded-full flex items-center justify-center hover:scale-110 transition-transform shadow-2xl"
                         >
                           <Maximize2 size={24} className="text-black" />
@@ -408,7 +439,7 @@ function FeaturedArts() {
                     <div className="px-2">
                       <h4
                         className="unna-bold text-2xl text-black mb-1 hover:text-slate-600 transition-all cursor-pointer truncate"
-                        onClick={() => setSelectedArtwork(artwork)}
+                        onClick={() => openArtwork(artwork)}
                       >
                         {artwork.artwork}
                       </h4>
@@ -464,6 +495,10 @@ function FeaturedArts() {
               <div className="lg:flex-[1.4] bg-slate-50 p-6 md:p-12 lg:p-20 flex items-center justify-center overflow-hidden border-b lg:border-b-0 lg:border-r border-black/5 relative min-h-[300px] md:min-h-[400px]">
                 <img
                   src={selectedArtwork.image}
+                  srcSet={selectedArtwork.srcSet}
+                  sizes="(min-width: 1024px) 60vw, 100vw"
+                  decoding="async"
+                  onError={dropSrcSetOnError}
                   alt={selectedArtwork.artwork}
                   className="max-w-full max-h-[250px] md:max-h-full object-contain drop-shadow-3xl"
                 />
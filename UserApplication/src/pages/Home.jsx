@@ -3,6 +3,7 @@ import { useState, useEffect } from 'react';
 import { motion } from 'framer-motion';
 import { Link } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
+import { fetchMuseumStatus } from '../museumStatus';
 import Footer from '../components/Footer';
 import featuredArtsImg from '../assets/images/featured-arts-img.png';
 import artEventImg from '../assets/images/art-event.png';
@@ -25,63 +26,10 @@ function Home() {
   }, [reviews, reviews.length]);
 
   useEffect(() => {
-    // Fetch hours and holidays for status card
+    // Open/closed status is computed server-side from the hours calendar
     const fetchStatus = async () => {
       try {
-        const [hoursRes, holidaysRes] = await Promise.all([
-          fetch('http://127.0.0.1:8000/api/hours'),
-          fetch('http://127.0.0.1:8000/api/holidays')
-        ]);
-
-        const hoursData = await hoursRes.json();
-        const holidaysData = await holidaysRes.json();
-
-        const now = new Date();
-        const year = now.getFullYear();
-        const month = String(now.getMonth() + 1).padStart(2, '0');
-        const day = String(now.getDate()).padStart(2, '0');
-        const dateStr = `${year}-${month}-${day}`;
-
-        // Check for holidays
-        const holidayName = Object.entries(holidaysData).find(([d]) => d === dateStr)?.[0];
-
-        if (holidayName) {
-          setMuseumStatus({ isOpen: false, message: `Closed for ${holidayName}` });
-          return;
-        }
-
-        // Check operating hours
-        const dayIndex = now.getDay();
-        const dayMap = ["Sun", "Mon", "Tues", "Wed", "Thurs", "Fri", "Sat"];
-        const dayName = dayMap[dayIndex];
-        const dayHours = hoursData[dayName];
-
-        if (!dayHours || dayHours === "Closed") {
-          setMuseumStatus({ isOpen: false, message: "Closed today" });
-          return;
-        }
-
-        // Parse "10:00 AM - 5:00 PM"
-        const [startStr, endStr] = dayHours.split(" - ");
-
-        const parseTime = (timeStr) => {
-          const [time, modifier] = timeStr.split(" ");
-          let [hours, minutes] = time.split(":");
-          if (hours === "12") hours = "00";
-          if (modifier === "PM") hours = parseInt(hours, 10) + 12;
-          const date = new Date();
-          date.setHours(parseInt(hours, 10), parseInt(minutes, 10), 0, 0);
-          return date;
-        };
-
-        const startTime = parseTime(startStr);
-        const endTime = parseTime(endStr);
-
-        if (now >= startTime && now <= endTime) {
-          setMuseumStatus({ isOpen: true, message: `Open until ${endStr}` });
-        } else {
-          setMuseumStatus({ isOpen: false, message: now < startTime ? `Opens at ${startStr}` : "Closed now" });
-        }
+        setMuseumStatus(await fetchMuseumStatus());
       } catch (err) {
         console.error("Failed to fetch museum status:", err);
         setMuseumStatus({ isOpen: false, message: "Information unavailable" });
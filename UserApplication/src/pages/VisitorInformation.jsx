@@ -3,6 +3,7 @@ import { motion } from 'framer-motion';
 import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
 import { useTranslation } from 'react-i18next';
+import { fetchMuseumStatus } from '../museumStatus';
 import { Clock, MapPin, Ticket, Coffee, ShoppingBag, Baby, Train } from 'lucide-react';
 
 function VisitorInformation() {
@@ -10,57 +11,10 @@ function VisitorInformation() {
   const [museumStatus, setMuseumStatus] = useState({ isOpen: false, message: "Checking status..." });
 
   useEffect(() => {
+    // Open/closed status is computed server-side from the hours calendar
     const fetchStatus = async () => {
       try {
-        const [hoursRes, holidaysRes] = await Promise.all([
-          fetch('http://127.0.0.1:8000/api/hours'),
-          fetch('http://127.0.0.1:8000/api/holidays')
-        ]);
-
-        const hoursData = await hoursRes.json();
-        const holidaysData = await holidaysRes.json();
-
-        const now = new Date();
-        const year = now.getFullYear();
-        const month = String(now.getMonth() + 1).padStart(2, '0');
-        const day = String(now.getDate()).padStart(2, '0');
-        const dateStr = `${year}-${month}-${day}`;
-
-        const holidayName = Object.entries(holidaysData).find(([d]) => d === dateStr)?.[0];
-        if (holidayName) {
-          setMuseumStatus({ isOpen: false, message: `Closed for ${holidayName}` });
-          return;
-        }
-
-        const dayIndex = now.getDay();
-        const dayMap = ["Sun", "Mon", "Tues", "Wed", "Thurs", "Fri", "Sat"];
-        const dayName = dayMap[dayIndex];
-        const dayHours = hoursData[dayName];
-
-        if (!dayHours || dayHours === "Closed") {
-          setMuseumStatus({ isOpen: false, message: "Closed today" });
-          return;
-        }
-
-        const [startStr, endStr] = dayHours.split(" - ");
-        const parseTime = (timeStr) => {
-          const [time, modifier] = timeStr.split(" ");
-          let [hours, minutes] = time.split(":");
-          if (hours === "12" && modifier === "AM") hours = "00";
-          else if (hours !== "12" && modifier === "PM") hours = parseInt(hours, 10) + 12;
-          const date = new Date();
-          date.setHours(parseInt(hours, 10), parseInt(minutes, 10), 0, 0);
-          return date;
-        };
-
-        const startTime = parseTime(startStr);
-        const endTime = parseTime(endStr);
-
-        if (now >= startTime && now <= endTime) {
-          setMuseumStatus({ isOpen: true, message: `Open until ${endStr}` });
-        } else {
-          setMuseumStatus({ isOpen: false, message: now < startTime ? `Opens at ${startStr}` : "Closed now" });
-        }
+        setMuseumStatus(await fetchMuseumStatus());
       } catch (err) {
         setMuseumStatus({ isOpen: false, message: "Information unavailable" });
       }